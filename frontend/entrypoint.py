@@ -59,6 +59,7 @@ from news.models import (
     TrustedAccountQuelle,
     Zielgruppe,
 )
+from news.services.vocabulary import finish_vocabulary_update, start_vocabulary_update
 
 
 # Migrations durchführen
@@ -425,12 +426,16 @@ def create_category_translations():
     data = _load_vocab_data(data_file)
 
     with transaction.atomic():
+        # Umbenennungen vor dem Synchronisieren übernehmen, damit Zuordnungen erhalten bleiben
+        vocabulary_update = start_vocabulary_update(data, logger)
         for label, key, model in (
             ("Inhaltskategorie", "content_categories", InhaltsKategorie),
             ("Zielgruppe", "audience_categories", Zielgruppe),
             ("Standort", "location_categories", Standort),
         ):
             _sync_vocab_entries(data.get(key, []), model)
+        # Nur von der Änderung betroffene News neu kategorisieren
+        finish_vocabulary_update(vocabulary_update, logger)
 
     logger.info("Kategorien-Objekte erstellt.")
 
@@ -1,9 +1,22 @@
 import uuid
 from datetime import timedelta
 
+from django import forms
 from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ORDER_VAR
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import transaction
+from django.db.models import BooleanField, Count, Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Upper
+from django.http import JsonResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils.timezone import now
 
 from .models import *
+from .services.processing.failures import requeue
+from .tasks import run_reprocessing_job
 
 admin.site.register(Quelle)
 admin.site.register(Fachschaft)
@@ -19,6 +32,42 @@ admin.site.register(Sprache)
 admin.site.register(OpenAITokenUsage)
 
 
+class TrigramSearchMixin:
+    """Admin-Suche über die pg_trgm-Indizes auf UPPER(feld).
+
+    Findet Teilstrings wie die normale Suche und zusätzlich Treffer mit Tippfehlern
+    (Wortähnlichkeit), sortiert nach der Ähnlichkeit zu den Rangfeldern.
+    """
+
+    # Felder mit Trigramm-Index
+    trigram_search_fields: list[str] = []
+    # Kurze Felder für die Sortierung, lange Texte wären dafür zu teuer
+    trigram_rank_fields: list[str] = []
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return super().get_search_results(request, queryset, search_term)
+
+        condition = Q()
+        for index, field in enumerate(self.trigram_search_fields):
+            # Gleicher Ausdruck wie im Index, damit auch die Ähnlichkeitssuche ihn nutzt
+            alias = f"trigram_{index}"
+            queryset = queryset.alias(**{alias: Upper(field)})
+            condition |= Q(**{f"{field}__icontains": term})
+            condition |= Q(**{f"{alias}__trigram_word_similar": term})
+
+        similarities = [
+            TrigramWordSimilarity(term, Upper(field)) for field in self.trigram_rank_fields
+        ]
+        similarity = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        queryset = queryset.filter(condition).annotate(search_similarity=similarity)
+        # Ohne gewählte Spalte die ähnlichsten Treffer zuerst
+        if ORDER_VAR not in request.GET:
+            queryset = queryset.order_by("-search_similarity", "-pk")
+        return queryset, False
+
+
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     list_display = (
@@ -121,11 +170,51 @@ class TrustedUserApplicationAdmin(admin.ModelAdmin):
         )
 
 
+class AnnotationFilter(admin.SimpleListFilter):
+    """Ja/Nein-Filter über eine boolesche Annotation aus NewsAdmin.get_queryset."""
+
+    annotation = ""
+
+    def lookups(self, request, model_admin):
+        return [("1", "Ja"), ("0", "Nein")]
+
+    def queryset(self, request, queryset):
+        if self.value() in ("0", "1"):
+            return queryset.filter(**{self.annotation: self.value() == "1"})
+        return queryset
+
+
+class HasCategoriesFilter(AnnotationFilter):
+    title = "Kategorien vorhanden"
+    parameter_name = "hat_kategorien"
+    annotation = "has_categories"
+
+
+class FullyTranslatedFilter(AnnotationFilter):
+    title = "Alle Übersetzungen vorhanden"
+    parameter_name = "vollstaendig_uebersetzt"
+    annotation = "fully_translated"
+
+
+class ReprocessingActionForm(ActionForm):
+    priority = forms.TypedChoiceField(
+        label="Priorität",
+        choices=ReprocessingJob.PRIORITY_CHOICES,
+        coerce=int,
+        initial=ReprocessingJob.PRIORITY_NORMAL,
+        required=False,
+    )
+
+
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(TrigramSearchMixin, admin.ModelAdmin):
     # Standard-Sortierung
     ordering = ["-erstellungsdatum"]  # Absteigend sortiert (neuste zuerst)
 
+    search_fields = ["titel"]
+    trigram_search_fields = ["titel"]
+    trigram_rank_fields = ["titel"]
+
     list_display = [
         "titel",
         "erstellungsdatum",
@@ -134,37 +223,125 @@ class NewsAdmin(admin.ModelAdmin):
         "hat_kategorien",
         "vollständig_übersetzt",
     ]
+    list_filter = ["is_cleaned_up", HasCategoriesFilter, FullyTranslatedFilter, "categorized_by"]
+    list_select_related = ["quelle"]
 
     list_max_show_all = 5000
 
-    @admin.display(boolean=True, description="Bereinigt?")
+    action_form = ReprocessingActionForm
+    actions = ["rerun_cleanup", "rerun_translation", "rerun_categorization"]
+
+    def get_queryset(self, request):
+        # Kategorien und Übersetzungen für die ganze Liste in einer Abfrage statt pro Zeile
+        categories = News.inhaltskategorien.through.objects.filter(news=OuterRef("pk"))
+        translated = (
+            Text.objects.filter(news=OuterRef("pk"))
+            .order_by()
+            .values("news")
+            .annotate(count=Count("sprache"))
+            .values("count")
+        )
+        language_count = Sprache.objects.count()
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                has_categories=Exists(categories),
+                translated_languages=Coalesce(Subquery(translated), 0),
+            )
+            .annotate(
+                fully_translated=Q(translated_languages__gte=language_count)
+                if language_count
+                else Value(True, output_field=BooleanField())
+            )
+        )
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Von Hand korrigierte Kategorien nicht als OpenAI-Labels zum Training verwenden
+        if change and {"inhaltskategorien", "zielgruppen"} & set(form.changed_data):
+            News.objects.filter(pk=form.instance.pk).update(
+                categorized_by=News.CATEGORIZED_BY_MANUAL
+            )
+
+    @admin.display(boolean=True, description="Bereinigt?", ordering="is_cleaned_up")
     def bereinigt(self, obj):
         return obj.is_cleaned_up
 
-    @admin.display(boolean=True, description="Kategorien vorhanden?")
+    @admin.display(boolean=True, description="Kategorien vorhanden?", ordering="has_categories")
     def hat_kategorien(self, obj):
-        return obj.inhaltskategorien.exists()
+        return obj.has_categories
 
-    @admin.display(boolean=True, description="Alle Übersetzungen vorhanden?")
+    @admin.display(
+        boolean=True,
+        description="Alle Übersetzungen vorhanden?",
+        ordering="translated_languages",
+    )
     def vollständig_übersetzt(self, obj) -> bool:
-        required_lang_codes = set(Sprache.objects.values_list("code", flat=True))
-        existing_langs = set(obj.texte.values_list("sprache__code", flat=True))
-        missing = required_lang_codes - existing_langs
-        return not missing
+        return obj.fully_translated
+
+    def _start_job(self, request, queryset, stage: str) -> None:
+        """Ausgewählte News als Auftrag im Hintergrund neu verarbeiten lassen."""
+        try:
+            priority = int(request.POST.get("priority", ""))
+        except ValueError:
+            priority = ReprocessingJob.PRIORITY_NORMAL
+        if priority not in dict(ReprocessingJob.PRIORITY_CHOICES):
+            priority = ReprocessingJob.PRIORITY_NORMAL
+
+        news_ids = list(queryset.order_by("-erstellungsdatum").values_list("pk", flat=True))
+        job = ReprocessingJob.objects.create(
+            stage=stage,
+            priority=priority,
+            news_ids=news_ids,
+            total=len(news_ids),
+            created_by=request.user,
+        )
+        transaction.on_commit(
+            lambda: run_reprocessing_job.apply_async(args=[job.pk], priority=job.priority)
+        )
+        url = reverse("admin:news_reprocessingjob_changelist")
+        self.message_user(
+            request,
+            format_html(
+                '{} News eingereiht ({}). <a href="{}">Fortschritt anzeigen</a>',
+                len(news_ids),
+                job.get_stage_display(),
+                url,
+            ),
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Cleanup erneut ausführen")
+    def rerun_cleanup(self, request, queryset):
+        self._start_job(request, queryset, ProcessingFailure.STAGE_CLEANUP)
+
+    @admin.action(description="Übersetzungen erneut erzeugen")
+    def rerun_translation(self, request, queryset):
+        self._start_job(request, queryset, ProcessingFailure.STAGE_TRANSLATION)
+
+    @admin.action(description="Kategorisierung erneut ausführen")
+    def rerun_categorization(self, request, queryset):
+        self._start_job(request, queryset, ProcessingFailure.STAGE_CATEGORIZATION)
 
 
 @admin.register(Text)
-class TextAdmin(admin.ModelAdmin):
+class TextAdmin(TrigramSearchMixin, admin.ModelAdmin):
     list_display = [
         "news_titel",
         "sprache",
         "kurzer_inhalt",
     ]
 
+    # Nur Spalten von Text, eine Bedingung auf der verknüpften News verhindert die
+    # Kombination der Indizes (News-Titel werden in der News-Übersicht gesucht)
     search_fields = [
-        "inhalt",
-        "news__titel",
+        "titel",
+        "text",
     ]
+    trigram_search_fields = search_fields
+    trigram_rank_fields = ["titel"]
+    list_select_related = ["news", "sprache"]
 
     @admin.display(description="Kurzer Inhalt")
     def kurzer_inhalt(self, obj):
@@ -178,6 +355,88 @@ class TextAdmin(admin.ModelAdmin):
     list_max_show_all = 20000
 
 
+@admin.register(CategoryClassifier)
+class CategoryClassifierAdmin(admin.ModelAdmin):
+    list_display = ["created_at", "train_size", "threshold", "precision", "coverage"]
+    exclude = ["model"]
+    readonly_fields = ["train_size", "threshold", "metrics"]
+
+    @admin.display(description="Precision (Test)")
+    def precision(self, obj):
+        return obj.metrics.get("confident", {}).get("precision")
+
+    @admin.display(description="Ohne OpenAI")
+    def coverage(self, obj):
+        coverage = obj.metrics.get("confident", {}).get("coverage")
+        return f"{coverage:.0%}" if coverage is not None else "-"
+
+
+@admin.register(ProcessingFailure)
+class ProcessingFailureAdmin(admin.ModelAdmin):
+    list_display = [
+        "news",
+        "stage",
+        "attempts",
+        "dead_lettered",
+        "next_attempt_at",
+        "kurzer_fehler",
+    ]
+    list_filter = ["stage", "dead_lettered"]
+    search_fields = ["news__titel", "last_error"]
+    list_select_related = ["news"]
+    readonly_fields = [
+        "news",
+        "stage",
+        "attempts",
+        "last_error",
+        "last_attempt_at",
+        "next_attempt_at",
+        "dead_lettered",
+    ]
+    actions = ["requeue_failures"]
+
+    @admin.display(description="Fehler")
+    def kurzer_fehler(self, obj):
+        preview = obj.last_error.strip()
+        return (preview[:75] + "...") if len(preview) > 75 else preview
+
+    @admin.action(description="Erneut einreihen")
+    def requeue_failures(self, request, queryset):
+        count = requeue(queryset)
+        self.message_user(
+            request,
+            f"{count} Verarbeitungsschritt(e) werden beim nächsten Backfill erneut versucht.",
+            messages.SUCCESS,
+        )
+
+
+@admin.register(CircuitBreaker)
+class CircuitBreakerAdmin(admin.ModelAdmin):
+    list_display = ["name", "open_until", "failures", "last_error"]
+    readonly_fields = ["name", "failures", "window_started_at", "open_until", "last_error"]
+    actions = ["close_breaker"]
+
+    @admin.action(description="Schließen (OpenAI-Aufrufe wieder erlauben)")
+    def close_breaker(self, request, queryset):
+        queryset.update(open_until=None, failures=0, window_started_at=None)
+        self.message_user(request, "Circuit Breaker geschlossen.", messages.SUCCESS)
+
+
+@admin.register(LazyTranslation)
+class LazyTranslationAdmin(admin.ModelAdmin):
+    list_display = ["news", "sprache", "requested_at", "completed_at", "dauer"]
+    list_filter = ["sprache", "completed_at"]
+    search_fields = ["news__titel"]
+    list_select_related = ["news", "sprache"]
+    readonly_fields = ["news", "sprache", "requested_at", "completed_at"]
+
+    @admin.display(description="Dauer")
+    def dauer(self, obj):
+        if obj.completed_at is None:
+            return "-"
+        return f"{(obj.completed_at - obj.requested_at).total_seconds():.1f}s"
+
+
 # Kalender
 # Brauchen wir um im Admin-Table Serientermine zu erstellen
 class CalendarEventAdmin(admin.ModelAdmin):
@@ -247,3 +506,113 @@ class CalendarEventAdmin(admin.ModelAdmin):
 
 
 admin.site.register(CalendarEvent, CalendarEventAdmin)
+
+
+def _job_progress(job: ReprocessingJob) -> str:
+    progress = f"{job.processed}/{job.total}"
+    return f"{progress} ({job.failed} Fehler)" if job.failed else progress
+
+
+def _job_throughput(job: ReprocessingJob) -> str:
+    rate = job.news_per_minute
+    return f"{rate:.1f} News/min" if rate is not None else "-"
+
+
+@admin.register(ReprocessingJob)
+class ReprocessingJobAdmin(admin.ModelAdmin):
+    # Laufende Aufträge werden im Template per progress/ aktualisiert
+    list_display = [
+        "__str__",
+        "priority",
+        "zustand",
+        "fortschritt",
+        "durchsatz",
+        "tokens_verbraucht",
+        "created_by",
+    ]
+    list_filter = ["stage", "priority"]
+    list_select_related = ["created_by"]
+    readonly_fields = [
+        "stage",
+        "priority",
+        "total",
+        "done",
+        "failed",
+        "tokens",
+        "created_by",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "heartbeat_at",
+        "last_error",
+    ]
+    exclude = ["news_ids"]
+    actions = ["cancel_jobs", "resume_jobs"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        progress = path(
+            "progress/",
+            self.admin_site.admin_view(self.progress_view),
+            name="news_reprocessingjob_progress",
+        )
+        return [progress] + super().get_urls()
+
+    def progress_view(self, request):
+        jobs = ReprocessingJob.objects.filter(pk__in=request.GET.getlist("id"))
+        return JsonResponse(
+            {
+                "jobs": [
+                    {
+                        "id": job.pk,
+                        "status": job.status,
+                        "progress": _job_progress(job),
+                        "throughput": _job_throughput(job),
+                        "tokens": str(job.tokens),
+                    }
+                    for job in jobs
+                ]
+            }
+        )
+
+    @admin.display(description="Status")
+    def zustand(self, obj):
+        return format_html('<span data-job="{}" data-job-field="status">{}</span>', obj.pk, obj.status)
+
+    @admin.display(description="Fortschritt")
+    def fortschritt(self, obj):
+        return format_html(
+            '<span data-job="{}" data-job-field="progress">{}</span>', obj.pk, _job_progress(obj)
+        )
+
+    @admin.display(description="Durchsatz")
+    def durchsatz(self, obj):
+        return format_html(
+            '<span data-job="{}" data-job-field="throughput">{}</span>', obj.pk, _job_throughput(obj)
+        )
+
+    @admin.display(description="Tokens", ordering="tokens")
+    def tokens_verbraucht(self, obj):
+        return format_html('<span data-job="{}" data-job-field="tokens">{}</span>', obj.pk, obj.tokens)
+
+    @admin.action(description="Abbrechen")
+    def cancel_jobs(self, request, queryset):
+        count = queryset.filter(finished_at__isnull=True).update(finished_at=now())
+        self.message_user(request, f"{count} Auftrag/Aufträge abgebrochen.", messages.SUCCESS)
+
+    @admin.action(description="Fortsetzen")
+    def resume_jobs(self, request, queryset):
+        # Abgebrochene und hängengebliebene Aufträge, ein laufender würde sonst doppelt verarbeitet
+        jobs = [
+            job
+            for job in queryset
+            if (job.finished_at is not None or job.is_stale) and job.processed < job.total
+        ]
+        for job in jobs:
+            ReprocessingJob.objects.filter(pk=job.pk).update(
+                finished_at=None, heartbeat_at=now(), last_error=""
+            )
+            run_reprocessing_job.apply_async(args=[job.pk], priority=job.priority)
+        self.message_user(request, f"{len(jobs)} Auftrag/Aufträge fortgesetzt.", messages.SUCCESS)
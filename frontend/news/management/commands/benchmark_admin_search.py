@@ -0,0 +1,117 @@
+"""Misst die Latenz der Admin-Suche (News und Texte) bei vielen Texten.
+
+Legt synthetische News mit deutschem und englischem Text an einer eigenen Quelle an,
+ruft die Änderungslisten von NewsAdmin und TextAdmin mit typischen Suchbegriffen auf
+(Teilstring, Tippfehler, kein Treffer) und berichtet p50/p95 je Begriff. Der
+Abfrageplan der Textsuche zeigt, ob die Trigramm-Indizes genutzt werden.
+
+Aufruf: python manage.py benchmark_admin_search [--texts 100000] [--repeat 5]
+"""
+
+import random
+import time
+from datetime import timedelta
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.utils.timezone import now
+
+from news.management.commands.benchmark_pipeline import WORDS, _percentile
+from news.models import ExterneWebsite, News, Sprache, Text, User
+
+# Teilstring, Tippfehler, seltene Wortfolge und Begriff ohne Treffer
+DEFAULT_TERMS = ["bibliothek", "bibliotek", "mensa semester", "quantenchromodynamik"]
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = "Misst die Latenz der Admin-Suche über News und Texte"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--texts", type=int, default=100_000, help="Anzahl Texte (zwei pro News)")
+        parser.add_argument("--repeat", type=int, default=5, help="Aufrufe pro Suchbegriff")
+        parser.add_argument("--term", action="append", dest="terms", help="Suchbegriff (mehrfach möglich)")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--keep", action="store_true", help="Benchmark-News behalten")
+
+    def handle(self, *args, **options):
+        sprachen = list(Sprache.objects.filter(code__in=["de", "en"]))
+        if len(sprachen) != 2:
+            raise CommandError("Sprachen de und en fehlen, bitte zuerst die Stammdaten laden")
+
+        run_id = f"{int(time.time())}"
+        source = ExterneWebsite.objects.create(
+            name=f"Benchmark Admin-Suche {run_id}", slug=f"benchmark-admin-suche-{run_id}"
+        )
+        try:
+            start = time.perf_counter()
+            self._populate(source, sprachen, options["texts"], random.Random(options["seed"]))
+            self.stdout.write(
+                f"{options['texts']} Texte in {time.perf_counter() - start:.1f}s angelegt"
+            )
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE news_news; ANALYZE news_text")
+
+            user = User(username="benchmark", is_staff=True, is_superuser=True, is_active=True)
+            for term in options["terms"] or DEFAULT_TERMS:
+                for model in (News, Text):
+                    self._measure(model, term, user, options["repeat"])
+            self._explain((options["terms"] or DEFAULT_TERMS)[0])
+        finally:
+            if not options["keep"]:
+                source.delete()
+
+    def _populate(self, source, sprachen: list[Sprache], texts: int, rng: random.Random) -> None:
+        created = now()
+        news_count = max(texts // len(sprachen), 1)
+        for offset in range(0, news_count, BATCH_SIZE):
+            news_items = News.objects.bulk_create(
+                News(
+                    titel=f"{' '.join(rng.choices(WORDS, k=4))} #{i}",
+                    erstellungsdatum=created - timedelta(minutes=i),
+                    quelle=source,
+                    is_cleaned_up=True,
+                )
+                for i in range(offset, min(offset + BATCH_SIZE, news_count))
+            )
+            Text.objects.bulk_create(
+                Text(
+                    news=news,
+                    sprache=sprache,
+                    titel=news.titel,
+                    text=f"<p>{' '.join(rng.choices(WORDS, k=150))}</p>",
+                )
+                for news in news_items
+                for sprache in sprachen
+            )
+
+    def _measure(self, model, term: str, user: User, repeat: int) -> None:
+        model_admin = admin.site._registry[model]
+        factory = RequestFactory()
+        durations: list[float] = []
+        result_count = 0
+        for _ in range(repeat):
+            request = factory.get("/admin/", {"q": term})
+            request.user = user
+            start = time.perf_counter()
+            response = model_admin.changelist_view(request)
+            response.render()
+            durations.append(time.perf_counter() - start)
+            result_count = response.context_data["cl"].result_count
+
+        self.stdout.write(
+            f"{model.__name__:<5} {term!r:<24} {result_count:>7} Treffer, "
+            f"p50 {_percentile(durations, 0.5) * 1000:.0f}ms, "
+            f"p95 {_percentile(durations, 0.95) * 1000:.0f}ms"
+        )
+
+    def _explain(self, term: str) -> None:
+        model_admin = admin.site._registry[Text]
+        request = RequestFactory().get("/admin/", {"q": term})
+        queryset, _ = model_admin.get_search_results(
+            request, model_admin.get_queryset(request), term
+        )
+        self.stdout.write("Abfrageplan der Textsuche:")
+        self.stdout.write(queryset[:100].explain())
@@ -0,0 +1,129 @@
+"""Misst die Suche nach Beinahe-Duplikaten auf einem synthetischen Bestand.
+
+Legt innerhalb einer Transaktion eine temporäre Quelle mit synthetischen News samt
+Signaturen an, sucht für leicht veränderte Kopien einiger News die kanonische News und
+verwirft anschließend alle angelegten Daten.
+
+Aufruf: python manage.py benchmark_near_duplicates [--count 100000] [--queries 200]
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from news.models import News, NewsFingerprint, NewsLSHBucket, Quelle
+from news.services.near_duplicates import (
+    band_buckets,
+    find_similar,
+    minhash_signature,
+    pack_signature,
+)
+
+WORDS = (
+    "studierende beschäftigte universität campus kaiserslautern landau vortrag seminar "
+    "anmeldung veranstaltung forschung lehre prüfung bibliothek mensa semester bewerbung "
+    "frist projekt workshop informatik physik chemie biologie mathematik sport kultur "
+    "einladung termin raum gebäude online präsenz stipendium austausch praktikum stelle"
+).split()
+TEXT_LENGTH = 150
+BATCH_SIZE = 2000
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _synthetic_text(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=TEXT_LENGTH))
+
+
+def _perturb(text: str, rng: random.Random, ratio: float = 0.03) -> str:
+    """Einzelne Wörter ersetzen, wie bei leicht umformulierten Meldungen."""
+    words = text.split()
+    for index in rng.sample(range(len(words)), int(len(words) * ratio)):
+        words[index] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+class Command(BaseCommand):
+    help = "Misst Laufzeit und Trefferquote der Beinahe-Duplikat-Erkennung"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options["count"], options["queries"], options["seed"])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write("Synthetische Daten verworfen")
+
+    def _run(self, count: int, queries: int, seed: int) -> None:
+        rng = random.Random(seed)
+        quelle = Quelle.objects.create(
+            slug=f"benchmark-near-duplicates-{seed}", name="Benchmark Beinahe-Duplikate"
+        )
+        now = timezone.now()
+
+        start = time.perf_counter()
+        texts: dict[int, str] = {}
+        for offset in range(0, count, BATCH_SIZE):
+            size = min(BATCH_SIZE, count - offset)
+            batch_texts = [_synthetic_text(rng) for _ in range(size)]
+            news = News.objects.bulk_create(
+                News(
+                    titel=f"Benchmark {offset + i}",
+                    erstellungsdatum=now,
+                    quelle=quelle,
+                    quelle_typ="Externe Website",
+                )
+                for i in range(size)
+            )
+            fingerprints = []
+            buckets = []
+            for news_item, text in zip(news, batch_texts):
+                signature = minhash_signature(text)
+                fingerprints.append(
+                    NewsFingerprint(news=news_item, signature=pack_signature(signature))
+                )
+                buckets.extend(
+                    NewsLSHBucket(news=news_item, band=band, bucket=bucket)
+                    for band, bucket in enumerate(band_buckets(signature))
+                )
+                if len(texts) < queries:
+                    texts[news_item.pk] = text
+            NewsFingerprint.objects.bulk_create(fingerprints)
+            NewsLSHBucket.objects.bulk_create(buckets, batch_size=BATCH_SIZE)
+        self.stdout.write(
+            f"{count} News indiziert in {time.perf_counter() - start:.1f}s"
+        )
+
+        hits = 0
+        durations = []
+        for news_id, text in texts.items():
+            signature = minhash_signature(_perturb(text, rng))
+            start = time.perf_counter()
+            match = find_similar(signature)
+            durations.append(time.perf_counter() - start)
+            hits += match is not None and match[0] == news_id
+
+        # Zufällige Texte ohne Vorlage dürfen keinen Treffer liefern
+        false_positives = sum(
+            find_similar(minhash_signature(_synthetic_text(rng))) is not None
+            for _ in range(len(texts))
+        )
+
+        durations.sort()
+        self.stdout.write(
+            f"Suche: Median {durations[len(durations) // 2] * 1000:.2f} ms, "
+            f"p95 {durations[int(len(durations) * 0.95)] * 1000:.2f} ms"
+        )
+        self.stdout.write(
+            f"Trefferquote {hits}/{len(texts)}, Fehltreffer {false_positives}/{len(texts)}"
+        )
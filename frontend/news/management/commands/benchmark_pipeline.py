@@ -0,0 +1,241 @@
+"""Misst den Durchsatz der Verarbeitungspipeline gegen den lokalen OpenAI-Stub.
+
+Phase 1 schickt synthetische News in Batches an ReceiveNews (Cleanup, Übersetzungen
+und Kategorisierung direkt beim Empfang). Phase 2 legt News mit zurückgestellter
+Verarbeitung an und lässt die drei Backfill-Tasks nacheinander laufen. Berichtet
+werden News pro Sekunde, DB-Queries pro News und die Latenz pro News (p50/p95).
+
+Der Benchmark läuft wie die Tests in einer eigenen, danach gelöschten Datenbank
+(test_<NAME>, der Datenbanknutzer braucht CREATEDB) und mit lokalem Cache. Änderungs-
+erkennung, Beinahe-Duplikate, Token-Verbrauch und Circuit Breaker berühren so nie die
+echten Daten.
+
+Aufruf: python manage.py benchmark_pipeline [--count 100] [--latency 800] [--error-rate 0.02]
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Iterator
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.utils.text import slugify
+from django.utils.timezone import localtime, now
+
+import news.tasks as tasks
+import news.views.receive_news as receive_news
+from news.management.commands.openai_stub import add_stub_arguments, stub_config
+from news.management.openai_stub import OpenAIStubServer
+from news.models import ExterneWebsite, InhaltsKategorie, News, Sprache, Zielgruppe
+from news.services.categories import get_audience_categories, get_content_categories
+
+WORDS = (
+    "studierende beschäftigte universität campus kaiserslautern landau vortrag seminar "
+    "anmeldung veranstaltung forschung lehre prüfung bibliothek mensa semester bewerbung "
+    "frist projekt workshop informatik physik chemie biologie mathematik sport kultur"
+).split()
+# Wie in entrypoint.create_languages: Name, englischer Name, Code
+LANGUAGES = [
+    ("Deutsch", "German", "de"),
+    ("Englisch", "English", "en"),
+    ("Französisch", "French", "fr"),
+    ("Spanisch", "Spanish", "es"),
+]
+# Fragment-Versionen der Benchmark-News dürfen den gemeinsamen Redis-Cache nicht berühren
+BENCHMARK_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class QueryCounter:
+    """Zählt Queries aller Verbindungen, auch der Worker-Threads."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+    @contextmanager
+    def installed(self) -> Iterator["QueryCounter"]:
+        connection_created.connect(self._on_connection_created)
+        existing = [conn for conn in connections.all() if conn.connection is not None]
+        for conn in existing:
+            conn.execute_wrappers.append(self)
+        try:
+            yield self
+        finally:
+            connection_created.disconnect(self._on_connection_created)
+            for conn in existing:
+                conn.execute_wrappers.remove(self)
+
+
+def _timed(func: Callable, durations: list[float]) -> Callable:
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            durations.append(time.perf_counter() - start)
+
+    return wrapper
+
+
+def create_master_data() -> None:
+    """Sprachen, Inhaltskategorien und Zielgruppen in der leeren Benchmark-Datenbank anlegen."""
+    for name, name_englisch, code in LANGUAGES:
+        Sprache.objects.create(name=name, name_englisch=name_englisch, code=code)
+    for model, names in (
+        (InhaltsKategorie, get_content_categories()),
+        (Zielgruppe, get_audience_categories()),
+    ):
+        model.objects.bulk_create(model(slug=slugify(name), name=name) for name in names)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def _entries(count: int, source_name: str, run_id: str, rng: random.Random) -> list[dict]:
+    created = localtime(now()).strftime("%d.%m.%Y %H:%M:%S")
+    entries = []
+    for i in range(count):
+        text = " ".join(rng.choices(WORDS, k=150))
+        entries.append(
+            {
+                "titel": f"Benchmark {run_id} #{i}",
+                "text": f'<p>{text}</p><a href="https://example.org/{run_id}/{i}">Mehr</a>',
+                "link": f"https://example.org/{run_id}/{i}",
+                "erstellungsdatum": created,
+                "quelle_typ": "Externe Website",
+                "quelle_name": source_name,
+                "standorte": [],
+            }
+        )
+    return entries
+
+
+class Command(BaseCommand):
+    help = "Misst den Durchsatz der Verarbeitungspipeline gegen einen lokalen OpenAI-Stub"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100, help="News pro Phase")
+        parser.add_argument("--batch-size", type=int, default=10, help="News pro Request")
+        add_stub_arguments(parser)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Lege Benchmark-Datenbank an …")
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS}
+        )
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                self._run(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def _run(self, options) -> None:
+        create_master_data()
+        run_id = f"{int(time.time())}"
+        source = ExterneWebsite.objects.create(
+            name=f"Benchmark Pipeline {run_id}", slug=f"benchmark-pipeline-{run_id}"
+        )
+        server = OpenAIStubServer(0, stub_config(options))
+        server.start_in_background()
+
+        environment = {
+            "OPENAI_BASE_URL": server.base_url,
+            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "stub",
+            "API_KEY": os.getenv("API_KEY") or "benchmark",
+        }
+        rng = random.Random(options["seed"])
+        try:
+            with mock.patch.dict(os.environ, environment):
+                self._ingest(source, run_id, rng, options)
+                self._backfill(source, run_id, rng, options)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(f"Stub: {server.calls} Antworten, {server.tokens} Tokens")
+
+    def _report(self, phase: str, durations: list[float], seconds: float, queries: int) -> None:
+        items = len(durations)
+        if not items:
+            self.stdout.write(f"{phase:<16} keine News verarbeitet")
+            return
+        self.stdout.write(
+            f"{phase:<16} {items} News in {seconds:.1f}s: {items / seconds:.2f} News/s, "
+            f"{queries / items:.1f} Queries/News, p50 {_percentile(durations, 0.5):.2f}s, "
+            f"p95 {_percentile(durations, 0.95):.2f}s"
+        )
+
+    def _ingest(self, source, run_id: str, rng: random.Random, options) -> None:
+        entries = _entries(options["count"], source.name, f"{run_id}-ingest", rng)
+        view = receive_news.ReceiveNews.as_view()
+        factory = RequestFactory()
+        durations: list[float] = []
+
+        timed = _timed(receive_news.process_news_entry, durations)
+        with (
+            mock.patch.object(receive_news, "process_news_entry", timed),
+            QueryCounter().installed() as counter,
+        ):
+            start = time.perf_counter()
+            for offset in range(0, len(entries), options["batch_size"]):
+                request = factory.post(
+                    "/api/news/",
+                    data=json.dumps(entries[offset : offset + options["batch_size"]]),
+                    content_type="application/json",
+                    HTTP_API_KEY=os.environ["API_KEY"],
+                )
+                response = view(request)
+                if response.status_code != 200:
+                    raise CommandError(f"ReceiveNews antwortet mit {response.status_code}")
+            self._report("ReceiveNews", durations, time.perf_counter() - start, counter.count)
+
+    def _backfill(self, source, run_id: str, rng: random.Random, options) -> None:
+        logger = receive_news.get_logger(__name__)
+        entries = _entries(options["count"], source.name, f"{run_id}-backfill", rng)
+        for entry in entries:
+            receive_news.process_news_entry(entry, "stub", logger, defer_llm=True)
+        news_items = News.objects.filter(quelle=source, link__in=[entry["link"] for entry in entries])
+        # Backfill-Tasks berücksichtigen nur News, die älter als 5 Minuten sind
+        news_items.update(created_at=now() - timedelta(minutes=10))
+
+        # Backfill-Tasks auf die News dieser Phase beschränken
+        exclude_blocked = tasks.exclude_blocked
+
+        def only_benchmark(queryset, stage):
+            return exclude_blocked(queryset.filter(pk__in=news_items.values("pk")), stage)
+
+        phases = [
+            ("backfill_cleanup", "process_cleanup", tasks.backfill_cleanup),
+            ("backfill_transl.", "process_translation", tasks.backfill_missing_translations),
+            ("backfill_categ.", "process_categorization", tasks.backfill_missing_categorizations),
+        ]
+        with mock.patch.object(tasks, "exclude_blocked", only_benchmark):
+            for phase, step_name, task in phases:
+                durations: list[float] = []
+                timed = _timed(getattr(tasks, step_name), durations)
+                with (
+                    mock.patch.object(tasks, step_name, timed),
+                    QueryCounter().installed() as counter,
+                ):
+                    start = time.perf_counter()
+                    task()
+                    self._report(phase, durations, time.perf_counter() - start, counter.count)
@@ -0,0 +1,67 @@
+"""Misst die Token-Einsparung der Prompt-Vorverarbeitung je Verarbeitungsschritt.
+
+Für die neuesten News wird der Prompt von Cleanup, Kategorisierung und Übersetzung
+einmal mit dem gespeicherten Text und einmal minifiziert mit Platzhaltern gezählt.
+Dass Links und E-Mail-Adressen das Wiedereinsetzen der Platzhalter unverändert
+überstehen, prüfen die Tests in news/tests.py.
+
+Gezählt wird mit tiktoken, falls installiert, sonst geschätzt (4 Zeichen pro Token).
+
+Aufruf: python manage.py benchmark_prompt_preprocessing [--limit 200]
+"""
+
+from django.core.management.base import BaseCommand
+
+from news.models import Text
+from news.services.processing.prompt_preprocessing import prepare_prompt_text
+
+STAGES = {
+    # Schritt: Sprache des Eingabetexts
+    "cleanup": "Deutsch",
+    "categorization": "Deutsch",
+    "translation": "Englisch",
+}
+
+
+def _token_counter():
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return (lambda text: len(encoding.encode(text))), "tiktoken"
+    except Exception:
+        return (lambda text: (len(text) + 3) // 4), "geschätzt"
+
+
+class Command(BaseCommand):
+    help = "Misst die Token-Einsparung der Prompt-Vorverarbeitung"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=200)
+
+    def handle(self, *args, **options):
+        count_tokens, method = _token_counter()
+
+        for stage, language in STAGES.items():
+            texts = list(
+                Text.objects.filter(sprache__name=language)
+                .order_by("-news__erstellungsdatum")
+                .values_list("titel", "text")[: options["limit"]]
+            )
+            if not texts:
+                self.stdout.write(f"{stage}: keine Texte ({language})")
+                continue
+
+            before = after = 0
+            for titel, text in texts:
+                prompt_text, _ = prepare_prompt_text(text)
+                before += count_tokens(f"Titel: {titel} \n\nText: {text}")
+                after += count_tokens(f"Titel: {titel} \n\nText: {prompt_text}")
+
+            self.stdout.write(
+                f"{stage:<15} {len(texts)} Texte: {before} → {after} Tokens "
+                f"({1 - after / before:.1%} gespart, Ø {before / len(texts):.0f} → "
+                f"{after / len(texts):.0f})"
+            )
+
+        self.stdout.write(f"Zählung: {method}")
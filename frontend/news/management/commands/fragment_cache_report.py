@@ -0,0 +1,30 @@
+"""Trefferquote des Caches für gerenderte News-Karten und Detailansichten.
+
+Zählt je Fragmentart Treffer und Fehlzugriffe seit dem letzten Zurücksetzen.
+
+Aufruf: python manage.py fragment_cache_report [--reset]
+"""
+
+from django.core.management.base import BaseCommand
+
+from news.services.fragments import FRAGMENT_TEMPLATES, fragment_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = "Trefferquote des Fragment-Caches für News"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zähler danach zurücksetzen")
+
+    def handle(self, *args, **options):
+        for kind in FRAGMENT_TEMPLATES:
+            hits, misses = fragment_stats(kind)
+            total = hits + misses
+            rate = hits / total * 100 if total else 0.0
+            self.stdout.write(
+                f"{kind}: {hits} Treffer, {misses} Fehlzugriffe, Trefferquote {rate:.1f}%"
+            )
+
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write("Zähler zurückgesetzt")
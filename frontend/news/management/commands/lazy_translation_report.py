@@ -0,0 +1,72 @@
+"""Auswertung der Übersetzung auf Anfrage je Sprache außer Deutsch/Englisch.
+
+Zeigt Anfragen, Zeit bis zur fertigen Übersetzung (Median/p95), ob die Sprache wegen
+vieler Anfragen wieder vorab übersetzt wird, und die geschätzten Tokens, die für News
+ohne Übersetzung in diese Sprache bisher nicht ausgegeben wurden.
+
+Geschätzt wird wie bei benchmark_prompt_preprocessing mit 4 Zeichen pro Token.
+
+Aufruf: python manage.py lazy_translation_report
+"""
+
+import os
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from news.models import LazyTranslation, Sprache, Text
+from news.services.processing.translation import translate
+from news.services.processing.translation.lazy import is_lazy, popular_language_ids
+
+
+def _estimate_tokens(characters: int) -> int:
+    return (characters + 3) // 4
+
+
+def _system_message_tokens() -> int:
+    path = os.path.join(os.path.dirname(translate.__file__), "system_message.txt")
+    with open(path, "r", encoding="utf-8") as file:
+        return _estimate_tokens(len(file.read()))
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = "Auswertung der Übersetzung auf Anfrage"
+
+    def handle(self, *args, **options):
+        system_tokens = _system_message_tokens()
+        popular = popular_language_ids()
+
+        for sprache in Sprache.objects.order_by("code"):
+            if not is_lazy(sprache.code):
+                continue
+
+            requests = LazyTranslation.objects.filter(sprache=sprache)
+            latencies = sorted(
+                (completed - requested).total_seconds()
+                for requested, completed in requests.filter(
+                    completed_at__isnull=False
+                ).values_list("requested_at", "completed_at")
+            )
+
+            # Englische Texte der News ohne Übersetzung in diese Sprache
+            missing = Text.objects.filter(sprache__code="en").exclude(
+                news__texte__sprache=sprache
+            )
+            count = missing.count()
+            characters = (
+                missing.aggregate(total=Sum(Length("titel") + Length("text")))["total"] or 0
+            )
+            # Eingabe (System-Prompt + Text) und Ausgabe in etwa gleicher Länge
+            saved = count * system_tokens + 2 * _estimate_tokens(characters)
+
+            self.stdout.write(
+                f"{sprache.code}: {requests.count()} Anfragen, {len(latencies)} fertig "
+                f"(Median {_percentile(latencies, 0.5):.1f}s, p95 {_percentile(latencies, 0.95):.1f}s), "
+                f"{'vorab übersetzt' if sprache.pk in popular else 'auf Anfrage'}, "
+                f"{count} News ohne Übersetzung, ~{saved} Tokens gespart"
+            )
@@ -0,0 +1,48 @@
+"""Startet den lokalen OpenAI-Stub als eigenständigen Server.
+
+Die Anwendung nutzt ihn, wenn OPENAI_BASE_URL auf die ausgegebene Adresse zeigt.
+
+Aufruf: python manage.py openai_stub [--port 8765] [--latency 800] [--error-rate 0.02]
+"""
+
+from django.core.management.base import BaseCommand
+
+from news.management.openai_stub import OpenAIStubServer, StubConfig
+
+
+def add_stub_arguments(parser) -> None:
+    parser.add_argument("--latency", type=float, default=800.0, help="mittlere Latenz in ms")
+    parser.add_argument("--jitter", type=float, default=300.0, help="Standardabweichung in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil 500-Antworten")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Anteil 429-Antworten")
+    parser.add_argument("--tokens-per-call", type=int, help="feste Token-Nutzung pro Antwort")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def stub_config(options) -> StubConfig:
+    return StubConfig(
+        latency_ms=options["latency"],
+        jitter_ms=options["jitter"],
+        error_rate=options["error_rate"],
+        rate_limit_rate=options["rate_limit_rate"],
+        tokens_per_call=options["tokens_per_call"],
+        seed=options["seed"],
+    )
+
+
+class Command(BaseCommand):
+    help = "Startet einen lokalen Ersatz für die OpenAI Responses API"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8765)
+        add_stub_arguments(parser)
+
+    def handle(self, *args, **options):
+        server = OpenAIStubServer(options["port"], stub_config(options))
+        self.stdout.write(f"OpenAI-Stub läuft, OPENAI_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,221 @@
+"""Trainiert den lokalen Klassifikator für Inhaltskategorien und Zielgruppen.
+
+Trainingsdaten sind nur die per OpenAI kategorisierten News (categorized_by), lokal oder
+manuell kategorisierte würden die eigenen Vorhersagen verstärken. Ein Teil davon wird
+zurückgehalten, um Precision und Abdeckung zu messen und die Konfidenzschwelle zu
+wählen, ab der die lokale Vorhersage ohne OpenAI übernommen wird. Danach wird auf
+allen Daten neu trainiert und das Modell gespeichert.
+
+Aufruf: python manage.py train_category_classifier [--target-precision 0.9] [--dry-run]
+"""
+
+import random
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.models import CategoryClassifier, News, Text
+from news.services.categories import get_audience_categories, get_content_categories
+from news.services.processing.categorization.local_classifier import (
+    LocalClassifier,
+    Prediction,
+    document_terms,
+)
+
+MIN_TRAINING_SIZE = 100
+# Labels mit weniger Beispielen kann das Modell nicht sinnvoll lernen
+MIN_LABEL_COUNT = 5
+# Schwelle, wenn keine die Ziel-Precision erreicht: lokale Vorhersagen werden nie übernommen
+NEVER_CONFIDENT = 2.0
+
+
+def load_training_data() -> tuple[list[list[str]], list[set[str]]]:
+    """Deutsche Texte und Labels aller von OpenAI kategorisierten News."""
+    news = (
+        News.objects.filter(
+            is_cleaned_up=True,
+            canonical__isnull=True,
+            categorized_by=News.CATEGORIZED_BY_LLM,
+            inhaltskategorien__isnull=False,
+            zielgruppen__isnull=False,
+        )
+        .distinct()
+    )
+    ids = list(news.values_list("pk", flat=True))
+
+    labels: dict[int, set[str]] = defaultdict(set)
+    for news_id, name in News.inhaltskategorien.through.objects.filter(
+        news_id__in=ids
+    ).values_list("news_id", "inhaltskategorie__name_de"):
+        labels[news_id].add(name)
+    for news_id, name in News.zielgruppen.through.objects.filter(
+        news_id__in=ids
+    ).values_list("news_id", "zielgruppe__name_de"):
+        labels[news_id].add(name)
+
+    documents = []
+    document_labels = []
+    for news_id, titel, text in (
+        Text.objects.filter(news_id__in=ids, sprache__name="Deutsch")
+        .order_by("news_id")
+        .values_list("news_id", "news__titel", "text")
+        .iterator()
+    ):
+        documents.append(document_terms(titel, text))
+        document_labels.append(labels[news_id])
+    return documents, document_labels
+
+
+def choose_threshold(
+    predictions: list[Prediction], labels: list[set[str]], target_precision: float
+) -> float:
+    """Niedrigste Konfidenzschwelle, ab der die Precision die Zielvorgabe erreicht."""
+    scored = sorted(
+        (
+            (prediction.confidence, len(_predicted(prediction) & truth), len(_predicted(prediction)))
+            for prediction, truth in zip(predictions, labels)
+            if prediction.categories and prediction.audiences
+        ),
+        reverse=True,
+    )
+    threshold = NEVER_CONFIDENT
+    true_positives = predicted = 0
+    for confidence, hits, count in scored:
+        true_positives += hits
+        predicted += count
+        if true_positives / predicted >= target_precision:
+            threshold = confidence
+    return max(threshold, 0.5)
+
+
+def _predicted(prediction: Prediction) -> set[str]:
+    return {*prediction.categories, *prediction.audiences}
+
+
+def evaluate(
+    classifier: LocalClassifier,
+    predictions: list[Prediction],
+    labels: list[set[str]],
+    threshold: float,
+) -> dict:
+    """Precision und Recall gegenüber den zurückgehaltenen OpenAI-Labels."""
+    per_label = {}
+    for label in classifier.labels:
+        predicted = sum(label in _predicted(p) for p in predictions)
+        actual = sum(label in truth for truth in labels)
+        hits = sum(label in _predicted(p) and label in truth for p, truth in zip(predictions, labels))
+        per_label[label] = {
+            "precision": hits / predicted if predicted else None,
+            "recall": hits / actual if actual else None,
+            "support": actual,
+        }
+
+    def micro(selected: list[tuple[Prediction, set[str]]]) -> dict:
+        hits = sum(len(_predicted(p) & truth) for p, truth in selected)
+        predicted = sum(len(_predicted(p)) for p, _ in selected)
+        actual = sum(len(truth & set(classifier.labels)) for _, truth in selected)
+        exact = sum(_predicted(p) == truth & set(classifier.labels) for p, truth in selected)
+        return {
+            "items": len(selected),
+            "precision": hits / predicted if predicted else None,
+            "recall": hits / actual if actual else None,
+            "exact_match": exact / len(selected) if selected else None,
+        }
+
+    pairs = list(zip(predictions, labels))
+    confident = [
+        (p, truth)
+        for p, truth in pairs
+        if p.categories and p.audiences and p.confidence >= threshold
+    ]
+    return {
+        "holdout": micro(pairs),
+        "confident": {**micro(confident), "coverage": len(confident) / len(pairs)},
+        "labels": per_label,
+    }
+
+
+def _format(value) -> str:
+    return "–" if value is None else f"{value:.3f}"
+
+
+class Command(BaseCommand):
+    help = "Trainiert den lokalen Kategorie-Klassifikator und misst die Precision"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--holdout", type=float, default=0.2)
+        parser.add_argument("--target-precision", type=float, default=0.9)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--keep", type=int, default=3, help="so viele ältere Modelle behalten"
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Modell nicht speichern")
+
+    def handle(self, *args, **options):
+        documents, labels = load_training_data()
+        if len(documents) < MIN_TRAINING_SIZE:
+            raise CommandError(
+                f"Zu wenige kategorisierte News ({len(documents)}, mindestens {MIN_TRAINING_SIZE})"
+            )
+
+        counts: dict[str, int] = defaultdict(int)
+        for document_labels in labels:
+            for label in document_labels:
+                counts[label] += 1
+        categories = [c for c in get_content_categories() if counts[c] >= MIN_LABEL_COUNT]
+        audiences = [a for a in get_audience_categories() if counts[a] >= MIN_LABEL_COUNT]
+
+        order = list(range(len(documents)))
+        random.Random(options["seed"]).shuffle(order)
+        split = int(len(order) * (1 - options["holdout"]))
+        train, holdout = order[:split], order[split:]
+
+        classifier = LocalClassifier.train(
+            [documents[i] for i in train], [labels[i] for i in train], categories, audiences
+        )
+        holdout_labels = [labels[i] for i in holdout]
+        predictions = classifier.predict_many([documents[i] for i in holdout])
+        threshold = choose_threshold(predictions, holdout_labels, options["target_precision"])
+        metrics = evaluate(classifier, predictions, holdout_labels, threshold)
+
+        self.stdout.write(
+            f"{len(train)} Trainings-, {len(holdout)} Test-News, "
+            f"{len(categories)} Kategorien, {len(audiences)} Zielgruppen"
+        )
+        for label, values in metrics["labels"].items():
+            self.stdout.write(
+                f"  {label:<30} Precision {_format(values['precision'])}  "
+                f"Recall {_format(values['recall'])}  ({values['support']})"
+            )
+        overall = metrics["holdout"]
+        self.stdout.write(
+            f"Alle Test-News: Precision {_format(overall['precision'])}, "
+            f"Recall {_format(overall['recall'])}, exakt {_format(overall['exact_match'])}"
+        )
+        confident = metrics["confident"]
+        if threshold >= NEVER_CONFIDENT:
+            self.stdout.write(
+                f"Keine Schwelle erreicht Precision {options['target_precision']}, "
+                "alle News gehen weiterhin an OpenAI"
+            )
+        else:
+            self.stdout.write(
+                f"Schwelle {threshold:.3f}: {confident['coverage']:.1%} ohne OpenAI, "
+                f"Precision {_format(confident['precision'])}, "
+                f"exakt {_format(confident['exact_match'])}"
+            )
+
+        if options["dry_run"]:
+            return
+
+        # Für das gespeicherte Modell alle Daten nutzen, die Schwelle stammt aus dem Test
+        classifier = LocalClassifier.train(documents, labels, categories, audiences)
+        CategoryClassifier.objects.create(
+            model=classifier.to_bytes(),
+            threshold=threshold,
+            train_size=len(documents),
+            metrics=metrics,
+        )
+        outdated = CategoryClassifier.objects.values_list("pk", flat=True)[options["keep"] + 1 :]
+        CategoryClassifier.objects.filter(pk__in=list(outdated)).delete()
+        self.stdout.write(self.style.SUCCESS("Klassifikator gespeichert"))
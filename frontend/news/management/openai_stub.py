@@ -0,0 +1,176 @@
+"""Lokaler Ersatz für die OpenAI Responses API, für Durchsatz-Messungen ohne API-Key.
+
+Beantwortet POST /v1/responses deterministisch (abhängig vom Prompt) im Format, das
+Cleanup, Kategorisierung und Übersetzung erwarten. Latenz, Fehlerquote und die
+gemeldete Token-Nutzung sind einstellbar. Der OpenAI-Client wird über die
+Umgebungsvariable OPENAI_BASE_URL auf den Stub umgeleitet.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from news.services.categories import get_audience_categories, get_content_categories
+
+_TEXT = re.compile(r"Titel:\s*(.*?)\s*\n\nText:\s*(.*)", re.DOTALL)
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 800.0
+    jitter_ms: float = 300.0
+    # Anteil der Anfragen, die mit 500 bzw. 429 beantwortet werden
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Feste Token-Nutzung pro Antwort, sonst aus der Länge geschätzt
+    tokens_per_call: Optional[int] = None
+    seed: int = 0
+
+
+def _digest(prompt: str) -> int:
+    return int.from_bytes(hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def build_output(system_message: str, prompt: str) -> str:
+    """Antworttext passend zum Verarbeitungsschritt, erkannt am System-Prompt."""
+    match = _TEXT.search(prompt)
+    title, text = (match.group(1), match.group(2)) if match else ("", prompt)
+    digest = _digest(prompt)
+
+    if "[Inhaltskategorien]" in system_message:
+        categories = get_content_categories()
+        audiences = get_audience_categories()
+        chosen = {categories[digest % len(categories)], categories[(digest >> 8) % len(categories)]}
+        audience = audiences[(digest >> 16) % len(audiences)]
+        return f"[Inhaltskategorien] {', '.join(sorted(chosen))}\n[Publikumskategorien] {audience}"
+
+    if "[LANGUAGE:de]" in system_message:
+        return (
+            f"[LANGUAGE:de]\n[Titel] {title}\n[Text] {text}\n\n"
+            f"[LANGUAGE:en]\n[Titel] {title} (EN)\n[Text] {text}"
+        )
+
+    # Übersetzung
+    return f"[Titel] {title} (übersetzt)\n[Text] {text}"
+
+
+def _response_body(model: str, output: str, input_tokens: int, output_tokens: int) -> dict:
+    return {
+        "id": f"resp_{_digest(output):016x}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{_digest(output):016x}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": output, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "OpenAIStubServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/responses":
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        messages = request.get("input", [])
+        system_message = next((m["content"] for m in messages if m.get("role") == "developer"), "")
+        prompt = next((m["content"] for m in messages if m.get("role") == "user"), "")
+
+        config = self.server.config
+        delay, outcome = self.server.draw()
+        time.sleep(delay)
+
+        if outcome == "error":
+            self._send_json(500, {"error": {"message": "Stub: interner Fehler", "type": "server_error"}})
+            return
+        if outcome == "rate_limit":
+            self._send_json(429, {"error": {"message": "Stub: Rate-Limit", "type": "rate_limit_error"}})
+            return
+
+        output = build_output(system_message, prompt)
+        if config.tokens_per_call is not None:
+            input_tokens = config.tokens_per_call // 2
+            output_tokens = config.tokens_per_call - input_tokens
+        else:
+            input_tokens = (len(system_message) + len(prompt)) // 4
+            output_tokens = len(output) // 4
+        self.server.record(input_tokens + output_tokens)
+        self._send_json(
+            200,
+            _response_body(request.get("model", "stub"), output, input_tokens, output_tokens),
+        )
+
+
+class OpenAIStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, config: StubConfig):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def draw(self) -> tuple[float, str]:
+        """Latenz und Ergebnis der nächsten Anfrage (reproduzierbar über den Seed)."""
+        config = self.config
+        with self._lock:
+            delay = max(0.0, self._random.gauss(config.latency_ms, config.jitter_ms)) / 1000
+            roll = self._random.random()
+        if roll < config.error_rate:
+            return delay, "error"
+        if roll < config.error_rate + config.rate_limit_rate:
+            return delay, "rate_limit"
+        return delay, "ok"
+
+    def record(self, tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+
+    def start_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_alter_inhaltskategorie_slug_alter_quelle_slug_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['link'], name='news_link_idx'),
+        ),
+    ]
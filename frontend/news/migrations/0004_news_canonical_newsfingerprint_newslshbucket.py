@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_content_hash_news_link_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='news.news'),
+        ),
+        migrations.CreateModel(
+            name='NewsFingerprint',
+            fields=[
+                ('news', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='news.news')),
+                ('signature', models.BinaryField()),
+            ],
+            options={
+                'verbose_name_plural': 'News-Fingerprints',
+            },
+        ),
+        migrations.CreateModel(
+            name='NewsLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='news.news')),
+            ],
+            options={
+                'verbose_name_plural': 'News-LSH-Buckets',
+                'indexes': [models.Index(fields=['band', 'bucket'], name='news_lsh_band_bucket_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_news_canonical_newsfingerprint_newslshbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClassifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('model', models.BinaryField()),
+                ('threshold', models.FloatField()),
+                ('train_size', models.PositiveIntegerField()),
+                ('metrics', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'Kategorie-Klassifikatoren',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_categoryclassifier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CircuitBreaker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('window_started_at', models.DateTimeField(blank=True, null=True)),
+                ('open_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Circuit Breaker',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProcessingFailure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('cleanup', 'Cleanup'), ('categorization', 'Kategorisierung'), ('translation', 'Übersetzung')], max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('last_attempt_at', models.DateTimeField()),
+                ('next_attempt_at', models.DateTimeField()),
+                ('dead_lettered', models.BooleanField(default=False)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='processing_failures', to='news.news')),
+            ],
+            options={
+                'verbose_name': 'Verarbeitungsfehler',
+                'verbose_name_plural': 'Verarbeitungsfehler',
+                'indexes': [models.Index(fields=['stage', 'next_attempt_at'], name='processing_failure_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('news', 'stage'), name='unique_processing_failure_stage')],
+            },
+        ),
+    ]
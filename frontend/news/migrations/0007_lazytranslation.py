@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_circuitbreaker_processingfailure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LazyTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lazy_translations', to='news.news')),
+                ('sprache', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lazy_translations', to='news.sprache')),
+            ],
+            options={
+                'verbose_name': 'Übersetzung auf Anfrage',
+                'verbose_name_plural': 'Übersetzungen auf Anfrage',
+                'indexes': [models.Index(fields=['sprache', 'requested_at'], name='lazy_translation_traffic_idx')],
+                'constraints': [models.UniqueConstraint(fields=('news', 'sprache'), name='unique_lazy_translation_sprache')],
+            },
+        ),
+    ]
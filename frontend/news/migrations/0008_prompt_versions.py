@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+# Versionen der Prompts und Kategorien zum Zeitpunkt dieser Migration. Bereits
+# verarbeitete News werden damit gekennzeichnet, sonst gälten sie alle als veraltet.
+CLEANUP_VERSION = "f6274f4e60fe"
+CATEGORIZATION_VERSION = "c31cd552ff86"
+TRANSLATION_VERSION = "fcd97d80969c"
+CATEGORY_SET_VERSION = "a0e07791a954"
+
+
+def stamp_existing(apps, schema_editor):
+    News = apps.get_model("news", "News")
+    Text = apps.get_model("news", "Text")
+
+    cleaned = Text.objects.filter(news__is_cleaned_up=True)
+    cleaned.filter(sprache__code__in=["de", "en"]).update(prompt_version=CLEANUP_VERSION)
+    cleaned.exclude(sprache__code__in=["de", "en"]).update(
+        prompt_version=TRANSLATION_VERSION
+    )
+    categorized = News.objects.filter(inhaltskategorien__isnull=False).values("pk")
+    News.objects.filter(pk__in=categorized).update(
+        categorization_prompt_version=CATEGORIZATION_VERSION,
+        category_set_version=CATEGORY_SET_VERSION,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_lazytranslation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='categorization_prompt_version',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='category_set_version',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='openaitokenusage',
+            name='reprocessing_tokens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='text',
+            name='prompt_version',
+            field=models.CharField(blank=True, default='', max_length=12),
+        ),
+        migrations.RunPython(stamp_existing, migrations.RunPython.noop),
+    ]
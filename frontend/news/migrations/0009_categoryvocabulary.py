@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_prompt_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryVocabulary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('version', models.CharField(max_length=12)),
+                ('entries', models.JSONField()),
+            ],
+            options={
+                'verbose_name': 'Kategorien-Stand',
+                'verbose_name_plural': 'Kategorien-Stände',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Suchvektor je Text in der Textsuchkonfiguration seiner Sprache, Titel höher
+# gewichtet als der Text. HTML-Tags werden vor dem Zerlegen entfernt. Die
+# Zuordnung muss zu SEARCH_CONFIGS in news/services/search.py passen.
+CREATE_TRIGGER = """
+CREATE FUNCTION news_text_search_vector_update() RETURNS trigger AS $$
+DECLARE
+    config regconfig;
+BEGIN
+    SELECT CASE code
+        WHEN 'de' THEN 'german'
+        WHEN 'en' THEN 'english'
+        WHEN 'fr' THEN 'french'
+        WHEN 'es' THEN 'spanish'
+        ELSE 'simple'
+    END::regconfig INTO config
+    FROM news_sprache WHERE id = NEW.sprache_id;
+
+    NEW.search_vector :=
+        setweight(to_tsvector(coalesce(config, 'simple'), coalesce(NEW.titel, '')), 'A')
+        || setweight(
+            to_tsvector(
+                coalesce(config, 'simple'),
+                regexp_replace(coalesce(NEW.text, ''), '<[^>]*>', ' ', 'g')
+            ),
+            'B'
+        );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER news_text_search_vector
+    BEFORE INSERT OR UPDATE OF titel, text, sprache_id ON news_text
+    FOR EACH ROW EXECUTE FUNCTION news_text_search_vector_update();
+
+UPDATE news_text SET titel = titel;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS news_text_search_vector ON news_text;
+DROP FUNCTION IF EXISTS news_text_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_categoryvocabulary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='text',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='text',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='text_search_vector_gin'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:50
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Indizes ohne Tabellensperre anlegen, Text.text ist groß
+    atomic = False
+
+    dependencies = [
+        ('news', '0010_text_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('titel'), name='gin_trgm_ops'), name='news_titel_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='text',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('titel'), name='gin_trgm_ops'), name='text_titel_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='text',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('text'), name='gin_trgm_ops'), name='text_text_trgm'),
+        ),
+    ]
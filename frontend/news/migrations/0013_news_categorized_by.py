@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:10
+
+from django.db import migrations, models
+
+
+def mark_existing(apps, schema_editor):
+    """Herkunft bereits kategorisierter News nachtragen, soweit sie sicher bekannt ist.
+
+    Vor dem ersten lokalen Klassifikator hat nur OpenAI kategorisiert. Danach ist die
+    Herkunft unbekannt, solche News bleiben leer und fließen nicht ins Training ein.
+    """
+    News = apps.get_model("news", "News")
+    CategoryClassifier = apps.get_model("news", "CategoryClassifier")
+
+    categorized = News.objects.filter(
+        pk__in=News.objects.filter(inhaltskategorien__isnull=False).values("pk")
+    )
+    # Bei Trusted Accounts sind manuelle Kategorien beigemischt
+    categorized.filter(quelle_typ="Trusted Account").update(categorized_by="manual")
+
+    llm = categorized.exclude(quelle_typ="Trusted Account")
+    first_classifier = CategoryClassifier.objects.order_by("created_at").first()
+    if first_classifier is not None:
+        llm = llm.filter(created_at__lt=first_classifier.created_at)
+    llm.update(categorized_by="llm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0012_reprocessingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='categorized_by',
+            field=models.CharField(blank=True, choices=[('llm', 'OpenAI'), ('local', 'Lokaler Klassifikator'), ('manual', 'Manuell')], default='', editable=False, max_length=10),
+        ),
+        migrations.RunPython(mark_existing, migrations.RunPython.noop),
+    ]
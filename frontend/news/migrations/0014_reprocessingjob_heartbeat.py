@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0013_news_categorized_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reprocessingjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reprocessingjob',
+            name='runner',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
@@ -115,6 +119,16 @@ class Zielgruppe(models.Model):
 
 
 class News(models.Model):
+    CATEGORIZED_BY_LLM = "llm"
+    CATEGORIZED_BY_LOCAL = "local"
+    CATEGORIZED_BY_MANUAL = "manual"
+
+    CATEGORIZED_BY_CHOICES = [
+        (CATEGORIZED_BY_LLM, "OpenAI"),
+        (CATEGORIZED_BY_LOCAL, "Lokaler Klassifikator"),
+        (CATEGORIZED_BY_MANUAL, "Manuell"),
+    ]
+
     id = models.AutoField(primary_key=True)
 
     link = models.URLField(
@@ -146,6 +160,28 @@ class News(models.Model):
 
     is_cleaned_up = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=now, editable=False)
+    # SHA-256 des normalisierten Originaltexts, um Änderungen an der Quelle zu erkennen
+    content_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
+    # Kanonische News, falls diese News ein Beinahe-Duplikat aus einer anderen Quelle ist
+    canonical = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="duplicates",
+    )
+    # Versionen von Prompt und Kategorienliste, mit denen die Kategorisierung entstand
+    categorization_prompt_version = models.CharField(
+        max_length=12, blank=True, default="", editable=False
+    )
+    category_set_version = models.CharField(
+        max_length=12, blank=True, default="", editable=False
+    )
+    # Herkunft der Kategorien, trainiert wird der lokale Klassifikator nur auf OpenAI-Labels
+    categorized_by = models.CharField(
+        max_length=10, choices=CATEGORIZED_BY_CHOICES, blank=True, default="", editable=False
+    )
+    view_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.titel
@@ -158,11 +194,13 @@ class News(models.Model):
         if not lang_code:
             return self.titel
 
-        translation = self.texte.filter(sprache__code=lang_code).first()
-        if translation:
-            return translation.titel
-
-        return self.titel
+        # Ohne Übersetzung in die Sprache den englischen Titel verwenden
+        titles = dict(
+            self.texte.filter(sprache__code__in=[lang_code, "en"]).values_list(
+                "sprache__code", "titel"
+            )
+        )
+        return titles.get(lang_code) or titles.get("en") or self.titel
 
     class Meta:
         verbose_name_plural = "News"
@@ -172,6 +210,39 @@ class News(models.Model):
                 name="unique_news_titel_erstellungsdatum",
             )
         ]
+        indexes = [
+            models.Index(fields=["link"], name="news_link_idx"),
+            # Trigramm-Index für die Admin-Suche (icontains vergleicht UPPER(titel))
+            GinIndex(OpClass(Upper("titel"), name="gin_trgm_ops"), name="news_titel_trgm"),
+        ]
+
+
+class NewsFingerprint(models.Model):
+    """MinHash-Signatur des Originaltexts einer News für die Duplikaterkennung."""
+
+    news = models.OneToOneField(
+        News, on_delete=models.CASCADE, primary_key=True, related_name="fingerprint"
+    )
+    signature = models.BinaryField()
+
+    class Meta:
+        verbose_name_plural = "News-Fingerprints"
+
+
+class NewsLSHBucket(models.Model):
+    """LSH-Bucket eines Bands der MinHash-Signatur, über den Kandidaten gesucht werden."""
+
+    news = models.ForeignKey(
+        News, on_delete=models.CASCADE, related_name="lsh_buckets"
+    )
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        verbose_name_plural = "News-LSH-Buckets"
+        indexes = [
+            models.Index(fields=["band", "bucket"], name="news_lsh_band_bucket_idx")
+        ]
 
 
 class Sprache(models.Model):
@@ -191,6 +262,10 @@ class Text(models.Model):
     text = models.TextField()
     titel = models.CharField()
     sprache = models.ForeignKey(Sprache, on_delete=models.PROTECT)
+    # Version des Prompts (Cleanup oder Übersetzung), leer beim noch nicht gecleanten Originaltext
+    prompt_version = models.CharField(max_length=12, blank=True, default="")
+    # Wird per Datenbank-Trigger aus Titel und Text in der Konfiguration der Sprache gefüllt
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return f"{self.news.titel} - {self.sprache.name}"
@@ -202,6 +277,12 @@ class Text(models.Model):
                 fields=["news", "sprache"], name="unique_news_sprache"
             )
         ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="text_search_vector_gin"),
+            # Trigramm-Indizes für die Admin-Suche (icontains vergleicht UPPER(feld))
+            GinIndex(OpClass(Upper("titel"), name="gin_trgm_ops"), name="text_titel_trgm"),
+            GinIndex(OpClass(Upper("text"), name="gin_trgm_ops"), name="text_text_trgm"),
+        ]
 
 
 # User
@@ -312,6 +393,8 @@ class CalendarEvent(models.Model):
 class OpenAITokenUsage(models.Model):
     date = models.DateField(unique=True)
     used_tokens = models.PositiveIntegerField(default=0)
+    # Davon (geschätzt) für das Nachziehen veralteter Ergebnisse
+    reprocessing_tokens = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.date}: {self.used_tokens} tokens"
@@ -319,3 +402,206 @@ class OpenAITokenUsage(models.Model):
     class Meta:
         verbose_name_plural = "OpenAI Token Usage"
         ordering = ["-date"]
+
+
+class CategoryClassifier(models.Model):
+    """Lokal trainierter Klassifikator für Inhaltskategorien und Zielgruppen."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    model = models.BinaryField()
+    # Ab dieser Konfidenz wird die lokale Vorhersage ohne OpenAI übernommen
+    threshold = models.FloatField()
+    train_size = models.PositiveIntegerField()
+    metrics = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"Klassifikator vom {self.created_at:%d.%m.%Y %H:%M}"
+
+    class Meta:
+        verbose_name_plural = "Kategorie-Klassifikatoren"
+        ordering = ["-created_at"]
+
+
+class CategoryVocabulary(models.Model):
+    """Zuletzt synchronisierter Stand der Inhaltskategorien und Zielgruppen aus categories.json."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    version = models.CharField(max_length=12)
+    entries = models.JSONField()
+
+    def __str__(self):
+        return f"{self.version} ({self.created_at:%d.%m.%Y %H:%M})"
+
+    class Meta:
+        verbose_name = "Kategorien-Stand"
+        verbose_name_plural = "Kategorien-Stände"
+        ordering = ["-created_at"]
+
+
+class ProcessingFailure(models.Model):
+    """Fehlgeschlagene Versuche eines OpenAI-Verarbeitungsschritts für eine News."""
+
+    STAGE_CLEANUP = "cleanup"
+    STAGE_CATEGORIZATION = "categorization"
+    STAGE_TRANSLATION = "translation"
+
+    STAGE_CHOICES = [
+        (STAGE_CLEANUP, "Cleanup"),
+        (STAGE_CATEGORIZATION, "Kategorisierung"),
+        (STAGE_TRANSLATION, "Übersetzung"),
+    ]
+
+    news = models.ForeignKey(
+        News, on_delete=models.CASCADE, related_name="processing_failures"
+    )
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    last_attempt_at = models.DateTimeField()
+    next_attempt_at = models.DateTimeField()
+    # Nach zu vielen Fehlversuchen nur noch manuell über den Admin erneut einreihen
+    dead_lettered = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.news.titel[:50]} – {self.get_stage_display()} ({self.attempts})"
+
+    class Meta:
+        verbose_name = "Verarbeitungsfehler"
+        verbose_name_plural = "Verarbeitungsfehler"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["news", "stage"], name="unique_processing_failure_stage"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["stage", "next_attempt_at"],
+                name="processing_failure_due_idx",
+            )
+        ]
+
+
+class LazyTranslation(models.Model):
+    """Beim Lesen angeforderte Übersetzung in eine Sprache, die nicht vorab übersetzt wird."""
+
+    news = models.ForeignKey(
+        News, on_delete=models.CASCADE, related_name="lazy_translations"
+    )
+    sprache = models.ForeignKey(
+        Sprache, on_delete=models.CASCADE, related_name="lazy_translations"
+    )
+    requested_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.news.titel[:50]} – {self.sprache.name}"
+
+    class Meta:
+        verbose_name = "Übersetzung auf Anfrage"
+        verbose_name_plural = "Übersetzungen auf Anfrage"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["news", "sprache"], name="unique_lazy_translation_sprache"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["sprache", "requested_at"],
+                name="lazy_translation_traffic_idx",
+            )
+        ]
+
+
+class CircuitBreaker(models.Model):
+    """Gemeinsamer Zustand aller Prozesse, pausiert OpenAI-Aufrufe nach gehäuften Fehlern."""
+
+    name = models.CharField(max_length=50, unique=True)
+    failures = models.PositiveIntegerField(default=0)
+    window_started_at = models.DateTimeField(null=True, blank=True)
+    open_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name_plural = "Circuit Breaker"
+
+
+class ReprocessingJob(models.Model):
+    """Im Admin angestoßene Neuverarbeitung ausgewählter News in einem Schritt."""
+
+    # Celery-Priorität, mit Redis gilt 0 als höchste
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 5
+    PRIORITY_LOW = 9
+
+    PRIORITY_CHOICES = [
+        (PRIORITY_HIGH, "Hoch"),
+        (PRIORITY_NORMAL, "Normal"),
+        (PRIORITY_LOW, "Niedrig"),
+    ]
+
+    # Ohne Lebenszeichen so lange gilt ein laufender Auftrag als hängengeblieben
+    # (Worker neu gestartet), länger dauert keine einzelne News
+    HEARTBEAT_TIMEOUT = timedelta(minutes=15)
+
+    stage = models.CharField(max_length=20, choices=ProcessingFailure.STAGE_CHOICES)
+    priority = models.PositiveSmallIntegerField(
+        choices=PRIORITY_CHOICES, default=PRIORITY_NORMAL
+    )
+    # In der Reihenfolge der Abarbeitung, bei Fortsetzung ab Position done + failed
+    news_ids = models.JSONField(default=list)
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    # Laut OpenAI-Antworten verbraucht, geschätzt nur bei Antworten ohne Usage-Angabe
+    tokens = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Lebenszeichen des ausführenden Tasks, vor jeder News erneuert
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Kennung des ausführenden Tasks, ein neu gestarteter übernimmt und der alte hört auf
+    runner = models.CharField(max_length=32, blank=True, editable=False)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.get_stage_display()} für {self.total} News ({self.created_at:%d.%m.%Y %H:%M})"
+
+    @property
+    def is_stale(self) -> bool:
+        if self.finished_at is not None or self.started_at is None:
+            return False
+        return (self.heartbeat_at or self.started_at) < now() - self.HEARTBEAT_TIMEOUT
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.failed
+
+    @property
+    def status(self) -> str:
+        if self.finished_at is not None:
+            return "abgebrochen" if self.processed < self.total else "fertig"
+        if self.is_stale:
+            return "hängt"
+        return "läuft" if self.started_at is not None else "wartet"
+
+    @property
+    def news_per_minute(self) -> Optional[float]:
+        if self.started_at is None or not self.processed:
+            return None
+        seconds = ((self.finished_at or now()) - self.started_at).total_seconds()
+        return self.processed / max(seconds, 1) * 60
+
+    class Meta:
+        verbose_name = "Neuverarbeitung"
+        verbose_name_plural = "Neuverarbeitungen"
+        ordering = ["-created_at"]
@@ -0,0 +1,75 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from ..models import News
+
+STATUS_NEW = "new"
+STATUS_UNCHANGED = "unchanged"
+STATUS_MODIFIED = "modified"
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Bei diesen Quellentypen ist der Link eine freie Nutzereingabe und identifiziert keine News
+UNLINKED_SOURCE_TYPES = {"Trusted Account"}
+
+
+def normalize(value: str) -> str:
+    """Leerraum vereinheitlichen, damit reine Formatierungsänderungen nicht als Änderung zählen."""
+    return _WHITESPACE.sub(" ", value or "").strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ChangeResult:
+    status: str
+    news: Optional[News] = None
+    title_changed: bool = False
+    text_changed: bool = False
+
+
+def find_existing_news(
+    link: str, titel: str, erstellungsdatum: datetime, quelle_typ: str
+) -> Optional[News]:
+    """Bereits gespeicherte News zum Eintrag finden, bevorzugt über den Link der Quelle.
+
+    Gesucht wird nur unter News desselben Quellentyps, damit z. B. eine Rundmail und ein
+    Trusted Account mit demselben Link nicht gegenseitig als Änderung gelten. Einreichungen
+    von Trusted Accounts werden nur über Titel und Erstellungsdatum zugeordnet, da zwei
+    verschiedene Einreichungen denselben Link angeben können.
+    """
+    fields = ("id", "titel", "link", "content_hash", "is_cleaned_up")
+    candidates = News.objects.filter(quelle_typ=quelle_typ).only(*fields)
+    if link and quelle_typ not in UNLINKED_SOURCE_TYPES:
+        news = candidates.filter(link=link).order_by("-id").first()
+        if news is not None:
+            return news
+    return candidates.filter(titel=titel, erstellungsdatum=erstellungsdatum).first()
+
+
+def classify_entry(
+    link: str, titel: str, text: str, erstellungsdatum: datetime, quelle_typ: str
+) -> ChangeResult:
+    """Eintrag als neu, unverändert oder geändert einordnen."""
+    news = find_existing_news(link, titel, erstellungsdatum, quelle_typ)
+    if news is None:
+        return ChangeResult(STATUS_NEW)
+
+    new_hash = content_hash(text)
+    title_changed = normalize(news.titel) != normalize(titel)
+
+    if not news.content_hash:
+        # News aus der Zeit vor der Änderungserkennung: Hash übernehmen, Text gilt als unverändert
+        news.content_hash = new_hash
+        news.save(update_fields=["content_hash"])
+
+    text_changed = news.content_hash != new_hash
+    if not title_changed and not text_changed:
+        return ChangeResult(STATUS_UNCHANGED, news)
+
+    return ChangeResult(STATUS_MODIFIED, news, title_changed, text_changed)
@@ -0,0 +1,117 @@
+import hashlib
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import get_template
+
+from .processing.versions import category_set_version
+
+# Gecachte Fragmente je Art und das Template, in dem sie gerendert werden
+FRAGMENT_TEMPLATES = {
+    "card": "news/partials/_news_card.html",
+    "detail": "news/partials/_news_detail.html",
+}
+# Begrenzt, wie lange Fragmente nach einem Deployment mit geänderten Übersetzungen bleiben
+FRAGMENT_TIMEOUT = 24 * 60 * 60
+
+_VERSION_KEY = "news-fragment-version:{}"
+_STATS_KEY = "news-fragment-stats:{}:{}"
+
+
+@dataclass
+class Fragment:
+    key: str
+    html: Optional[str] = None
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def bump_versions(news_ids: Iterable[Optional[int]]) -> None:
+    """Neue Inhaltsversion vergeben, bisher gecachte Fragmente der News werden nicht mehr gelesen."""
+    versions = {_VERSION_KEY.format(pk): _new_version() for pk in set(news_ids) if pk}
+    if versions:
+        cache.set_many(versions, timeout=None)
+
+
+def bump_versions_on_commit(news_ids: Iterable[Optional[int]]) -> None:
+    """Wie bump_versions, aber erst nach dem Commit, damit kein Leser vorher den alten
+    Stand unter der neuen Version ablegt."""
+    ids = set(news_ids)
+    transaction.on_commit(lambda: bump_versions(ids))
+
+
+def _versions(news_ids: list[int]) -> dict[int, str]:
+    keys = {_VERSION_KEY.format(pk): pk for pk in news_ids}
+    found = cache.get_many(keys)
+    # Verdrängte Versionen neu vergeben, alte Fragmente sind damit ebenfalls ungültig
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+@lru_cache(maxsize=None)
+def template_version(kind: str) -> str:
+    """Version des Templates und der Kategorien-Emojis, ändert sich mit jedem Deployment
+    einer geänderten Datei."""
+    source = get_template(FRAGMENT_TEMPLATES[kind]).template.source
+    return hashlib.sha256(f"{source}{category_set_version()}".encode("utf-8")).hexdigest()[:8]
+
+
+def _record(kind: str, hits: int, misses: int) -> None:
+    for outcome, count in (("hits", hits), ("misses", misses)):
+        if count:
+            key = _STATS_KEY.format(kind, outcome)
+            cache.add(key, 0, timeout=None)
+            cache.incr(key, count)
+
+
+def lookup_fragments(kind: str, news_ids: list[int], language: str) -> dict[int, Fragment]:
+    """Gecachte Fragmente einer Art für mehrere News, mit zwei Cache-Zugriffen für alle.
+
+    Der Schlüssel enthält News, Sprache, Inhalts- und Template-Version. Fehlt ein Fragment,
+    bleibt html None und das Template rendert und speichert es.
+    """
+    versions = _versions(news_ids)
+    fragments = {
+        pk: Fragment(
+            f"news-fragment:{kind}:{pk}:{language}:{versions[pk]}:{template_version(kind)}"
+        )
+        for pk in news_ids
+    }
+    cached = cache.get_many([fragment.key for fragment in fragments.values()])
+    for fragment in fragments.values():
+        fragment.html = cached.get(fragment.key)
+
+    hits = sum(fragment.html is not None for fragment in fragments.values())
+    _record(kind, hits, len(fragments) - hits)
+    return fragments
+
+
+def store_fragment(fragment: Fragment, html: str) -> None:
+    fragment.html = html
+    cache.set(fragment.key, html, FRAGMENT_TIMEOUT)
+
+
+def fragment_stats(kind: str) -> tuple[int, int]:
+    """Treffer und Fehlzugriffe seit dem letzten Zurücksetzen."""
+    hits_key, misses_key = (_STATS_KEY.format(kind, outcome) for outcome in ("hits", "misses"))
+    stats = cache.get_many([hits_key, misses_key])
+    return stats.get(hits_key, 0), stats.get(misses_key, 0)
+
+
+def reset_stats() -> None:
+    cache.delete_many(
+        [
+            _STATS_KEY.format(kind, outcome)
+            for kind in FRAGMENT_TEMPLATES
+            for outcome in ("hits", "misses")
+        ]
+    )
@@ -0,0 +1,181 @@
+import hashlib
+import html
+import re
+import struct
+from typing import Optional, Sequence
+
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import News, NewsFingerprint, NewsLSHBucket, Text
+
+# 64 Hashfunktionen in 16 Bändern à 4 Zeilen: Paare ab etwa 50 % Ähnlichkeit werden Kandidaten
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+# Ab dieser geschätzten Jaccard-Ähnlichkeit gilt eine News als Beinahe-Duplikat
+SIMILARITY_THRESHOLD = 0.8
+# Kurze Texte ähneln sich zu leicht, daher erst ab dieser Wortanzahl vergleichen
+MIN_WORDS = 20
+# Obergrenze für die Anzahl exakt verglichener Kandidaten
+MAX_CANDIDATES = 200
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"\w+")
+_SIGNATURE_FORMAT = f"<{NUM_PERMUTATIONS}I"
+_BAND_FORMAT = f"<{ROWS_PER_BAND}I"
+
+
+def normalize_words(text: str) -> list[str]:
+    """HTML entfernen und den Text in kleingeschriebene Wörter zerlegen."""
+    return _WORD.findall(html.unescape(_TAG.sub(" ", text or "")).lower())
+
+
+def minhash_signature(text: str) -> Optional[tuple[int, ...]]:
+    """MinHash-Signatur über Wort-Shingles, None bei zu kurzen Texten."""
+    words = normalize_words(text)
+    if len(words) < MIN_WORDS:
+        return None
+
+    shingles = {
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+    # SHAKE-128 liefert pro Shingle 64 unabhängige 32-Bit-Hashwerte in einem Aufruf
+    hashes = (
+        struct.unpack(
+            _SIGNATURE_FORMAT,
+            hashlib.shake_128(shingle.encode("utf-8")).digest(4 * NUM_PERMUTATIONS),
+        )
+        for shingle in shingles
+    )
+    return tuple(map(min, zip(*hashes)))
+
+
+def band_buckets(signature: Sequence[int]) -> list[int]:
+    """Je Band ein 64-Bit-Bucket (vorzeichenbehaftet, passend für BigIntegerField)."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(_BAND_FORMAT, *rows), digest_size=8)
+        buckets.append(int.from_bytes(digest.digest(), "little", signed=True))
+    return buckets
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Geschätzte Jaccard-Ähnlichkeit zweier Signaturen."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERMUTATIONS
+
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(data: bytes) -> tuple[int, ...]:
+    return struct.unpack(_SIGNATURE_FORMAT, bytes(data))
+
+
+def find_similar(
+    signature: Sequence[int], exclude_id: Optional[int] = None
+) -> Optional[tuple[int, float]]:
+    """Ähnlichste indizierte News (ID, Ähnlichkeit) oberhalb des Schwellwerts suchen."""
+    buckets = band_buckets(signature)
+    bucket_filter = Q()
+    for band, bucket in enumerate(buckets):
+        bucket_filter |= Q(band=band, bucket=bucket)
+
+    candidates = NewsLSHBucket.objects.filter(bucket_filter)
+    if exclude_id is not None:
+        candidates = candidates.exclude(news_id=exclude_id)
+    candidate_ids = list(
+        candidates.values_list("news_id", flat=True).distinct()[:MAX_CANDIDATES]
+    )
+    if not candidate_ids:
+        return None
+
+    best: Optional[tuple[int, float]] = None
+    for news_id, data in NewsFingerprint.objects.filter(
+        news_id__in=candidate_ids
+    ).values_list("news_id", "signature"):
+        score = similarity(signature, unpack_signature(data))
+        if score >= SIMILARITY_THRESHOLD and (best is None or score > best[1]):
+            best = (news_id, score)
+    return best
+
+
+def index_news(news: News, text: str) -> Optional[News]:
+    """Signatur einer News speichern und sie ggf. mit ihrer kanonischen News verknüpfen.
+
+    Gibt die kanonische News zurück, falls ein Beinahe-Duplikat gefunden wurde.
+    """
+    signature = minhash_signature(text)
+
+    with transaction.atomic():
+        NewsLSHBucket.objects.filter(news=news).delete()
+        if signature is None:
+            NewsFingerprint.objects.filter(news=news).delete()
+            canonical = None
+        else:
+            match = find_similar(signature, exclude_id=news.pk)
+            canonical = None
+            if match is not None:
+                # Immer auf die ursprüngliche News verweisen, keine Ketten von Duplikaten
+                canonical = News.objects.get(pk=match[0])
+                if canonical.canonical_id is not None:
+                    canonical = News.objects.get(pk=canonical.canonical_id)
+
+            NewsFingerprint.objects.update_or_create(
+                news=news, defaults={"signature": pack_signature(signature)}
+            )
+            NewsLSHBucket.objects.bulk_create(
+                NewsLSHBucket(news=news, band=band, bucket=bucket)
+                for band, bucket in enumerate(band_buckets(signature))
+            )
+
+        if news.canonical_id != (canonical.pk if canonical else None):
+            news.canonical = canonical
+            news.save(update_fields=["canonical"])
+
+    return canonical
+
+
+def reuse_processed_content(news: News, canonical: News) -> bool:
+    """Texte, Kategorien und Zielgruppen der kanonischen News übernehmen.
+
+    Nur bei inhaltlich gleichem Originaltext (gleicher content_hash), ein bloß ähnlicher
+    Text kann andere Termine oder Orte enthalten und wird selbst verarbeitet. Gibt False
+    zurück, wenn nichts übernommen wurde.
+    """
+    if not canonical.is_cleaned_up:
+        return False
+    if not news.content_hash or news.content_hash != canonical.content_hash:
+        return False
+
+    with transaction.atomic():
+        Text.objects.filter(news=news).delete()
+        Text.objects.bulk_create(
+            Text(
+                news=news,
+                sprache_id=text.sprache_id,
+                titel=text.titel,
+                text=text.text,
+                prompt_version=text.prompt_version,
+            )
+            for text in canonical.texte.all()
+        )
+        news.inhaltskategorien.add(*canonical.inhaltskategorien.all())
+        news.zielgruppen.add(*canonical.zielgruppen.all())
+        news.is_cleaned_up = True
+        news.categorization_prompt_version = canonical.categorization_prompt_version
+        news.category_set_version = canonical.category_set_version
+        news.categorized_by = canonical.categorized_by
+        news.save(
+            update_fields=[
+                "is_cleaned_up",
+                "categorization_prompt_version",
+                "category_set_version",
+                "categorized_by",
+            ]
+        )
+    return True
@@ -3,7 +3,8 @@ from __future__ import annotations
 from collections import defaultdict
 from typing import TYPE_CHECKING, Any, Iterable, Mapping, TypeVar, cast
 
-from django.db.models import Model, Q
+from django.db.models import Count, Model, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.query import QuerySet
 from django.utils import translation
 
@@ -240,6 +241,20 @@ def get_filtered_queryset(active_filters: FilterParams) -> QuerySet["News"]:
     if source_filter:
         queryset = queryset.filter(source_filter)
 
+    # Beinahe-Duplikate ausblenden, wenn ihre kanonische News ebenfalls im Ergebnis ist
+    queryset = queryset.exclude(canonical__in=queryset.values("pk"))
+
+    duplicate_count = (
+        News.objects.filter(canonical=OuterRef("pk"))
+        .order_by()
+        .values("canonical")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    queryset = queryset.annotate(
+        duplicate_count=Coalesce(Subquery(duplicate_count), 0)
+    )
+
     return queryset.distinct().order_by("-erstellungsdatum")
 
 
@@ -1,12 +1,24 @@
+import logging
 import os
 import re
 
-from django.db.models import F
 from openai import OpenAI
 
-from ....models import OpenAITokenUsage
+from ....models import News
 from ...categories import get_audience_categories, get_content_categories
-from ..common import release_tokens, reserve_tokens
+from ..circuit_breaker import (
+    ensure_llm_available,
+    is_upstream_error,
+    record_upstream_error,
+)
+from ..common import (
+    TokenLimitReached,
+    record_used_tokens,
+    release_tokens,
+    reserve_tokens,
+)
+from ..prompt_preprocessing import prepare_prompt_text
+from .local_classifier import predict_categories
 
 
 def get_categorization_from_openai(
@@ -21,10 +33,11 @@ def get_categorization_from_openai(
     categories = get_content_categories()
     audiences = get_audience_categories()
 
+    ensure_llm_available()
     usage = reserve_tokens(1500, token_limit)
 
     if usage is None:
-        raise Exception("Token-Limit erreicht.")
+        raise TokenLimitReached("Token-Limit erreicht.")
 
     openai = OpenAI(api_key=openai_api_key)
 
@@ -38,7 +51,9 @@ def get_categorization_from_openai(
         "%Inhaltskategorien%", ", ".join(categories)
     ).replace("%Publikumskategorien%", ", ".join(audiences))
 
-    prompt = f"Titel: {arctile_heading}\n\nText: {article_text}"
+    # Für die Kategorisierung sind die Links selbst unerheblich
+    prompt_text, _ = prepare_prompt_text(article_text)
+    prompt = f"Titel: {arctile_heading}\n\nText: {prompt_text}"
 
     try:
         response = openai.responses.create(
@@ -54,15 +69,13 @@ def get_categorization_from_openai(
         )
     except Exception as e:
         release_tokens(usage, 1500)
+        if is_upstream_error(e):
+            record_upstream_error(e)
         raise e
 
     release_tokens(usage, 1500)
 
-    if response.usage:
-        OpenAITokenUsage.objects.filter(pk=usage.pk).update(
-            used_tokens=F("used_tokens") + response.usage.total_tokens
-        )
-        usage.refresh_from_db()
+    record_used_tokens(usage, response)
 
     match = re.search(
         r"\[Inhaltskategorien\]\s*(.*?)\s*\[Publikumskategorien\]\s*(.*)",
@@ -86,3 +99,28 @@ def get_categorization_from_openai(
             raise Exception(f"Unbekannte Zielgruppe: {audience}")
 
     return categories_chatgpt, audiences_chatgpt
+
+
+def get_categorization(
+    arctile_heading: str,
+    article_text: str,
+    openai_api_key: str,
+    token_limit: int,
+    logger: logging.Logger,
+) -> tuple[list[str], list[str], str]:
+    """Eindeutige Fälle lokal kategorisieren, nur unsichere Vorhersagen an OpenAI geben.
+
+    Gibt Inhaltskategorien, Zielgruppen und die Herkunft (News.CATEGORIZED_BY_*) zurück.
+    """
+    prediction = predict_categories(arctile_heading, article_text)
+    if prediction is not None and prediction.is_confident:
+        logger.info(
+            f"Lokal kategorisiert (Konfidenz {prediction.confidence:.2f}) | {arctile_heading[:80]}"
+        )
+        return prediction.categories, prediction.audiences, News.CATEGORIZED_BY_LOCAL
+
+    categories, audiences = get_categorization_from_openai(
+        arctile_heading, article_text, openai_api_key, token_limit
+    )
+    return categories, audiences, News.CATEGORIZED_BY_LLM
+
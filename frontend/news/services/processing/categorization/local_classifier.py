@@ -0,0 +1,227 @@
+import io
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from scipy import optimize, sparse
+from scipy.special import expit
+
+from ....models import CategoryClassifier
+from ...near_duplicates import normalize_words
+
+# Wörter und Wortpaare, die in weniger Dokumenten vorkommen, werden ignoriert
+MIN_DOCUMENT_FREQUENCY = 2
+MAX_FEATURES = 50_000
+# Stärke der L2-Regularisierung der logistischen Regression
+REGULARIZATION = 1e-4
+MAX_ITERATIONS = 300
+
+
+def document_terms(title: str, text: str) -> list[str]:
+    """Wörter und Wortpaare aus Titel und Text (HTML entfernt, kleingeschrieben)."""
+    words = normalize_words(f"{title} {text}")
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfVectorizer:
+    """TF-IDF über Wörter und Wortpaare mit sublinearer Termfrequenz und L2-Normierung."""
+
+    def __init__(self, vocabulary: Sequence[str], idf: np.ndarray):
+        self.vocabulary = list(vocabulary)
+        self.index = {term: i for i, term in enumerate(self.vocabulary)}
+        self.idf = idf
+
+    @classmethod
+    def fit(cls, documents: Sequence[list[str]]) -> "TfidfVectorizer":
+        document_frequency = Counter(term for terms in documents for term in set(terms))
+        frequent = [
+            (count, term)
+            for term, count in document_frequency.items()
+            if count >= MIN_DOCUMENT_FREQUENCY
+        ]
+        frequent.sort(key=lambda item: (-item[0], item[1]))
+        frequent = frequent[:MAX_FEATURES]
+
+        vocabulary = [term for _, term in frequent]
+        counts = np.array([count for count, _ in frequent], dtype=np.float64)
+        idf = np.log((1 + len(documents)) / (1 + counts)) + 1
+        return cls(vocabulary, idf)
+
+    def transform(self, documents: Iterable[list[str]]) -> sparse.csr_matrix:
+        indptr = [0]
+        indices: list[int] = []
+        counts: list[int] = []
+        for terms in documents:
+            term_counts = Counter(self.index[t] for t in terms if t in self.index)
+            indices.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+            indptr.append(len(indices))
+
+        columns = np.array(indices, dtype=np.int32)
+        data = (1 + np.log(np.array(counts, dtype=np.float64))) * self.idf[columns]
+        matrix = sparse.csr_matrix(
+            (data, columns, np.array(indptr)), shape=(len(indptr) - 1, len(self.vocabulary))
+        )
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ matrix
+
+
+@dataclass
+class Prediction:
+    categories: list[str]
+    audiences: list[str]
+    # Sicherheit der unsichersten Einzelentscheidung (Kategorie ja/nein)
+    confidence: float
+    threshold: float
+
+    @property
+    def is_confident(self) -> bool:
+        return bool(self.categories and self.audiences) and self.confidence >= self.threshold
+
+
+class LocalClassifier:
+    """One-vs-Rest logistische Regression für alle Kategorien und Zielgruppen zugleich."""
+
+    def __init__(
+        self,
+        vectorizer: TfidfVectorizer,
+        categories: Sequence[str],
+        audiences: Sequence[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+    ):
+        self.vectorizer = vectorizer
+        self.categories = list(categories)
+        self.audiences = list(audiences)
+        self.labels = self.categories + self.audiences
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def train(
+        cls,
+        documents: Sequence[list[str]],
+        labels: Sequence[set[str]],
+        categories: Sequence[str],
+        audiences: Sequence[str],
+    ) -> "LocalClassifier":
+        vectorizer = TfidfVectorizer.fit(documents)
+        features = vectorizer.transform(documents)
+        all_labels = [*categories, *audiences]
+        targets = np.array(
+            [[label in document_labels for label in all_labels] for document_labels in labels],
+            dtype=np.float64,
+        )
+        n_documents, n_features = features.shape
+        n_labels = len(all_labels)
+
+        def loss_and_gradient(parameters: np.ndarray) -> tuple[float, np.ndarray]:
+            weights = parameters[: n_features * n_labels].reshape(n_features, n_labels)
+            bias = parameters[n_features * n_labels :]
+            logits = features @ weights + bias
+            error = expit(logits) - targets
+            loss = (
+                np.logaddexp(0, logits) - targets * logits
+            ).sum() / n_documents + REGULARIZATION / 2 * np.square(weights).sum()
+            gradient_weights = features.T @ error / n_documents + REGULARIZATION * weights
+            gradient_bias = error.sum(axis=0) / n_documents
+            return loss, np.concatenate([gradient_weights.ravel(), gradient_bias])
+
+        result = optimize.minimize(
+            loss_and_gradient,
+            np.zeros(n_features * n_labels + n_labels),
+            jac=True,
+            method="L-BFGS-B",
+            options={"maxiter": MAX_ITERATIONS},
+        )
+        weights = result.x[: n_features * n_labels].reshape(n_features, n_labels)
+        bias = result.x[n_features * n_labels :]
+        return cls(vectorizer, categories, audiences, weights, bias)
+
+    def probabilities(self, documents: Sequence[list[str]]) -> np.ndarray:
+        return expit(self.vectorizer.transform(documents) @ self.weights + self.bias)
+
+    def predict_many(
+        self, documents: Sequence[list[str]], threshold: float = math.inf
+    ) -> list[Prediction]:
+        probabilities = self.probabilities(documents)
+        split = len(self.categories)
+        predictions = []
+        for row in probabilities:
+            categories, category_confidence = _decide(row[:split], self.categories)
+            audiences, audience_confidence = _decide(row[split:], self.audiences)
+            predictions.append(
+                Prediction(
+                    categories,
+                    audiences,
+                    min(category_confidence, audience_confidence),
+                    threshold,
+                )
+            )
+        return predictions
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            vocabulary=np.array(self.vectorizer.vocabulary, dtype=str),
+            idf=self.vectorizer.idf,
+            categories=np.array(self.categories, dtype=str),
+            audiences=np.array(self.audiences, dtype=str),
+            weights=self.weights.astype(np.float32),
+            bias=self.bias,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LocalClassifier":
+        with np.load(io.BytesIO(bytes(data)), allow_pickle=False) as arrays:
+            vectorizer = TfidfVectorizer(arrays["vocabulary"].tolist(), arrays["idf"])
+            return cls(
+                vectorizer,
+                arrays["categories"].tolist(),
+                arrays["audiences"].tolist(),
+                arrays["weights"].astype(np.float64),
+                arrays["bias"],
+            )
+
+
+def _decide(probabilities: np.ndarray, labels: Sequence[str]) -> tuple[list[str], float]:
+    """Alle Labels ab 50 % wählen, Konfidenz ist die knappste Einzelentscheidung."""
+    if not labels:
+        return [], 0.0
+    chosen = probabilities >= 0.5
+    confidence = np.where(chosen, probabilities, 1 - probabilities).min()
+    return [label for label, selected in zip(labels, chosen) if selected], float(confidence)
+
+
+_lock = threading.Lock()
+_cached: Optional[tuple[int, LocalClassifier, float]] = None
+
+
+def _load_latest() -> Optional[tuple[LocalClassifier, float]]:
+    """Neuesten Klassifikator laden, bereits geladene Modelle werden pro Prozess gecacht."""
+    global _cached
+    latest = CategoryClassifier.objects.values_list("pk", "threshold").first()
+    if latest is None:
+        return None
+
+    pk, threshold = latest
+    with _lock:
+        if _cached is None or _cached[0] != pk:
+            data = CategoryClassifier.objects.values_list("model", flat=True).get(pk=pk)
+            _cached = (pk, LocalClassifier.from_bytes(data), threshold)
+        return _cached[1], _cached[2]
+
+
+def predict_categories(title: str, text: str) -> Optional[Prediction]:
+    """Kategorien und Zielgruppen lokal vorhersagen, None solange kein Modell trainiert ist."""
+    loaded = _load_latest()
+    if loaded is None:
+        return None
+    classifier, threshold = loaded
+    return classifier.predict_many([document_terms(title, text)], threshold)[0]
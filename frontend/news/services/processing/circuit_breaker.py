@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import openai
+from django.db import transaction
+from django.utils.timezone import localtime, now
+
+from ...models import CircuitBreaker
+from ...my_logging import get_logger
+
+logger = get_logger(__name__)
+
+BREAKER_NAME = "openai"
+# So viele Upstream-Fehler innerhalb des Fensters pausieren alle OpenAI-Aufrufe
+FAILURE_THRESHOLD = 10
+FAILURE_WINDOW = timedelta(minutes=2)
+COOLDOWN = timedelta(minutes=10)
+
+# Fehler, an denen nicht die einzelne News schuld ist
+_UPSTREAM_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.AuthenticationError,
+    openai.PermissionDeniedError,
+)
+
+
+class LLMUnavailable(Exception):
+    """OpenAI-Aufrufe sind durch den Circuit Breaker pausiert."""
+
+
+def is_upstream_error(error: BaseException) -> bool:
+    return isinstance(error, _UPSTREAM_ERRORS)
+
+
+def llm_available() -> bool:
+    return not CircuitBreaker.objects.filter(
+        name=BREAKER_NAME, open_until__gt=now()
+    ).exists()
+
+
+def ensure_llm_available() -> None:
+    if not llm_available():
+        raise LLMUnavailable("OpenAI pausiert (Circuit Breaker offen)")
+
+
+def record_upstream_error(error: BaseException) -> None:
+    """Upstream-Fehler zählen und den Circuit Breaker bei gehäuften Fehlern öffnen."""
+    current = now()
+    with transaction.atomic():
+        breaker, _ = CircuitBreaker.objects.select_for_update().get_or_create(
+            name=BREAKER_NAME
+        )
+        if (
+            breaker.window_started_at is None
+            or current - breaker.window_started_at > FAILURE_WINDOW
+        ):
+            breaker.window_started_at = current
+            breaker.failures = 0
+        breaker.failures += 1
+        breaker.last_error = str(error)[:1000]
+
+        if breaker.failures >= FAILURE_THRESHOLD:
+            breaker.open_until = current + COOLDOWN
+            breaker.window_started_at = None
+            breaker.failures = 0
+            logger.warning(
+                f"Circuit Breaker geöffnet, OpenAI-Aufrufe bis {localtime(breaker.open_until):%H:%M:%S} pausiert: {error}"
+            )
+        breaker.save()
@@ -1,11 +1,20 @@
 import os
 import re
 
-from django.db.models import F
 from openai import OpenAI
 
-from ....models import OpenAITokenUsage
-from ..common import release_tokens, reserve_tokens
+from ..circuit_breaker import (
+    ensure_llm_available,
+    is_upstream_error,
+    record_upstream_error,
+)
+from ..common import (
+    TokenLimitReached,
+    record_used_tokens,
+    release_tokens,
+    reserve_tokens,
+)
+from ..prompt_preprocessing import prepare_prompt_text
 
 
 def get_cleaned_text_from_openai(
@@ -14,10 +23,11 @@ def get_cleaned_text_from_openai(
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     system_message_file_path = os.path.join(BASE_DIR, "system_message.txt")
 
+    ensure_llm_available()
     usage = reserve_tokens(1500, token_limit)
 
     if usage is None:
-        raise Exception("Token-Limit erreicht.")
+        raise TokenLimitReached("Token-Limit erreicht.")
 
     openai = OpenAI(api_key=openai_api_key)
 
@@ -28,7 +38,9 @@ def get_cleaned_text_from_openai(
     ) as file:
         system_message = file.read()
 
-    prompt = f"Titel: {article_title} \n\nText: {article_text}"
+    # Links und E-Mail-Adressen kehren erst in der Antwort wieder zurück
+    prompt_text, placeholders = prepare_prompt_text(article_text)
+    prompt = f"Titel: {article_title} \n\nText: {prompt_text}"
 
     try:
         response = openai.responses.create(
@@ -44,17 +56,15 @@ def get_cleaned_text_from_openai(
         )
     except Exception as e:
         release_tokens(usage, 1500)
+        if is_upstream_error(e):
+            record_upstream_error(e)
         raise e
 
     release_tokens(usage, 1500)
 
-    if response.usage:
-        OpenAITokenUsage.objects.filter(pk=usage.pk).update(
-            used_tokens=F("used_tokens") + response.usage.total_tokens
-        )
-        usage.refresh_from_db()
+    record_used_tokens(usage, response)
 
-    return response.output_text.strip()
+    return placeholders.restore(response.output_text.strip())
 
 
 def extract_parts(response_text: str) -> dict[str, str]:
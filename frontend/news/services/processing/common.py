@@ -1,5 +1,8 @@
 import datetime
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
 
 from django.db.models import F
 from django.db.models.functions import Greatest
@@ -7,6 +10,32 @@ from django.db.models.functions import Greatest
 from ...models import OpenAITokenUsage
 
 
+class TokenLimitReached(Exception):
+    """Das tägliche Token-Limit ist ausgeschöpft."""
+
+
+@dataclass
+class UsedTokens:
+    total: int = 0
+    # Antworten ohne Usage-Angabe, für sie bleibt nur eine Schätzung
+    unreported: int = 0
+
+
+# Zähler des aktuellen count_used_tokens-Blocks (None = es wird nicht gezählt)
+_used_tokens: ContextVar[Optional[UsedTokens]] = ContextVar("used_tokens", default=None)
+
+
+@contextmanager
+def count_used_tokens() -> Iterator[UsedTokens]:
+    """Summiert die laut OpenAI-Antworten verbrauchten Tokens aller Aufrufe im Block."""
+    counter = UsedTokens()
+    token = _used_tokens.set(counter)
+    try:
+        yield counter
+    finally:
+        _used_tokens.reset(token)
+
+
 def reserve_tokens(
     expected_tokens: int, token_limit: int
 ) -> Optional[OpenAITokenUsage]:
@@ -37,3 +66,20 @@ def release_tokens(usage: OpenAITokenUsage, reserved_tokens: int) -> None:
         used_tokens=Greatest(F("used_tokens") - reserved_tokens, 0)
     )
     usage.refresh_from_db()
+
+
+def record_used_tokens(usage: OpenAITokenUsage, response) -> None:
+    """Tatsächlich verbrauchte Tokens einer OpenAI-Antwort auf das Tageslimit buchen"""
+    counter = _used_tokens.get()
+    if not response.usage:
+        if counter is not None:
+            counter.unreported += 1
+        return
+
+    OpenAITokenUsage.objects.filter(pk=usage.pk).update(
+        used_tokens=F("used_tokens") + response.usage.total_tokens
+    )
+    usage.refresh_from_db()
+
+    if counter is not None:
+        counter.total += response.usage.total_tokens
@@ -0,0 +1,65 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils.timezone import now
+
+from ...models import News, ProcessingFailure
+from .circuit_breaker import LLMUnavailable, is_upstream_error
+from .common import TokenLimitReached
+
+# Nach so vielen Fehlversuchen landet eine News im Dead-Letter-Zustand
+MAX_ATTEMPTS = 5
+BASE_DELAY = timedelta(minutes=15)
+MAX_DELAY = timedelta(hours=24)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponentielles Backoff: 15 min, 30 min, 1 h, … bis höchstens 24 h."""
+    return min(BASE_DELAY * 2 ** (attempts - 1), MAX_DELAY)
+
+
+def record_failure(
+    news: News, stage: str, error: BaseException, logger: logging.Logger
+) -> None:
+    """Fehlversuch eines Verarbeitungsschritts vermerken und den nächsten Versuch planen."""
+    # Pausierte oder gestörte OpenAI-API und Token-Limit sind kein Fehler der News
+    if isinstance(error, (LLMUnavailable, TokenLimitReached)) or is_upstream_error(error):
+        return
+
+    current = now()
+    with transaction.atomic():
+        failure, _ = ProcessingFailure.objects.select_for_update().get_or_create(
+            news=news,
+            stage=stage,
+            defaults={"last_attempt_at": current, "next_attempt_at": current},
+        )
+        failure.attempts += 1
+        failure.last_error = str(error)[:2000]
+        failure.last_attempt_at = current
+        failure.next_attempt_at = current + retry_delay(failure.attempts)
+        failure.dead_lettered = failure.attempts >= MAX_ATTEMPTS
+        failure.save()
+
+    if failure.dead_lettered:
+        logger.warning(
+            f"{failure.get_stage_display()} nach {failure.attempts} Fehlversuchen aufgegeben | {news.titel[:80]}"
+        )
+
+
+def clear_failure(news: News, stage: str) -> None:
+    ProcessingFailure.objects.filter(news=news, stage=stage).delete()
+
+
+def exclude_blocked(queryset: QuerySet[News], stage: str) -> QuerySet[News]:
+    """News ohne fälligen Versuch (Backoff läuft oder Dead Letter) ausschließen."""
+    blocked = ProcessingFailure.objects.filter(stage=stage).filter(
+        Q(dead_lettered=True) | Q(next_attempt_at__gt=now())
+    )
+    return queryset.exclude(pk__in=blocked.values("news_id"))
+
+
+def requeue(failures: QuerySet[ProcessingFailure]) -> int:
+    """Fehlversuche zurücksetzen, die News werden beim nächsten Backfill erneut verarbeitet."""
+    return failures.update(dead_lettered=False, attempts=0, next_attempt_at=now())
@@ -0,0 +1,98 @@
+import html
+import re
+
+# Links und E-Mail-Adressen werden im Prompt durch kurze Platzhalter ersetzt
+_URL = re.compile(r"""(?<![\w@.])(?:https?://|www\.)[^\s"'<>]+""", re.IGNORECASE)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PLACEHOLDER = re.compile(r"\{([LM])(\d+)\}")
+_TRAILING_PUNCTUATION = ".,;:!?)]"
+
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_SCRIPT_STYLE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.DOTALL | re.IGNORECASE)
+_TAG = re.compile(r"<(/?)([a-zA-Z][\w:-]*)([^>]*?)\s*/?>")
+_ATTRIBUTE = re.compile(r"""\b(href|target)\s*=\s*("[^"]*"|'[^']*'|[^\s>]+)""", re.IGNORECASE)
+_QUOTES = "\"'"
+# Tags ohne Bedeutung für Inhalt oder Struktur
+_UNWRAP = {"span", "font", "o:p"}
+_EMPTY_TAG = re.compile(r"<(p|div|b|strong|em|i|u)>(?:\s|&nbsp;|<br>)*</\1>")
+_BREAKS = re.compile(r"(?:\s*<br>\s*){3,}")
+_BREAK = re.compile(r"\s*<br>\s*")
+_ENTITY = re.compile(r"&(?:#\d+|#x[0-9a-fA-F]+|[a-zA-Z]\w*);")
+_SPACES = re.compile(r"[ \t\f\v\xa0]+")
+_NEWLINES = re.compile(r"\s*\n\s*")
+
+
+def _minify_tag(match: re.Match) -> str:
+    closing, name, attributes = match.groups()
+    name = name.lower()
+    if name in _UNWRAP:
+        return ""
+    if name == "br":
+        return "<br>"
+    if name == "a" and not closing:
+        kept = [
+            f'{key.lower()}="{value.strip(_QUOTES)}"'
+            for key, value in _ATTRIBUTE.findall(attributes)
+        ]
+        return f"<a {' '.join(kept)}>" if kept else "<a>"
+    return f"<{closing}{name}>"
+
+
+def _unescape_entity(match: re.Match) -> str:
+    # Maskierte Zeichen des Markups bleiben erhalten, alles andere als Klartext
+    character = html.unescape(match.group(0))
+    return match.group(0) if character in "<>&\"'" else character
+
+
+def minify_html(text: str) -> str:
+    """HTML auf das für die Prompts Nötige reduzieren: keine Attribute außer Links,
+    keine Kommentare, Styles oder leeren Tags, zusammengefasste Umbrüche und Leerzeichen."""
+    text = _COMMENT.sub("", text or "")
+    text = _SCRIPT_STYLE.sub("", text)
+    text = _TAG.sub(_minify_tag, text)
+    text = _ENTITY.sub(_unescape_entity, text)
+    text = _SPACES.sub(" ", text)
+    text = _NEWLINES.sub("\n", text)
+    text = _EMPTY_TAG.sub("", text)
+    text = _BREAKS.sub("<br><br>", text)
+    text = _BREAK.sub("<br>", text)
+    return text.strip()
+
+
+class Placeholders:
+    """Ersetzt Links und E-Mail-Adressen durch {L1}, {M1}, … und setzt sie später wieder ein."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self._keys: dict[tuple[str, str], str] = {}
+        self._counts: dict[str, int] = {}
+
+    def _key(self, kind: str, value: str) -> str:
+        key = self._keys.get((kind, value))
+        if key is None:
+            self._counts[kind] = self._counts.get(kind, 0) + 1
+            key = f"{kind}{self._counts[kind]}"
+            self._keys[(kind, value)] = key
+            self.values[key] = value
+        return f"{{{key}}}"
+
+    def _replace_url(self, match: re.Match) -> str:
+        url = match.group(0)
+        stripped = url.rstrip(_TRAILING_PUNCTUATION)
+        return self._key("L", stripped) + url[len(stripped) :]
+
+    def shorten(self, text: str) -> str:
+        text = _URL.sub(self._replace_url, text)
+        return _EMAIL.sub(lambda match: self._key("M", match.group(0)), text)
+
+    def restore(self, text: str) -> str:
+        return _PLACEHOLDER.sub(
+            lambda match: self.values.get(match.group(1) + match.group(2), match.group(0)),
+            text,
+        )
+
+
+def prepare_prompt_text(text: str) -> tuple[str, Placeholders]:
+    """Text minifizieren und Links/E-Mail-Adressen durch Platzhalter ersetzen."""
+    placeholders = Placeholders()
+    return placeholders.shorten(minify_html(text)), placeholders
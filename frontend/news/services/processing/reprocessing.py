@@ -0,0 +1,115 @@
+import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db.models import F
+from django.utils.timezone import now
+
+from ...models import News, OpenAITokenUsage, ProcessingFailure, Text
+from .failures import exclude_blocked
+from .versions import SYSTEM_MESSAGES, category_set_version, prompt_version
+
+# Geschätzte Tokens pro Tag, die für das Nachziehen veralteter Ergebnisse ausgegeben werden
+DAILY_TOKEN_BUDGET = 300_000
+# Höchstens so viele Schritte pro Lauf, neue News behalten Vorrang
+BATCH_SIZE = 20
+
+
+@dataclass
+class StaleOutput:
+    stage: str
+    news_id: int
+    score: float
+    # Nur bei Übersetzungen
+    sprache_id: Optional[int] = None
+
+
+def _score(view_count: int, erstellungsdatum: datetime.datetime) -> float:
+    """Viel gelesene und neue News zuerst."""
+    age_days = max((now() - erstellungsdatum).total_seconds() / 86400, 0)
+    return (view_count + 1) / (age_days + 1)
+
+
+def find_stale_outputs(limit: int = BATCH_SIZE) -> list[StaleOutput]:
+    """Ergebnisse, die mit einer älteren Prompt- oder Kategorienversion erzeugt wurden."""
+    cleanup_version = prompt_version(ProcessingFailure.STAGE_CLEANUP)
+    translation_version = prompt_version(ProcessingFailure.STAGE_TRANSLATION)
+    fields = ("news_id", "news__view_count", "news__erstellungsdatum")
+
+    # Der englische Text stammt immer aus dem Cleanup
+    cleanup = exclude_blocked(
+        News.objects.filter(is_cleaned_up=True), ProcessingFailure.STAGE_CLEANUP
+    )
+    stale = [
+        StaleOutput(ProcessingFailure.STAGE_CLEANUP, news_id, _score(views, created))
+        for news_id, views, created in Text.objects.filter(
+            sprache__code="en", news__in=cleanup
+        )
+        .exclude(prompt_version=cleanup_version)
+        .values_list(*fields)
+    ]
+    # Übersetzungen werden nach einem erneuten Cleanup ohnehin neu erzeugt
+    recleaned = {item.news_id for item in stale}
+
+    translation = exclude_blocked(
+        News.objects.filter(is_cleaned_up=True), ProcessingFailure.STAGE_TRANSLATION
+    )
+    stale += [
+        StaleOutput(
+            ProcessingFailure.STAGE_TRANSLATION,
+            news_id,
+            _score(views, created),
+            sprache_id,
+        )
+        for news_id, views, created, sprache_id in Text.objects.filter(
+            news__in=translation
+        )
+        .exclude(sprache__code__in=["de", "en"])
+        .exclude(prompt_version=translation_version)
+        .values_list(*fields, "sprache_id")
+        if news_id not in recleaned
+    ]
+
+    categorized = News.objects.filter(inhaltskategorien__isnull=False).values("pk")
+    categorization = exclude_blocked(
+        News.objects.filter(is_cleaned_up=True, pk__in=categorized),
+        ProcessingFailure.STAGE_CATEGORIZATION,
+    ).exclude(
+        categorization_prompt_version=prompt_version(
+            ProcessingFailure.STAGE_CATEGORIZATION
+        ),
+        category_set_version=category_set_version(),
+    )
+    stale += [
+        StaleOutput(ProcessingFailure.STAGE_CATEGORIZATION, news_id, _score(views, created))
+        for news_id, views, created in categorization.values_list(
+            "pk", "view_count", "erstellungsdatum"
+        )
+    ]
+
+    stale.sort(key=lambda item: item.score, reverse=True)
+    return stale[:limit]
+
+
+def estimate_tokens(stage: str, title: str, text: str) -> int:
+    """Grobe Schätzung (4 Zeichen pro Token): System-Prompt und Text als Eingabe, Text als Ausgabe."""
+    system_message = SYSTEM_MESSAGES[stage].stat().st_size
+    return (system_message + 2 * (len(title) + len(text))) // 4
+
+
+def _usage_today() -> OpenAITokenUsage:
+    utc_today = datetime.datetime.now(datetime.timezone.utc).date()
+    usage, _ = OpenAITokenUsage.objects.get_or_create(
+        date=utc_today, defaults={"used_tokens": 0}
+    )
+    return usage
+
+
+def remaining_budget() -> int:
+    return DAILY_TOKEN_BUDGET - _usage_today().reprocessing_tokens
+
+
+def charge_budget(tokens: int) -> None:
+    OpenAITokenUsage.objects.filter(pk=_usage_today().pk).update(
+        reprocessing_tokens=F("reprocessing_tokens") + tokens
+    )
@@ -0,0 +1,77 @@
+import logging
+from datetime import timedelta
+from typing import Iterable
+
+from django.db.models import Count
+from django.utils.timezone import now
+
+from ....models import LazyTranslation, News, Sprache
+
+# Diese Sprachen werden immer vorab übersetzt, alle anderen erst beim Lesen
+EAGER_LANGUAGE_CODES = {"de", "en"}
+# Ab so vielen angefragten News innerhalb von 24 Stunden wird eine Sprache wieder
+# vorab übersetzt, dann aber nur für die News der letzten 14 Tage
+TRAFFIC_THRESHOLD = 20
+TRAFFIC_WINDOW = timedelta(hours=24)
+EAGER_NEWS_WINDOW = timedelta(days=14)
+
+
+def is_lazy(sprache_code: str) -> bool:
+    return sprache_code not in EAGER_LANGUAGE_CODES
+
+
+def popular_language_ids() -> set[int]:
+    """Sprachen, deren Anfragen den Schwellwert überschritten haben."""
+    return set(
+        LazyTranslation.objects.filter(requested_at__gte=now() - TRAFFIC_WINDOW)
+        .values("sprache")
+        .annotate(requests=Count("id"))
+        .filter(requests__gte=TRAFFIC_THRESHOLD)
+        .values_list("sprache", flat=True)
+    )
+
+
+def languages_to_translate(sprachen: Iterable[Sprache], news: News) -> list[Sprache]:
+    """Sprachen, in die die News jetzt übersetzt werden soll.
+
+    Vorab-Sprachen immer, andere nur bei offener Anfrage für diese News oder wenn die
+    Sprache viel gelesen wird und die News aktuell ist.
+    """
+    sprachen = list(sprachen)
+    if all(not is_lazy(sprache.code) for sprache in sprachen):
+        return sprachen
+
+    requested = set(
+        LazyTranslation.objects.filter(news=news, completed_at__isnull=True).values_list(
+            "sprache_id", flat=True
+        )
+    )
+    recent = news.erstellungsdatum >= now() - EAGER_NEWS_WINDOW
+    popular = popular_language_ids() if recent else set()
+    return [
+        sprache
+        for sprache in sprachen
+        if not is_lazy(sprache.code) or sprache.pk in requested or sprache.pk in popular
+    ]
+
+
+def request_translation(news: News, sprache: Sprache) -> bool:
+    """Übersetzung beim Lesen anfordern, True nur bei der ersten Anfrage."""
+    _, created = LazyTranslation.objects.get_or_create(news=news, sprache=sprache)
+    return created
+
+
+def complete_translation(news: News, sprache: Sprache, logger: logging.Logger) -> None:
+    """Offene Anfrage abschließen und die Zeit bis zur fertigen Übersetzung loggen."""
+    request = LazyTranslation.objects.filter(
+        news=news, sprache=sprache, completed_at__isnull=True
+    ).first()
+    if request is None:
+        return
+
+    request.completed_at = now()
+    request.save(update_fields=["completed_at"])
+    latency = (request.completed_at - request.requested_at).total_seconds()
+    logger.info(
+        f"Übersetzung auf Anfrage ({sprache.code}) nach {latency:.1f}s fertig | {news.titel[:80]}"
+    )
@@ -1,11 +1,21 @@
 import os
 import re
 
-from django.db.models import F
 from openai import OpenAI
 
-from ....models import OpenAITokenUsage, Sprache
-from ..common import release_tokens, reserve_tokens
+from ....models import Sprache
+from ..circuit_breaker import (
+    ensure_llm_available,
+    is_upstream_error,
+    record_upstream_error,
+)
+from ..common import (
+    TokenLimitReached,
+    record_used_tokens,
+    release_tokens,
+    reserve_tokens,
+)
+from ..prompt_preprocessing import prepare_prompt_text
 
 
 def translate_html(
@@ -19,10 +29,11 @@ def translate_html(
 
     system_message_file_path = os.path.join(BASE_DIR, "system_message.txt")
 
+    ensure_llm_available()
     usage = reserve_tokens(1500, token_limit)
 
     if usage is None:
-        raise Exception("Token-Limit erreicht.")
+        raise TokenLimitReached("Token-Limit erreicht.")
 
     openai = OpenAI(api_key=openai_api_key)
 
@@ -35,7 +46,8 @@ def translate_html(
 
     system_message = system_message.replace("%Sprache%", sprache.name_englisch)
 
-    prompt = f"Titel: {article_title} \n\nText: {article_text}"
+    prompt_text, placeholders = prepare_prompt_text(article_text)
+    prompt = f"Titel: {article_title} \n\nText: {prompt_text}"
 
     try:
         response = openai.responses.create(
@@ -51,15 +63,13 @@ def translate_html(
         )
     except Exception as e:
         release_tokens(usage, 1500)
+        if is_upstream_error(e):
+            record_upstream_error(e)
         raise e
 
     release_tokens(usage, 1500)
 
-    if response.usage:
-        OpenAITokenUsage.objects.filter(pk=usage.pk).update(
-            used_tokens=F("used_tokens") + response.usage.total_tokens
-        )
-        usage.refresh_from_db()
+    record_used_tokens(usage, response)
 
     match = re.search(
         r"\[Titel\]\s*(.*?)\s*\[Text\]\s*(.*)",
@@ -71,6 +81,6 @@ def translate_html(
         raise Exception("Titel oder Text fehlt.")
 
     translated_title = match.group(1).strip()
-    translated_text = match.group(2).strip()
+    translated_text = placeholders.restore(match.group(2).strip())
 
     return translated_title, translated_text
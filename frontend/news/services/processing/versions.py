@@ -0,0 +1,52 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from ...models import News, ProcessingFailure
+from ..categories import get_audience_categories, get_content_categories
+
+_PROCESSING_DIR = Path(__file__).resolve().parent
+SYSTEM_MESSAGES = {
+    ProcessingFailure.STAGE_CLEANUP: _PROCESSING_DIR / "cleanup" / "system_message.txt",
+    ProcessingFailure.STAGE_CATEGORIZATION: _PROCESSING_DIR
+    / "categorization"
+    / "system_message.txt",
+    ProcessingFailure.STAGE_TRANSLATION: _PROCESSING_DIR
+    / "translation"
+    / "system_message.txt",
+}
+
+# Länge der gespeicherten Versionskennung (Anfang des SHA-256)
+VERSION_LENGTH = 12
+
+
+def _short_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:VERSION_LENGTH]
+
+
+@lru_cache(maxsize=None)
+def prompt_version(stage: str) -> str:
+    """Version des System-Prompts eines Verarbeitungsschritts, ändert sich mit jeder Änderung der Datei."""
+    return _short_hash(SYSTEM_MESSAGES[stage].read_bytes())
+
+
+@lru_cache(maxsize=1)
+def category_set_version() -> str:
+    """Version der Inhalts- und Zielgruppenkategorien, die der Kategorisierung vorgegeben werden."""
+    categories = [get_content_categories(), get_audience_categories()]
+    return _short_hash(json.dumps(categories, ensure_ascii=False).encode("utf-8"))
+
+
+def stamp_categorization(news: News, categorized_by: str) -> None:
+    """Kategorisierung der News mit den aktuellen Versionen und ihrer Herkunft kennzeichnen."""
+    news.categorization_prompt_version = prompt_version(
+        ProcessingFailure.STAGE_CATEGORIZATION
+    )
+    news.category_set_version = category_set_version()
+    news.categorized_by = categorized_by
+    News.objects.filter(pk=news.pk).update(
+        categorization_prompt_version=news.categorization_prompt_version,
+        category_set_version=news.category_set_version,
+        categorized_by=categorized_by,
+    )
@@ -0,0 +1,86 @@
+from typing import Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Case, F, FloatField, OuterRef, Q, QuerySet, Subquery, When
+from django.db.models.functions import Cast
+
+from ..models import News, Text
+from .processing.translation.lazy import is_lazy
+
+# Textsuchkonfiguration je Sprachcode, muss zum Trigger aus Migration 0010 passen
+SEARCH_CONFIGS = {"de": "german", "en": "english", "fr": "french", "es": "spanish"}
+DEFAULT_SEARCH_CONFIG = "simple"
+# Längere Anfragen werden abgeschnitten
+MAX_QUERY_LENGTH = 200
+
+
+def search_config(sprache_code: str) -> str:
+    return SEARCH_CONFIGS.get(sprache_code, DEFAULT_SEARCH_CONFIG)
+
+
+def search_languages(sprache_code: str) -> list[str]:
+    """Durchsuchte Sprachen: die gewählte und, wie in der Detailansicht, Englisch als Ersatz
+    für noch nicht übersetzte News."""
+    return [sprache_code, "en"] if is_lazy(sprache_code) else [sprache_code]
+
+
+def clean_query(query: Optional[str]) -> str:
+    return (query or "").strip()[:MAX_QUERY_LENGTH]
+
+
+def search_news(queryset: QuerySet[News], query: str, sprache_code: str) -> QuerySet[News]:
+    """News aus dem (gefilterten) QuerySet, deren Texte zur Anfrage passen, nach Relevanz sortiert.
+
+    Jeder Text wird in der Konfiguration seiner Sprache durchsucht, die Relevanz einer
+    News ist die ihres besten Textes.
+    """
+    match = Q()
+    ranks = []
+    for code in search_languages(sprache_code):
+        search_query = SearchQuery(query, config=search_config(code), search_type="websearch")
+        match |= Q(sprache__code=code, search_vector=search_query)
+        # ts_rank liefert real, als double precision übersteht der Wert den Cursor unverändert
+        rank = Cast(SearchRank(F("search_vector"), search_query), FloatField())
+        ranks.append(When(sprache__code=code, then=rank))
+
+    texts = Text.objects.filter(match)
+    best_rank = (
+        texts.filter(news=OuterRef("pk"))
+        .annotate(rank=Case(*ranks, output_field=FloatField()))
+        .order_by("-rank")
+        .values("rank")[:1]
+    )
+    return (
+        queryset.filter(pk__in=texts.values("news_id"))
+        .annotate(rank=Subquery(best_rank, output_field=FloatField()))
+        .order_by("-rank", "-pk")
+    )
+
+
+def _encode_cursor(news: News) -> str:
+    return f"{news.rank!r}_{news.pk}"  # type: ignore[attr-defined]
+
+
+def _decode_cursor(cursor: str) -> Optional[tuple[float, int]]:
+    rank, _, pk = cursor.partition("_")
+    try:
+        return float(rank), int(pk)
+    except ValueError:
+        return None
+
+
+def paginate_after(
+    queryset: QuerySet[News], cursor: Optional[str], limit: int = 20
+) -> tuple[list[News], Optional[str]]:
+    """Keyset-Pagination über (Relevanz, pk) für Suchergebnisse.
+
+    Gibt die Seite nach dem Cursor und den Cursor der nächsten Seite zurück (None am Ende).
+    """
+    position = _decode_cursor(cursor) if cursor else None
+    if position is not None:
+        rank, pk = position
+        queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, pk__lt=pk))
+
+    items = list(queryset[: limit + 1])
+    next_cursor = _encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return items[:limit], next_cursor
@@ -0,0 +1,231 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Optional, Type
+
+from django.db import models
+from django.db.models import Q
+from django.utils.text import slugify
+
+from ..models import CategoryVocabulary, InhaltsKategorie, News, Text, User, Zielgruppe
+from .categories import get_audience_categories, get_content_categories
+from .fragments import bump_versions_on_commit
+from .processing.categorization.local_classifier import predict_categories
+from .processing.versions import category_set_version
+
+# Kategorie-Typ in categories.json: Modell und Feldname an News und User
+VOCABULARY_KINDS: dict[str, tuple[Type[models.Model], str]] = {
+    "content_categories": (InhaltsKategorie, "inhaltskategorien"),
+    "audience_categories": (Zielgruppe, "zielgruppen"),
+}
+# Kürzere Hinweise treffen zu viele Texte
+MIN_HINT_LENGTH = 4
+
+
+@dataclass
+class VocabularyDiff:
+    """Änderungen je Kategorie-Typ, verglichen über die id der Einträge."""
+
+    added: list[tuple[str, dict]] = field(default_factory=list)
+    removed: list[tuple[str, dict]] = field(default_factory=list)
+    renamed: list[tuple[str, dict, dict]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.renamed)
+
+
+def _german_name(entry: dict) -> str:
+    return ((entry.get("names") or {}).get("de") or "").strip()
+
+
+def _slug(entry: dict) -> str:
+    return slugify(entry.get("slug") or _german_name(entry))
+
+
+def vocabulary_entries(data: dict[str, Any]) -> dict[str, list[dict]]:
+    return {kind: data.get(kind, []) for kind in VOCABULARY_KINDS}
+
+
+def diff_vocabulary(
+    old: dict[str, list[dict]], new: dict[str, list[dict]]
+) -> VocabularyDiff:
+    diff = VocabularyDiff()
+    for kind in VOCABULARY_KINDS:
+        old_entries = {entry["id"]: entry for entry in old.get(kind, []) if "id" in entry}
+        new_entries = {entry["id"]: entry for entry in new.get(kind, []) if "id" in entry}
+        for key, entry in new_entries.items():
+            previous = old_entries.get(key)
+            if previous is None:
+                diff.added.append((kind, entry))
+            elif (_german_name(previous), _slug(previous)) != (
+                _german_name(entry),
+                _slug(entry),
+            ):
+                diff.renamed.append((kind, previous, entry))
+        diff.removed += [
+            (kind, entry) for key, entry in old_entries.items() if key not in new_entries
+        ]
+    return diff
+
+
+def _lookup(model: Type[models.Model], entry: dict) -> Optional[models.Model]:
+    # Wie beim Synchronisieren: erst über den Slug, dann über den Namen
+    return (
+        model.objects.filter(slug=_slug(entry)).first()
+        or model.objects.filter(name=_german_name(entry)).first()
+    )
+
+
+def _merge_assignments(kind: str, source: models.Model, target: models.Model) -> None:
+    """Zuordnungen von News und Nutzerpräferenzen per Bulk-Update auf das Zielobjekt umhängen."""
+    _, field_name = VOCABULARY_KINDS[kind]
+    for owner in (News, User):
+        m2m = owner._meta.get_field(field_name)
+        through = m2m.remote_field.through
+        owner_id = f"{m2m.m2m_field_name()}_id"
+        category = m2m.m2m_reverse_field_name()
+        already = through.objects.filter(**{category: target}).values(owner_id)
+        if owner is News:
+            # Bulk-Updates lösen keine Signale aus
+            bump_versions_on_commit(
+                through.objects.filter(**{category: source}).values_list(owner_id, flat=True)
+            )
+        through.objects.filter(**{category: source}).exclude(
+            **{f"{owner_id}__in": already}
+        ).update(**{category: target})
+        through.objects.filter(**{category: source}).delete()
+
+
+def apply_renames(diff: VocabularyDiff, logger: logging.Logger) -> None:
+    """Umbenannte Kategorien übernehmen, ohne die Zuordnungen neu zu bestimmen."""
+    for kind, previous, entry in diff.renamed:
+        model, _ = VOCABULARY_KINDS[kind]
+        source = _lookup(model, previous)
+        if source is None:
+            continue
+        target = _lookup(model, entry)
+        if target is None or target.pk == source.pk:
+            # Objekt umbenennen, die Zuordnungen bleiben bestehen
+            source.slug = _slug(entry)
+            source.name = _german_name(entry)
+            source.save()
+        else:
+            _merge_assignments(kind, source, target)
+            source.delete()
+        logger.info(
+            f"Kategorie umbenannt: {_german_name(previous)} → {_german_name(entry)}"
+        )
+
+
+def _hints(entry: dict) -> set[str]:
+    """Namen in allen Sprachen und optionale Stichwörter ("keywords": {"de": [...]})."""
+    hints = {name for name in (entry.get("names") or {}).values() if isinstance(name, str)}
+    for words in (entry.get("keywords") or {}).values():
+        hints.update(word for word in words if isinstance(word, str))
+    return {hint.strip() for hint in hints if len(hint.strip()) >= MIN_HINT_LENGTH}
+
+
+def affected_news(diff: VocabularyDiff) -> tuple[set[int], set[int]]:
+    """News, deren Kategorisierung sich durch die Änderung plausibel ändert.
+
+    Gibt (Treffer für neue Kategorien, News mit entfernten Kategorien) zurück.
+    """
+    by_hint: set[int] = set()
+    for _, entry in diff.added:
+        condition = Q()
+        for hint in _hints(entry):
+            condition |= Q(titel__icontains=hint) | Q(text__icontains=hint)
+        if condition:
+            by_hint.update(
+                Text.objects.filter(condition, sprache__code__in=["de", "en"]).values_list(
+                    "news_id", flat=True
+                )
+            )
+
+    with_removed: set[int] = set()
+    for kind, entry in diff.removed:
+        model, field_name = VOCABULARY_KINDS[kind]
+        category = _lookup(model, entry)
+        if category is not None:
+            with_removed.update(
+                News.objects.filter(**{field_name: category}).values_list("pk", flat=True)
+            )
+    return by_hint, with_removed - by_hint
+
+
+def recategorize_locally(
+    news_ids: set[int], diff: VocabularyDiff, logger: logging.Logger
+) -> set[int]:
+    """Entfernte Kategorien per lokalem Klassifikator ersetzen, gibt die erledigten News zurück."""
+    removed: dict[str, list[models.Model]] = {kind: [] for kind in VOCABULARY_KINDS}
+    for kind, entry in diff.removed:
+        category = _lookup(VOCABULARY_KINDS[kind][0], entry)
+        if category is not None:
+            removed[kind].append(category)
+    allowed_categories = set(get_content_categories())
+    allowed_audiences = set(get_audience_categories())
+
+    done = set()
+    for news in News.objects.filter(pk__in=news_ids):
+        text = news.texte.filter(sprache__code="de").first()  # type: ignore[attr-defined]
+        prediction = predict_categories(news.titel, text.text) if text else None
+        if prediction is None or not prediction.is_confident:
+            continue
+        categories = [name for name in prediction.categories if name in allowed_categories]
+        audiences = [name for name in prediction.audiences if name in allowed_audiences]
+        if not categories:
+            continue
+
+        news.inhaltskategorien.remove(*removed["content_categories"])
+        news.zielgruppen.remove(*removed["audience_categories"])
+        news.inhaltskategorien.add(*InhaltsKategorie.objects.filter(name__in=categories))
+        news.zielgruppen.add(*Zielgruppe.objects.filter(name__in=audiences))
+        done.add(news.pk)
+
+    if done:
+        News.objects.filter(pk__in=done).update(categorized_by=News.CATEGORIZED_BY_LOCAL)
+        logger.info(f"{len(done)} News mit entfernten Kategorien lokal neu kategorisiert")
+    return done
+
+
+@dataclass
+class VocabularyUpdate:
+    entries: dict[str, list[dict]]
+    snapshot: Optional[CategoryVocabulary]
+    diff: VocabularyDiff
+
+
+def start_vocabulary_update(data: dict[str, Any], logger: logging.Logger) -> VocabularyUpdate:
+    """Vor dem Synchronisieren: mit dem letzten Stand vergleichen und Umbenennungen übernehmen."""
+    entries = vocabulary_entries(data)
+    snapshot = CategoryVocabulary.objects.first()
+    diff = diff_vocabulary(snapshot.entries, entries) if snapshot else VocabularyDiff()
+    apply_renames(diff, logger)
+    return VocabularyUpdate(entries, snapshot, diff)
+
+
+def finish_vocabulary_update(update: VocabularyUpdate, logger: logging.Logger) -> None:
+    """Nach dem Synchronisieren: nur betroffene News zur Neukategorisierung vormerken.
+
+    Betroffene News behalten ihre alte Kategorien-Version und werden von
+    reprocess_stale_outputs erneuert, alle anderen gelten als aktuell.
+    """
+    version = category_set_version()
+    snapshot, diff = update.snapshot, update.diff
+    if snapshot is not None and not diff and snapshot.version == version:
+        return
+
+    if snapshot is not None:
+        by_hint, with_removed = affected_news(diff)
+        pending = by_hint | (with_removed - recategorize_locally(with_removed, diff, logger))
+        unchanged = (
+            News.objects.filter(category_set_version=snapshot.version)
+            .exclude(pk__in=pending)
+            .update(category_set_version=version)
+        )
+        logger.info(
+            f"Kategorien geändert ({len(diff.added)} neu, {len(diff.removed)} entfernt, "
+            f"{len(diff.renamed)} umbenannt): {len(pending)} News werden neu kategorisiert, "
+            f"{unchanged} unverändert übernommen"
+        )
+
+    CategoryVocabulary.objects.create(version=version, entries=update.entries)
@@ -0,0 +1,36 @@
+import gzip
+import json
+
+
+class PayloadError(ValueError):
+    """Nutzlast konnte nicht dekomprimiert oder deserialisiert werden."""
+
+
+def _decompress(body: bytes, content_encoding: str) -> bytes:
+    if content_encoding == "gzip":
+        return gzip.decompress(body)
+    if content_encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
+
+
+def decode_payload(body: bytes, content_type: str, content_encoding: str) -> object:
+    """Nutzlast anhand von Content-Type und Content-Encoding dekodieren.
+
+    Standard ist JSON; bei application/msgpack kommen Datumswerte bereits als
+    zeitzonenbehaftete datetime-Objekte an.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    try:
+        raw = _decompress(body, content_encoding.strip().lower())
+        if media_type == "application/msgpack":
+            import msgpack
+
+            return msgpack.unpackb(raw, timestamp=3)
+        return json.loads(raw.decode("utf-8"))
+    except PayloadError:
+        raise
+    except Exception as exc:
+        raise PayloadError(str(exc)) from exc
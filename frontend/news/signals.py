@@ -0,0 +1,68 @@
+"""Inhaltsversionen der gecachten News-Fragmente bei Änderungen erneuern."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import InhaltsKategorie, News, Quelle, Standort, Text, Zielgruppe
+from .services.fragments import bump_versions_on_commit
+
+
+@receiver([post_save, post_delete], sender=Text)
+def text_changed(sender, instance: Text, **kwargs) -> None:
+    bump_versions_on_commit([instance.news_id])
+
+
+@receiver([post_save, post_delete], sender=News)
+def news_changed(sender, instance: News, **kwargs) -> None:
+    # Die kanonische News zeigt ihre Duplikate an
+    bump_versions_on_commit([instance.pk, instance.canonical_id])
+
+
+# Zwischentabellen der Zuordnungen und das zugehörige Feld an News
+ASSIGNMENT_FIELDS = {
+    News.inhaltskategorien.through: "inhaltskategorien",
+    News.zielgruppen.through: "zielgruppen",
+    News.standorte.through: "standorte",
+}
+
+
+def assignments_changed(sender, instance, action, reverse, pk_set, **kwargs) -> None:
+    if not reverse:
+        if action.startswith("post_"):
+            bump_versions_on_commit([instance.pk])
+    # Von der Kategorie aus geändert, bei clear die News vor dem Entfernen bestimmen
+    elif action in ("post_add", "post_remove"):
+        bump_versions_on_commit(pk_set or ())
+    elif action == "pre_clear":
+        bump_versions_on_commit(
+            News.objects.filter(**{ASSIGNMENT_FIELDS[sender]: instance}).values_list(
+                "pk", flat=True
+            )
+        )
+
+
+for through in ASSIGNMENT_FIELDS:
+    m2m_changed.connect(assignments_changed, sender=through)
+
+
+# Modelle, deren Namen in Karten und Detailansicht erscheinen, und das Feld an News.
+# Quellen werden meist über ihre Unterklassen gespeichert, die eigene Signale senden.
+NAMED_FIELDS = {
+    Quelle: "quelle",
+    **{model: "quelle" for model in Quelle.__subclasses__()},
+    InhaltsKategorie: "inhaltskategorien",
+    Zielgruppe: "zielgruppen",
+    Standort: "standorte",
+}
+
+
+def name_changed(sender, instance, created: bool, **kwargs) -> None:
+    """Umbenannte Quellen und Kategorien erscheinen in Karten und Detailansicht."""
+    if created:
+        return
+    news = News.objects.filter(**{NAMED_FIELDS[sender]: instance})
+    bump_versions_on_commit(news.values_list("pk", flat=True))
+
+
+for model in NAMED_FIELDS:
+    post_save.connect(name_changed, sender=model)
@@ -1,32 +1,56 @@
 import logging
 import os
+import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
+from typing import Optional
 
 from celery import shared_task
-from django.db.models import QuerySet
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
 from django.utils.timezone import now
 
 from .models import *
 from .my_logging import get_logger
 from .services.categories import get_audience_categories, get_content_categories
 from .services.db import close_db_connection
-from .services.processing.categorization.categorize import (
-    get_categorization_from_openai,
-)
+from .services.processing.categorization.categorize import get_categorization
+from .services.processing.circuit_breaker import LLMUnavailable, llm_available
 from .services.processing.cleanup.cleanup import (
     extract_parts,
     get_cleaned_text_from_openai,
 )
+from .services.processing.common import TokenLimitReached, count_used_tokens
+from .services.processing.failures import (
+    clear_failure,
+    exclude_blocked,
+    record_failure,
+)
+from .services.processing.reprocessing import (
+    StaleOutput,
+    charge_budget,
+    estimate_tokens,
+    find_stale_outputs,
+    remaining_budget,
+)
+from .services.processing.translation.lazy import (
+    EAGER_LANGUAGE_CODES,
+    complete_translation,
+    languages_to_translate,
+)
 from .services.processing.translation.translate import translate_html
+from .services.processing.versions import prompt_version, stamp_categorization
 
 
 def add_missing_translations(
     sprachen: QuerySet[Sprache], news: News, openai_api_key: str, token_limit: int
 ):
     logger = get_logger(__name__)
+    failed = False
+    translated = False
 
-    for sprache in sprachen:
+    # Sprachen außer Deutsch/Englisch erst übersetzen, wenn sie gelesen werden
+    for sprache in languages_to_translate(sprachen, news):
         if not Text.objects.filter(news=news, sprache=sprache).exists():
             logger.info(
                 f"Übersetzung für {sprache.name} ({sprache.code}) hinzufügen | {news.titel[:80]}"
@@ -45,6 +69,8 @@ def add_missing_translations(
                 logger.error(
                     f"Fehler beim Übersetzen des Textes: {e} | {news.titel[:80]}"
                 )
+                record_failure(news, ProcessingFailure.STAGE_TRANSLATION, e, logger)
+                failed = True
             else:
                 # Neues Text-Objekt für die übersetzte Sprache erstellen
                 Text.objects.get_or_create(
@@ -53,11 +79,19 @@ def add_missing_translations(
                     defaults={
                         "titel": translated_title,
                         "text": translated_text,
+                        "prompt_version": prompt_version(
+                            ProcessingFailure.STAGE_TRANSLATION
+                        ),
                     },
                 )
                 logger.info(
                     f"Übersetzung für {sprache.name} erfolgreich hinzugefügt | {news.titel[:80]}"
                 )
+                complete_translation(news, sprache, logger)
+                translated = True
+
+    if translated and not failed:
+        clear_failure(news, ProcessingFailure.STAGE_TRANSLATION)
 
 
 def add_audiences_and_categories(
@@ -117,13 +151,16 @@ def process_categorization(
             )
             return
         try:
-            categories, audiences = get_categorization_from_openai(
-                news.titel, german_text, openai_api_key, token_limit
+            categories, audiences, categorized_by = get_categorization(
+                news.titel, german_text, openai_api_key, token_limit, logger
             )
         except Exception as e:
             logger.error(f"Fehler bei Kategorisierung: {e} | {news.titel[:80]}")
+            record_failure(news, ProcessingFailure.STAGE_CATEGORIZATION, e, logger)
         else:
             add_audiences_and_categories(news, categories, audiences)
+            stamp_categorization(news, categorized_by)
+            clear_failure(news, ProcessingFailure.STAGE_CATEGORIZATION)
 
             logger.info(f"Kategorisierung erfolgreich hinzugefügt | {news.titel[:80]}")
 
@@ -146,12 +183,14 @@ def process_cleanup(news: News, openai_api_key, token_limit, logger: logging.Log
             parts = extract_parts(clean_response)
         except Exception as e:
             logger.error(f"Fehler beim Cleanup: {e} | {news.titel[:80]}")
+            record_failure(news, ProcessingFailure.STAGE_CLEANUP, e, logger)
             return
         else:
             # Bisheriges deutsches Text-Objekt aktualisieren
             text_object = Text.objects.get(news=news, sprache__name="Deutsch")
             text_object.text = parts["cleaned_text_de"]
             text_object.titel = parts["cleaned_title_de"]
+            text_object.prompt_version = prompt_version(ProcessingFailure.STAGE_CLEANUP)
             text_object.save()
 
             # Neues Text-Objekt für Englisch erstellen
@@ -160,20 +199,40 @@ def process_cleanup(news: News, openai_api_key, token_limit, logger: logging.Log
                 text=parts["cleaned_text_en"],
                 titel=parts["cleaned_title_en"],
                 sprache=Sprache.objects.get(name="Englisch"),
+                prompt_version=prompt_version(ProcessingFailure.STAGE_CLEANUP),
             )
 
             # Flag is_cleaned_up auf True setzen
             news.is_cleaned_up = True
             news.save()
+            clear_failure(news, ProcessingFailure.STAGE_CLEANUP)
             logger.info(f"Cleanup erfolgreich durchgeführt | {news.titel[:80]}")
 
 
+@shared_task
+def translate_on_read(news_id: int, sprache_id: int):
+    """Beim Lesen angeforderte Übersetzung, schlägt sie fehl, holt der Backfill sie nach."""
+    logger = get_logger(__name__)
+    news = News.objects.filter(pk=news_id).first()
+    if news is None or not news.is_cleaned_up:
+        return
+
+    openai_api_key = os.getenv("OPENAI_API_KEY", "")
+    token_limit = 2_400_000  # Wie beim Empfang neuer News, hier wartet ein Leser
+    add_missing_translations(
+        Sprache.objects.filter(pk=sprache_id), news, openai_api_key, token_limit
+    )
+
+
 # Backfill-Tasks mit Parallelisierung
 
 
 @shared_task
 def backfill_missing_translations():
     logger = get_logger(__name__)
+    if not llm_available():
+        logger.info("OpenAI pausiert (Circuit Breaker), Backfill übersprungen")
+        return
     openai_api_key = os.getenv("OPENAI_API_KEY", "")
     token_limit = 2_000_000  # Token-Limit von 2.000.000, da Backfill-Tasks alter News keine höhere Priorität haben
 
@@ -181,7 +240,11 @@ def backfill_missing_translations():
 
     # Nur News-Objekte, die älter als 5 Minuten sind, werden berücksichtigt
     cutoff_time = now() - timedelta(minutes=5)
-    news_items = News.objects.filter(created_at__lte=cutoff_time)
+    # News im Backoff oder Dead-Letter-Zustand überspringen
+    news_items = exclude_blocked(
+        News.objects.filter(created_at__lte=cutoff_time),
+        ProcessingFailure.STAGE_TRANSLATION,
+    )
 
     with ThreadPoolExecutor(max_workers=10) as executor:
         futures = [
@@ -197,13 +260,20 @@ def backfill_missing_translations():
 @shared_task
 def backfill_missing_categorizations():
     logger = get_logger(__name__)
+    if not llm_available():
+        logger.info("OpenAI pausiert (Circuit Breaker), Backfill übersprungen")
+        return
 
     openai_api_key = os.getenv("OPENAI_API_KEY", "")
     token_limit = 2_000_000  # Token-Limit von 2.000.000, da Backfill-Tasks alter News keine höhere Priorität haben
 
     # Nur News-Objekte, die älter als 5 Minuten sind, werden berücksichtigt
     cutoff_time = now() - timedelta(minutes=5)
-    news_items = News.objects.filter(created_at__lte=cutoff_time)
+    # News im Backoff oder Dead-Letter-Zustand überspringen
+    news_items = exclude_blocked(
+        News.objects.filter(created_at__lte=cutoff_time),
+        ProcessingFailure.STAGE_CATEGORIZATION,
+    )
 
     with ThreadPoolExecutor(max_workers=10) as executor:
         futures = [
@@ -223,13 +293,20 @@ def backfill_missing_categorizations():
 @shared_task
 def backfill_cleanup():
     logger = get_logger(__name__)
+    if not llm_available():
+        logger.info("OpenAI pausiert (Circuit Breaker), Backfill übersprungen")
+        return
 
     openai_api_key = os.getenv("OPENAI_API_KEY", "")
     token_limit = 2_000_000  # Token-Limit von 2.000.000, da Backfill-Tasks alter News keine höhere Priorität haben
 
     # Nur News-Objekte, die älter als 5 Minuten sind, werden berücksichtigt
     cutoff_time = now() - timedelta(minutes=5)
-    news_items = News.objects.filter(created_at__lte=cutoff_time)
+    # News im Backoff oder Dead-Letter-Zustand überspringen
+    news_items = exclude_blocked(
+        News.objects.filter(created_at__lte=cutoff_time),
+        ProcessingFailure.STAGE_CLEANUP,
+    )
 
     with ThreadPoolExecutor(max_workers=10) as executor:
         futures = [
@@ -238,3 +315,255 @@ def backfill_cleanup():
         ]
         for future in as_completed(futures):
             future.result()
+
+
+# Ergebnisse älterer Prompt- oder Kategorienversionen erneuern
+
+
+def reprocess_cleanup(news: News, openai_api_key, token_limit) -> None:
+    german = Text.objects.get(news=news, sprache__code="de")
+    parts = extract_parts(
+        get_cleaned_text_from_openai(news.titel, german.text, openai_api_key, token_limit)
+    )
+    version = prompt_version(ProcessingFailure.STAGE_CLEANUP)
+    with transaction.atomic():
+        for code in ("de", "en"):
+            Text.objects.update_or_create(
+                news=news,
+                sprache=Sprache.objects.get(code=code),
+                defaults={
+                    "text": parts[f"cleaned_text_{code}"],
+                    "titel": parts[f"cleaned_title_{code}"],
+                    "prompt_version": version,
+                },
+            )
+        # Übersetzungen beruhen auf dem alten englischen Text und werden neu erzeugt
+        news.texte.exclude(sprache__code__in=["de", "en"]).delete()
+        news.lazy_translations.all().delete()
+
+
+def reprocess_translation(news: News, sprache: Sprache, openai_api_key, token_limit) -> None:
+    english = Text.objects.get(news=news, sprache__code="en")
+    titel, text = translate_html(
+        english.titel, english.text, sprache, openai_api_key, token_limit
+    )
+    Text.objects.update_or_create(
+        news=news,
+        sprache=sprache,
+        defaults={
+            "titel": titel,
+            "text": text,
+            "prompt_version": prompt_version(ProcessingFailure.STAGE_TRANSLATION),
+        },
+    )
+
+
+def reprocess_categorization(news: News, openai_api_key, token_limit, logger) -> None:
+    german = Text.objects.get(news=news, sprache__code="de")
+    categories, audiences, categorized_by = get_categorization(
+        news.titel, german.text, openai_api_key, token_limit, logger
+    )
+    with transaction.atomic():
+        # Bei Trusted Accounts die manuell gewählten Kategorien behalten, soweit es sie noch gibt
+        if news.quelle_typ != "Trusted Account":
+            news.inhaltskategorien.clear()
+            news.zielgruppen.clear()
+        else:
+            news.inhaltskategorien.remove(
+                *news.inhaltskategorien.exclude(name__in=get_content_categories())
+            )
+            news.zielgruppen.remove(
+                *news.zielgruppen.exclude(name__in=get_audience_categories())
+            )
+            if news.categorized_by == News.CATEGORIZED_BY_MANUAL:
+                categorized_by = News.CATEGORIZED_BY_MANUAL
+        add_audiences_and_categories(news, categories, audiences)
+        stamp_categorization(news, categorized_by)
+
+
+def _reprocess(
+    item: StaleOutput, budget: int, openai_api_key, token_limit, logger
+) -> Optional[int]:
+    """Einen veralteten Schritt erneuern, gibt die geschätzten Tokens zurück (None = Budget reicht nicht)."""
+    news = News.objects.get(pk=item.news_id)
+    source = "en" if item.stage == ProcessingFailure.STAGE_TRANSLATION else "de"
+    text = Text.objects.filter(news=news, sprache__code=source).first()
+    if text is None:
+        return 0
+    tokens = estimate_tokens(item.stage, text.titel, text.text)
+    if tokens > budget:
+        return None
+
+    try:
+        if item.stage == ProcessingFailure.STAGE_CLEANUP:
+            reprocess_cleanup(news, openai_api_key, token_limit)
+        elif item.stage == ProcessingFailure.STAGE_TRANSLATION:
+            sprache = Sprache.objects.get(pk=item.sprache_id)
+            reprocess_translation(news, sprache, openai_api_key, token_limit)
+        else:
+            reprocess_categorization(news, openai_api_key, token_limit, logger)
+    except (LLMUnavailable, TokenLimitReached):
+        raise
+    except Exception as e:
+        logger.error(f"Fehler beim Erneuern ({item.stage}): {e} | {news.titel[:80]}")
+        record_failure(news, item.stage, e, logger)
+    else:
+        clear_failure(news, item.stage)
+        logger.info(f"Mit aktuellem Prompt erneuert ({item.stage}) | {news.titel[:80]}")
+    return tokens
+
+
+@shared_task
+def reprocess_stale_outputs():
+    """Mit älteren Prompts oder Kategorien erzeugte Ergebnisse schrittweise erneuern,
+    viel gelesene und neue News zuerst, innerhalb eines täglichen Token-Budgets."""
+    logger = get_logger(__name__)
+    if not llm_available():
+        logger.info("OpenAI pausiert (Circuit Breaker), Erneuerung übersprungen")
+        return
+
+    budget = remaining_budget()
+    if budget <= 0:
+        logger.info("Tagesbudget für die Erneuerung veralteter Ergebnisse aufgebraucht")
+        return
+
+    openai_api_key = os.getenv("OPENAI_API_KEY", "")
+    token_limit = 2_000_000  # Wie bei den Backfill-Tasks, neue News haben Vorrang
+
+    for item in find_stale_outputs():
+        try:
+            tokens = _reprocess(item, budget, openai_api_key, token_limit, logger)
+        except (LLMUnavailable, TokenLimitReached) as e:
+            logger.info(f"Erneuerung abgebrochen: {e}")
+            return
+        if tokens is None:
+            logger.info("Tagesbudget für die Erneuerung veralteter Ergebnisse erreicht")
+            return
+        charge_budget(tokens)
+        budget -= tokens
+
+
+# Im Admin angestoßene Neuverarbeitung ausgewählter News
+
+
+def _rerun_stage(stage: str, news: News, openai_api_key, token_limit, logger) -> int:
+    """Einen Schritt für eine News neu ausführen, gibt die verbrauchten Tokens zurück.
+
+    Gezählt werden die Usage-Angaben der OpenAI-Antworten, nur wenn eine Antwort keine
+    enthält, wird auf die Schätzung zurückgegriffen.
+    """
+    with count_used_tokens() as used:
+        estimate = _run_stage(stage, news, openai_api_key, token_limit, logger)
+    if used.unreported:
+        return max(used.total, estimate)
+    return used.total
+
+
+def _run_stage(stage: str, news: News, openai_api_key, token_limit, logger) -> int:
+    """Schritt ausführen, gibt die geschätzten Tokens zurück."""
+    if stage == ProcessingFailure.STAGE_CLEANUP:
+        german = Text.objects.get(news=news, sprache__code="de")
+        tokens = estimate_tokens(stage, german.titel, german.text)
+        reprocess_cleanup(news, openai_api_key, token_limit)
+        if not news.is_cleaned_up:
+            news.is_cleaned_up = True
+            news.save(update_fields=["is_cleaned_up"])
+        return tokens
+
+    if stage == ProcessingFailure.STAGE_TRANSLATION:
+        if not news.is_cleaned_up:
+            raise ValueError("News ist noch nicht bereinigt, es gibt keinen englischen Text")
+        english = Text.objects.get(news=news, sprache__code="en")
+        # Vorhandene Übersetzungen und alle, die jetzt ohnehin erzeugt würden
+        sprachen = Sprache.objects.exclude(code__in=EAGER_LANGUAGE_CODES)
+        existing = set(news.texte.values_list("sprache_id", flat=True))  # type: ignore[attr-defined]
+        targets = {sprache.pk: sprache for sprache in sprachen if sprache.pk in existing}
+        targets.update(
+            (sprache.pk, sprache) for sprache in languages_to_translate(sprachen, news)
+        )
+        for sprache in targets.values():
+            reprocess_translation(news, sprache, openai_api_key, token_limit)
+            complete_translation(news, sprache, logger)
+        return len(targets) * estimate_tokens(stage, english.titel, english.text)
+
+    german = Text.objects.get(news=news, sprache__code="de")
+    tokens = estimate_tokens(stage, german.titel, german.text)
+    reprocess_categorization(news, openai_api_key, token_limit, logger)
+    return tokens
+
+
+@shared_task
+def run_reprocessing_job(job_id: int):
+    """Neuverarbeitung aus dem Admin, Fortschritt und Tokens werden am Auftrag gezählt.
+
+    Die News werden nacheinander verarbeitet, ein abgebrochener oder hängengebliebener
+    Auftrag lässt sich so ab seiner Position fortsetzen. Parallel laufen mehrere Aufträge
+    auf den Workern.
+    """
+    logger = get_logger(__name__)
+    job = ReprocessingJob.objects.filter(pk=job_id, finished_at__isnull=True).first()
+    if job is None:
+        return
+    if not llm_available():
+        logger.info("OpenAI pausiert (Circuit Breaker), Neuverarbeitung später")
+        # Wartet nur, gilt also nicht als hängengeblieben
+        if job.started_at is not None:
+            ReprocessingJob.objects.filter(pk=job.pk).update(heartbeat_at=now())
+        run_reprocessing_job.apply_async(args=[job.pk], priority=job.priority, countdown=60)
+        return
+
+    # Auftrag übernehmen, ein noch laufender älterer Task hört vor seiner nächsten News auf
+    runner = uuid.uuid4().hex
+    jobs = ReprocessingJob.objects.filter(pk=job.pk)
+    jobs.update(started_at=job.started_at or now(), heartbeat_at=now(), runner=runner)
+    jobs = jobs.filter(runner=runner)
+    job.refresh_from_db(fields=["done", "failed"])
+    openai_api_key = os.getenv("OPENAI_API_KEY", "")
+    token_limit = 2_400_000  # Wie beim Empfang neuer News, hier warten Moderierende
+
+    for news_id in job.news_ids[job.processed :]:
+        # Im Admin abgebrochen oder von einem neueren Task übernommen
+        if not jobs.filter(finished_at__isnull=True).update(heartbeat_at=now()):
+            return
+        news = News.objects.filter(pk=news_id).first()
+        if news is None:
+            jobs.update(failed=F("failed") + 1, last_error=f"News {news_id} gelöscht")
+            continue
+
+        try:
+            tokens = _rerun_stage(job.stage, news, openai_api_key, token_limit, logger)
+        except (LLMUnavailable, TokenLimitReached) as e:
+            logger.info(f"Neuverarbeitung abgebrochen: {e}")
+            jobs.update(finished_at=now(), last_error=str(e))
+            return
+        except Exception as e:
+            logger.error(f"Fehler bei der Neuverarbeitung ({job.stage}): {e} | {news.titel[:80]}")
+            record_failure(news, job.stage, e, logger)
+            jobs.update(failed=F("failed") + 1, last_error=f"{news.titel[:80]}: {e}")
+        else:
+            clear_failure(news, job.stage)
+            # Zählt auch zum Tagesbudget der automatischen Erneuerung
+            charge_budget(tokens)
+            jobs.update(done=F("done") + 1, tokens=F("tokens") + tokens)
+
+    jobs.update(finished_at=now())
+    logger.info(f"Neuverarbeitung abgeschlossen: {job}")
+
+
+@shared_task
+def resume_stale_reprocessing_jobs():
+    """Aufträge ohne Lebenszeichen (z. B. nach einem Neustart des Workers) neu einreihen."""
+    logger = get_logger(__name__)
+    cutoff = now() - ReprocessingJob.HEARTBEAT_TIMEOUT
+    stale = ReprocessingJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        finished_at__isnull=True,
+        started_at__isnull=False,
+    )
+    for job in stale:
+        # Lebenszeichen vorab setzen, damit ein zweiter Lauf den Auftrag nicht erneut einreiht
+        if ReprocessingJob.objects.filter(pk=job.pk, heartbeat_at=job.heartbeat_at).update(
+            heartbeat_at=now()
+        ):
+            logger.warning(f"Neuverarbeitung ohne Lebenszeichen, setze fort: {job}")
+            run_reprocessing_job.apply_async(args=[job.pk], priority=job.priority)
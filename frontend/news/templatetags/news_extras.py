@@ -4,6 +4,7 @@ from django import template
 from django.utils.translation import get_language
 
 from ..models import News
+from ..services.fragments import lookup_fragments, store_fragment
 
 register = template.Library()
 
@@ -17,3 +18,33 @@ def get_translated_title(news: News) -> str:
         return news.titel
 
     return news.get_translated_title(language)
+
+
+class NewsFragmentNode(template.Node):
+    def __init__(self, nodelist, kind, news):
+        self.nodelist = nodelist
+        self.kind = kind
+        self.news = news
+
+    def render(self, context):
+        kind = self.kind.resolve(context)
+        news = self.news.resolve(context)
+        # Von der View bereits für die ganze Seite nachgeschlagen, sonst einzeln
+        fragment = context.get("news_fragments", {}).get((kind, news.pk))
+        if fragment is None:
+            fragment = lookup_fragments(kind, [news.pk], get_language() or "")[news.pk]
+        if fragment.html is None:
+            store_fragment(fragment, self.nodelist.render(context))
+        return fragment.html
+
+
+@register.tag(name="news_fragment")
+def news_fragment(parser, token):
+    """Gerendertes Fragment je News und Sprache cachen:
+    {% news_fragment "card" news %}…{% endnews_fragment %}"""
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(f"{bits[0]} erwartet Art und News")
+    nodelist = parser.parse(("endnews_fragment",))
+    parser.delete_first_token()
+    return NewsFragmentNode(nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]))
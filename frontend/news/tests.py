@@ -1,3 +1,515 @@
-from django.test import TestCase
+import gzip
+import html
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import msgpack
+import zstandard
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from .management.commands.benchmark_pipeline import _entries, create_master_data
+from .management.commands.train_category_classifier import load_training_data
+from .management.openai_stub import OpenAIStubServer, StubConfig
+from .models import (
+    ExterneWebsite,
+    InhaltsKategorie,
+    News,
+    OpenAITokenUsage,
+    ProcessingFailure,
+    Quelle,
+    ReprocessingJob,
+    Sprache,
+    Text,
+    Zielgruppe,
+)
+from .services import change_detection
+from .services.fragments import lookup_fragments
+from .services.near_duplicates import reuse_processed_content
+from .services.processing.common import record_used_tokens
+from .services.processing.failures import retry_delay
+from .services.processing.prompt_preprocessing import prepare_prompt_text
+from .services.search import paginate_after
+from .services.vocabulary import diff_vocabulary
+from .services.wire_format import PayloadError, decode_payload
+from . import tasks
+from .views import receive_news
+
+
+class ReceiveNewsTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {"API_KEY": "key", "OPENAI_API_KEY": "sk-test"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reports_status_per_entry_instead_of_failing_the_batch(self):
+        def process(entry, *args, **kwargs):
+            if entry["titel"] == "kaputt":
+                raise RuntimeError("OpenAI nicht erreichbar")
+            return receive_news.STATUS_CREATED
+
+        with mock.patch.object(receive_news, "process_news_entry", side_effect=process):
+            response = self.client.post(
+                reverse("receive_news"),
+                json.dumps([{"titel": "ok"}, {"titel": "kaputt"}]),
+                content_type="application/json",
+                headers={"API-Key": "key"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(result["index"], result["status"]) for result in response.json()["results"]],
+            [(0, "created"), (1, "error")],
+        )
+
+
+class ChangeDetectionTests(TestCase):
+    def setUp(self):
+        self.date = now()
+        News.objects.create(
+            titel="Sommerfest",
+            erstellungsdatum=self.date,
+            link="https://rptu.de/sommerfest",
+            quelle=Quelle.objects.create(slug="fachschaft", name="Fachschaft"),
+            quelle_typ="Fachschaft",
+            content_hash=change_detection.content_hash("Am Freitag"),
+        )
+
+    def test_same_link_from_other_source_type_is_new(self):
+        change = change_detection.classify_entry(
+            "https://rptu.de/sommerfest", "Sommerfest", "Ganz anderer Text", self.date, "Rundmail"
+        )
+
+        self.assertEqual(change.status, change_detection.STATUS_NEW)
+
+    def test_same_link_from_same_source_type_is_compared(self):
+        unchanged = change_detection.classify_entry(
+            "https://rptu.de/sommerfest", "Sommerfest", "Am  Freitag", self.date, "Fachschaft"
+        )
+        modified = change_detection.classify_entry(
+            "https://rptu.de/sommerfest", "Sommerfest", "Am Samstag", self.date, "Fachschaft"
+        )
+
+        self.assertEqual(unchanged.status, change_detection.STATUS_UNCHANGED)
+        self.assertEqual(modified.status, change_detection.STATUS_MODIFIED)
+        self.assertTrue(modified.text_changed)
+
+    def test_trusted_submissions_sharing_a_link_are_separate(self):
+        News.objects.create(
+            titel="Spieleabend",
+            erstellungsdatum=self.date,
+            link="https://rptu.de/fachschaft",
+            quelle=Quelle.objects.create(slug="anna", name="anna"),
+            quelle_typ="Trusted Account",
+            content_hash=change_detection.content_hash("Am Freitag"),
+        )
+
+        other = change_detection.classify_entry(
+            "https://rptu.de/fachschaft", "Tutorium", "Am Montag", now(), "Trusted Account"
+        )
+        same = change_detection.classify_entry(
+            "https://rptu.de/fachschaft", "Spieleabend", "Am Freitag", self.date, "Trusted Account"
+        )
+
+        self.assertEqual(other.status, change_detection.STATUS_NEW)
+        self.assertEqual(same.status, change_detection.STATUS_UNCHANGED)
+
+
+class ReuseProcessedContentTests(TestCase):
+    def setUp(self):
+        self.quelle = Quelle.objects.create(slug="rundmail", name="Rundmail")
+        self.canonical = self.create_news("Sprechstunde am Montag", is_cleaned_up=True)
+        self.category = InhaltsKategorie.objects.create(slug="test", name="Test")
+        self.canonical.inhaltskategorien.add(self.category)
+
+    def create_news(self, text, **kwargs):
+        return News.objects.create(
+            titel=text,
+            erstellungsdatum=now(),
+            quelle=self.quelle,
+            quelle_typ="Rundmail",
+            content_hash=change_detection.content_hash(text),
+            **kwargs,
+        )
+
+    def test_similar_text_is_not_reused(self):
+        news = self.create_news("Sprechstunde am Dienstag")
+
+        self.assertFalse(reuse_processed_content(news, self.canonical))
+        news.refresh_from_db()
+        self.assertFalse(news.is_cleaned_up)
+        self.assertFalse(news.inhaltskategorien.exists())
+
+    def test_same_text_is_reused(self):
+        news = self.create_news("Sprechstunde  am Montag\n")
+
+        self.assertTrue(reuse_processed_content(news, self.canonical))
+        news.refresh_from_db()
+        self.assertTrue(news.is_cleaned_up)
+        self.assertEqual(list(news.inhaltskategorien.all()), [self.category])
+
+
+class TrainingDataTests(TestCase):
+    def test_only_news_categorized_by_openai_are_used(self):
+        quelle = Quelle.objects.create(slug="rundmail", name="Rundmail")
+        deutsch = Sprache.objects.create(name="Deutsch", name_englisch="German", code="de")
+        category = InhaltsKategorie.objects.create(slug="test", name="Test")
+        audience = Zielgruppe.objects.create(slug="studierende", name="Studierende")
+        for categorized_by, label in News.CATEGORIZED_BY_CHOICES:
+            news = News.objects.create(
+                titel=label,
+                erstellungsdatum=now(),
+                quelle=quelle,
+                quelle_typ="Rundmail",
+                is_cleaned_up=True,
+                categorized_by=categorized_by,
+            )
+            news.inhaltskategorien.add(category)
+            news.zielgruppen.add(audience)
+            Text.objects.create(news=news, sprache=deutsch, titel=news.titel, text="Vortrag")
+
+        documents, labels = load_training_data()
+
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(labels, [{"Test", "Studierende"}])
+
+
+class PromptPreprocessingTests(SimpleTestCase):
+    HTML = (
+        '<p style="margin:0"><span lang="DE">Anmeldung unter <a class="x" target="_blank" '
+        'href="https://rptu.de/anmeldung?utm_source=mail&amp;id=42">diesem Link</a>.</span></p>'
+        '<!-- Kommentar --><p>Fragen an <a href="mailto:info@rptu.de">info@rptu.de</a> '
+        "oder www.rptu.de/faq.</p><br><br><br><br>"
+        "<p>Nochmal: <a href='https://rptu.de/anmeldung?utm_source=mail&amp;id=42'>hier</a> "
+        "&uuml;ber &lt;Details&gt;</p><p> </p>"
+    )
+    # href-Werte, freistehende Links und E-Mail-Adressen
+    LINK = re.compile(
+        r"""href\s*=\s*["']([^"']+)["']"""
+        r"""|(?:https?://|www\.)[^\s"'<>]+[\w/]"""
+        r"|[\w.+-]+@[\w-]+(?:\.[\w-]+)+"
+    )
+
+    def links(self, text):
+        return sorted(
+            html.unescape(match.group(1) or match.group(0)) for match in self.LINK.finditer(text)
+        )
+
+    def test_links_and_addresses_survive_round_trip(self):
+        prompt_text, placeholders = prepare_prompt_text(self.HTML)
+
+        self.assertNotIn("rptu.de", prompt_text)
+        self.assertEqual(self.links(placeholders.restore(prompt_text)), self.links(self.HTML))
+
+    def test_repeated_link_shares_placeholder(self):
+        prompt_text, placeholders = prepare_prompt_text(self.HTML)
+
+        self.assertEqual(prompt_text.count("{L1}"), 2)
+        self.assertEqual(set(placeholders.values), {"L1", "L2", "M1"})
+
+    def test_markup_is_minified(self):
+        prompt_text, _ = prepare_prompt_text(self.HTML)
+
+        self.assertNotIn("style=", prompt_text)
+        self.assertNotIn("<span", prompt_text)
+        self.assertNotIn("Kommentar", prompt_text)
+        self.assertNotIn("<br><br><br>", prompt_text)
+        self.assertIn("über &lt;Details&gt;", prompt_text)
+
+    def test_unknown_placeholder_is_left_alone(self):
+        _, placeholders = prepare_prompt_text(self.HTML)
+
+        self.assertEqual(
+            placeholders.restore("{L9} und {L1}"), "{L9} und " + placeholders.values["L1"]
+        )
+
+
+class DecodePayloadTests(SimpleTestCase):
+    ENTRIES = [{"titel": "Sommerfest", "erstellungsdatum": "19.10.2026 12:00:00"}]
+
+    def test_gzip_json(self):
+        body = gzip.compress(json.dumps(self.ENTRIES).encode("utf-8"))
+
+        self.assertEqual(
+            decode_payload(body, "application/json; charset=utf-8", "gzip"), self.ENTRIES
+        )
+
+    def test_uncompressed_json(self):
+        self.assertEqual(
+            decode_payload(json.dumps(self.ENTRIES).encode("utf-8"), "application/json", ""),
+            self.ENTRIES,
+        )
+
+    def test_zstd_msgpack_keeps_timezone(self):
+        date = datetime(2026, 10, 19, 10, 0, tzinfo=timezone.utc)
+        body = zstandard.ZstdCompressor().compress(
+            msgpack.packb([{"erstellungsdatum": date}], datetime=True)
+        )
+
+        (entry,) = decode_payload(body, "application/msgpack", "zstd")
+
+        self.assertEqual(entry["erstellungsdatum"], date)
+        self.assertIsNotNone(entry["erstellungsdatum"].tzinfo)
+
+    def test_corrupt_body_raises_payload_error(self):
+        with self.assertRaises(PayloadError):
+            decode_payload(b"kein gzip", "application/json", "gzip")
+        with self.assertRaises(PayloadError):
+            decode_payload(b"{", "application/json", "")
+
+
+class RetryDelayTests(SimpleTestCase):
+    def test_delay_doubles_up_to_a_day(self):
+        self.assertEqual(
+            [retry_delay(attempts) for attempts in range(1, 9)],
+            [
+                timedelta(minutes=15),
+                timedelta(minutes=30),
+                timedelta(hours=1),
+                timedelta(hours=2),
+                timedelta(hours=4),
+                timedelta(hours=8),
+                timedelta(hours=16),
+                timedelta(hours=24),
+            ],
+        )
+
+
+class DiffVocabularyTests(SimpleTestCase):
+    def entry(self, id, name, slug=None):
+        return {"id": id, "names": {"de": name}, **({"slug": slug} if slug else {})}
+
+    def test_entries_are_compared_by_id(self):
+        old = {
+            "content_categories": [
+                self.entry("a", "Vorträge"),
+                self.entry("b", "Sport"),
+                self.entry("c", "Mensa", "essen"),
+            ],
+            "audience_categories": [self.entry("x", "Studierende")],
+        }
+        new = {
+            "content_categories": [
+                self.entry("a", "Vorträge und Seminare"),
+                self.entry("c", "Mensa ", "essen"),
+                self.entry("d", "Kultur"),
+                {"names": {"de": "Ohne ID"}},
+            ],
+            "audience_categories": [self.entry("x", "Studierende")],
+        }
+
+        diff = diff_vocabulary(old, new)
+
+        self.assertEqual(diff.added, [("content_categories", self.entry("d", "Kultur"))])
+        self.assertEqual(diff.removed, [("content_categories", self.entry("b", "Sport"))])
+        self.assertEqual(
+            diff.renamed,
+            [
+                (
+                    "content_categories",
+                    self.entry("a", "Vorträge"),
+                    self.entry("a", "Vorträge und Seminare"),
+                )
+            ],
+        )
+
+    def test_unchanged_vocabulary_is_empty(self):
+        vocabulary = {"content_categories": [self.entry("a", "Sport")]}
+
+        self.assertFalse(diff_vocabulary(vocabulary, vocabulary))
+
+
+class PaginateAfterTests(TestCase):
+    def setUp(self):
+        quelle = Quelle.objects.create(slug="rundmail", name="Rundmail")
+        for index, views in enumerate([5, 3, 3, 3, 1]):
+            News.objects.create(
+                titel=f"News {index}",
+                erstellungsdatum=now(),
+                quelle=quelle,
+                quelle_typ="Rundmail",
+                view_count=views,
+            )
+        # Wie bei der Suche: absteigend nach Relevanz, gleiche Relevanz nach pk
+        self.queryset = News.objects.annotate(
+            rank=Cast(F("view_count"), FloatField())
+        ).order_by("-rank", "-pk")
+
+    def test_pages_cover_all_results_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginate_after(self.queryset, cursor, limit=2)
+            seen += [news.pk for news in page]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, list(self.queryset.values_list("pk", flat=True)))
+
+    def test_last_full_page_has_no_cursor(self):
+        _, cursor = paginate_after(self.queryset, None, limit=5)
+
+        self.assertIsNone(cursor)
+
+    def test_invalid_cursor_starts_from_the_beginning(self):
+        page, _ = paginate_after(self.queryset, "kaputt", limit=2)
+
+        self.assertEqual(
+            [news.pk for news in page], list(self.queryset.values_list("pk", flat=True)[:2])
+        )
+
+
+class ReprocessingJobTests(TestCase):
+    def setUp(self):
+        quelle = Quelle.objects.create(slug="rundmail", name="Rundmail")
+        self.news = [
+            News.objects.create(
+                titel=f"News {index}", erstellungsdatum=now(), quelle=quelle, quelle_typ="Rundmail"
+            )
+            for index in range(2)
+        ]
+        self.job = ReprocessingJob.objects.create(
+            stage=ProcessingFailure.STAGE_CATEGORIZATION,
+            news_ids=[news.pk for news in self.news],
+            total=2,
+            started_at=now() - timedelta(hours=1),
+            heartbeat_at=now() - timedelta(hours=1),
+        )
+        for target, value in (("llm_available", True), ("charge_budget", None)):
+            patcher = mock.patch.object(tasks, target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_stale_job_is_requeued_once(self):
+        with mock.patch.object(tasks.run_reprocessing_job, "apply_async") as apply_async:
+            tasks.resume_stale_reprocessing_jobs()
+            tasks.resume_stale_reprocessing_jobs()
+
+        apply_async.assert_called_once_with(args=[self.job.pk], priority=self.job.priority)
+
+    def test_job_with_recent_heartbeat_is_left_alone(self):
+        ReprocessingJob.objects.filter(pk=self.job.pk).update(heartbeat_at=now())
+
+        with mock.patch.object(tasks.run_reprocessing_job, "apply_async") as apply_async:
+            tasks.resume_stale_reprocessing_jobs()
+
+        apply_async.assert_not_called()
+
+    def test_restarted_task_continues_after_processed_news(self):
+        ReprocessingJob.objects.filter(pk=self.job.pk).update(done=1)
+
+        with mock.patch.object(tasks, "_rerun_stage", return_value=10) as rerun:
+            tasks.run_reprocessing_job(self.job.pk)
+
+        self.assertEqual(rerun.call_args.args[1], self.news[1])
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.done, self.job.tokens), (2, 10))
+        self.assertIsNotNone(self.job.finished_at)
+
+    def test_replaced_task_stops(self):
+        def take_over(*args):
+            ReprocessingJob.objects.filter(pk=self.job.pk).update(runner="neuer-task")
+            return 10
+
+        with mock.patch.object(tasks, "_rerun_stage", side_effect=take_over) as rerun:
+            tasks.run_reprocessing_job(self.job.pk)
+
+        rerun.assert_called_once()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.done, 0)
+        self.assertIsNone(self.job.finished_at)
+
+    def test_job_counts_reported_tokens_and_estimates_only_without_usage(self):
+        usage = OpenAITokenUsage.objects.create(date=now().date())
+        responses = iter(
+            [SimpleNamespace(usage=SimpleNamespace(total_tokens=1234)), SimpleNamespace(usage=None)]
+        )
+
+        def run_stage(*args):
+            record_used_tokens(usage, next(responses))
+            return 500
+
+        with mock.patch.object(tasks, "_run_stage", side_effect=run_stage):
+            tasks.run_reprocessing_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        usage.refresh_from_db()
+        self.assertEqual(self.job.tokens, 1234 + 500)
+        self.assertEqual(usage.used_tokens, 1234)
+
+
+class FragmentInvalidationTests(TestCase):
+    def fragment_key(self, news):
+        return lookup_fragments("card", [news.pk], "de")[news.pk].key
+
+    def test_renamed_source_subclass_invalidates_its_news(self):
+        source = ExterneWebsite.objects.create(name="Fachbereich", slug="fachbereich")
+        news = News.objects.create(
+            titel="Sommerfest", erstellungsdatum=now(), quelle=source, quelle_typ="Externe Website"
+        )
+        before = self.fragment_key(news)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            source.name = "Fachbereich Informatik"
+            source.save()
+
+        self.assertNotEqual(self.fragment_key(news), before)
+
+
+class PipelineTests(TransactionTestCase):
+    """Empfang bis Kategorisierung gegen den OpenAI-Stub; die Worker-Threads von
+    ReceiveNews brauchen committete Daten, daher TransactionTestCase."""
+
+    def setUp(self):
+        create_master_data()
+        self.source = ExterneWebsite.objects.create(name="Pipeline-Test", slug="pipeline-test")
+
+        server = OpenAIStubServer(0, StubConfig(latency_ms=0, jitter_ms=0))
+        server.start_in_background()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        patcher = mock.patch.dict(
+            os.environ,
+            {"OPENAI_BASE_URL": server.base_url, "OPENAI_API_KEY": "stub", "API_KEY": "key"},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, entries):
+        response = self.client.post(
+            reverse("receive_news"),
+            json.dumps(entries),
+            content_type="application/json",
+            headers={"API-Key": "key"},
+        )
+        self.assertEqual(response.status_code, 200)
+        return [result["status"] for result in response.json()["results"]]
+
+    def test_new_entry_is_cleaned_translated_and_categorized(self):
+        entries = _entries(1, self.source.name, "test", random.Random(0))
+
+        self.assertEqual(self.post(entries), ["created"])
+
+        news = News.objects.get(link=entries[0]["link"])
+        self.assertTrue(news.is_cleaned_up)
+        self.assertLessEqual(
+            {"de", "en"}, set(news.texte.values_list("sprache__code", flat=True))
+        )
+        self.assertTrue(news.inhaltskategorien.exists())
+        self.assertTrue(news.zielgruppen.exists())
+        self.assertEqual(news.categorized_by, News.CATEGORIZED_BY_LLM)
+
+    def test_resent_entry_is_unchanged(self):
+        entries = _entries(1, self.source.name, "test", random.Random(0))
+        self.post(entries)
+
+        self.assertEqual(self.post(entries), ["unchanged"])
+        self.assertEqual(News.objects.count(), 1)
@@ -1,20 +1,24 @@
 from typing import Any, List
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import QuerySet
+from django.db.models import F, QuerySet, prefetch_related_objects
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_GET
 
 from ..forms import PreferencesForm
-from ..models import CalendarEvent, News, User
+from ..models import CalendarEvent, News, Sprache, User
+from ..services.fragments import Fragment, lookup_fragments
 from ..services.news_filters import (
     FilterParams,
     get_filtered_queryset,
     get_objects_with_metadata,
     paginate_queryset,
 )
+from ..services.processing.translation.lazy import is_lazy, request_translation
+from ..services.search import clean_query, paginate_after, search_news
+from ..tasks import translate_on_read
 
 
 def _build_active_filters(request: HttpRequest) -> FilterParams:
@@ -27,6 +31,48 @@ def _build_active_filters(request: HttpRequest) -> FilterParams:
     }
 
 
+def _card_fragments(
+    request: HttpRequest, news_list: list[News]
+) -> dict[tuple[str, int], Fragment]:
+    """Gecachte Karten der Seite; nur für fehlende werden Quelle und Kategorien geladen."""
+    fragments = lookup_fragments(
+        "card", [news.pk for news in news_list], getattr(request, "LANGUAGE_CODE", "")
+    )
+    prefetch_related_objects(
+        [news for news in news_list if fragments[news.pk].html is None],
+        "quelle",
+        "inhaltskategorien",
+    )
+    return {("card", pk): fragment for pk, fragment in fragments.items()}
+
+
+def _news_page(
+    request: HttpRequest,
+    queryset: QuerySet[News],
+    offset: int = 0,
+    limit: int = 20,
+) -> dict[str, Any]:
+    """Seite der News-Liste: bei einer Suche nach Relevanz mit Keyset-Pagination, sonst per Offset."""
+    query = clean_query(request.GET.get("q"))
+    if query:
+        results = search_news(queryset, query, getattr(request, "LANGUAGE_CODE", ""))
+        news_list, next_cursor = paginate_after(results, request.GET.get("after"), limit)
+        return {
+            "news_list": news_list,
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+            "news_fragments": _card_fragments(request, news_list),
+        }
+
+    total_filtered_count = queryset.count()
+    news_list = list(paginate_queryset(queryset, offset, limit))
+    return {
+        "news_list": news_list,
+        "has_more": total_filtered_count > (offset + limit),
+        "news_fragments": _card_fragments(request, news_list),
+    }
+
+
 def _get_upcoming_events(request: HttpRequest) -> List[CalendarEvent]:
     """Gibt die kommenden Kalenderereignisse zurück."""
     now = timezone.now()
@@ -121,9 +167,7 @@ def news_view(request: HttpRequest) -> HttpResponse:
 
     # Hole gefilterte News basierend auf den GET-Parametern für initiale Anzeige
     news_items_queryset = get_filtered_queryset(active_filters)
-    total_filtered_count = news_items_queryset.count()
-    paginated_items = paginate_queryset(news_items_queryset)
-    has_more = total_filtered_count > len(paginated_items)
+    page = _news_page(request, news_items_queryset)
 
     # Objekte, nach denen gefiltert werden kann
     objects_to_filter = get_objects_with_metadata()
@@ -134,13 +178,13 @@ def news_view(request: HttpRequest) -> HttpResponse:
 
     context = {
         "upcoming_events": upcoming_events,
-        "news_list": paginated_items,
+        **page,
         "locations": locations,
         "categories": categories,
         "audiences": audiences,
         "sources": sources,
         "active_filters": active_filters,
-        "has_more": has_more,
+        "search_query": clean_query(request.GET.get("q")),
     }
 
     return render(request, "news/news.html", context)
@@ -155,35 +199,58 @@ def news_partial(request: HttpRequest) -> HttpResponse:
 
     # Hole gefilterte News basierend auf den GET-Parametern
     news_items_queryset = get_filtered_queryset(active_filters)
-    total_filtered_count = news_items_queryset.count()
-    paginated_items = paginate_queryset(news_items_queryset, offset, limit)
-    has_more = total_filtered_count > (offset + limit)
 
     return render(
         request,
         "news/partials/_news_list.html",
-        {"news_list": paginated_items, "has_more": has_more},
+        _news_page(request, news_items_queryset, offset, limit),
     )
 
 
 @require_GET
 def news_detail(request: HttpRequest, pk: int) -> HttpResponse:
     """Partielles Laden von News-Details oder bei Direktaufruf die komplette News-Seite mit Details."""
-    news: News = get_object_or_404(
-        News.objects.prefetch_related("texte__sprache", "quelle"), pk=pk
-    )
+    news: News = get_object_or_404(News.objects.select_related("quelle"), pk=pk)
+
+    # Aufrufe zählen, viel gelesene News werden bei neuen Prompts zuerst erneuert
+    News.objects.filter(pk=pk).update(view_count=F("view_count") + 1)
 
     # Sprache aus Django-Einstellungen holen
     lang = getattr(request, "LANGUAGE_CODE", "")
 
-    # Hole den Text für die gewählte Sprache, falls vorhanden
-    text = news.texte.filter(sprache__code=lang).first()  # type: ignore[attr-defined]
+    # Gecachte Detailansicht, dann werden Text und Duplikate nicht gebraucht
+    fragment = lookup_fragments("detail", [news.pk], lang)[news.pk]
+    text = None
+    translation_pending = False
+    duplicates = News.objects.none()
+
+    if fragment.html is None:
+        # Hole den Text für die gewählte Sprache, falls vorhanden
+        text = news.texte.filter(sprache__code=lang).first()  # type: ignore[attr-defined]
+
+        # Fehlende Übersetzung anfordern und bis dahin den englischen Text zeigen
+        if text is None and is_lazy(lang):
+            sprache = Sprache.objects.filter(code=lang).first()
+            text = news.texte.filter(sprache__code="en").first()  # type: ignore[attr-defined]
+            if sprache is not None and text is not None:
+                translation_pending = True
+                if request_translation(news, sprache):
+                    translate_on_read.delay(news.pk, sprache.pk)
+
+        # Beinahe-Duplikate aus anderen Quellen
+        duplicates = news.duplicates.select_related("quelle").order_by("erstellungsdatum")  # type: ignore[attr-defined]
 
     if request.GET.get("partial") == "true":
         return render(
             request,
             "news/partials/_news_detail.html",
-            {"news": news, "text": text},
+            {
+                "news": news,
+                "text": text,
+                "duplicates": duplicates,
+                "translation_pending": translation_pending,
+                "news_fragments": {("detail", news.pk): fragment},
+            },
         )
 
     # Kommende Kalenderereignisse für die Seitenleiste
@@ -207,6 +274,9 @@ def news_detail(request: HttpRequest, pk: int) -> HttpResponse:
             "detail_news": news,
             "upcoming_events": upcoming_events,
             "text": text,
+            "duplicates": duplicates,
+            "translation_pending": translation_pending,
+            "news_fragments": {("detail", news.pk): fragment},
         },
     )
 
@@ -226,13 +296,14 @@ def foryoupage(request: HttpRequest) -> HttpResponse:
     preferences = _build_user_preferences(user)
     news_items_queryset = get_filtered_queryset(preferences)
     total_filtered_count = news_items_queryset.count()
-    paginated_items = paginate_queryset(news_items_queryset)
+    paginated_items = list(paginate_queryset(news_items_queryset))
     has_more = total_filtered_count > len(paginated_items)
 
     context = {
         "upcoming_events": upcoming_events,
         "news_list": paginated_items,
         "has_more": has_more,
+        "news_fragments": _card_fragments(request, paginated_items),
         "preferences_form": PreferencesForm(instance=user),
     }
 
@@ -253,13 +324,17 @@ def foryoupage_partial(request: HttpRequest) -> HttpResponse:
     preferences = _build_user_preferences(user)
     news_items_queryset = get_filtered_queryset(preferences)
     total_filtered_count = news_items_queryset.count()
-    paginated_items = paginate_queryset(news_items_queryset, offset, limit)
+    paginated_items = list(paginate_queryset(news_items_queryset, offset, limit))
     has_more = total_filtered_count > (offset + limit)
 
     return render(
         request,
         "news/partials/_news_list.html",
-        {"news_list": paginated_items, "has_more": has_more},
+        {
+            "news_list": paginated_items,
+            "has_more": has_more,
+            "news_fragments": _card_fragments(request, paginated_items),
+        },
     )
 
 
@@ -3,28 +3,38 @@ import json
 import logging
 import os
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
 from django.http import JsonResponse
 from django.utils.decorators import method_decorator
 from django.utils.text import slugify
-from django.utils.timezone import make_aware
+from django.utils.timezone import localtime, make_aware
 from django.utils.translation import gettext, override
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
 from ..models import *
 from ..my_logging import get_logger
-from ..services.db import close_db_connection
-from ..services.processing.categorization.categorize import (
-    get_categorization_from_openai,
+from ..services.change_detection import (
+    STATUS_MODIFIED,
+    STATUS_UNCHANGED,
+    ChangeResult,
+    classify_entry,
+    content_hash,
 )
+from ..services.db import close_db_connection
+from ..services.near_duplicates import index_news, reuse_processed_content
+from ..services.wire_format import PayloadError, decode_payload
+from ..services.processing.categorization.categorize import get_categorization
 from ..services.processing.cleanup.cleanup import (
     extract_parts,
     get_cleaned_text_from_openai,
 )
+from ..services.processing.failures import record_failure
+from ..services.processing.versions import prompt_version, stamp_categorization
 from ..tasks import add_audiences_and_categories, add_missing_translations
 
 RUNDMAIL_SOURCE_TYPES = {
@@ -62,6 +72,10 @@ JOB_SAMMEL_RUNDMAIL_BASE_NAMES = {
     "fr": "Circulaire collective des offres d'emploi",
 }
 
+# Parallelität und maximale Anzahl gleichzeitig offener Einträge beim Streaming-Ingest
+STREAM_WORKERS = 10
+STREAM_MAX_IN_FLIGHT = 50
+
 DATE_PREPOSITIONS = {
     "de": "vom",
     "en": "from",
@@ -93,8 +107,22 @@ def _build_rundmail_localized_names(
     return {}
 
 
+# Ergebnis von process_news_entry je Eintrag
+# (zusätzlich STATUS_UNCHANGED und STATUS_MODIFIED aus der Änderungserkennung)
+STATUS_CREATED = "created"
+STATUS_DEFERRED = "deferred"
+STATUS_DUPLICATE = "duplicate"
+STATUS_SKIPPED = "skipped"
+
+
 @close_db_connection
-def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
+def process_news_entry(
+    news_entry, openai_api_key, logger: logging.Logger, defer_llm: bool = False
+) -> str:
+    """News-Eintrag speichern und verarbeiten, gibt den Status des Eintrags zurück.
+
+    Mit defer_llm werden Cleanup, Übersetzung und Kategorisierung den Backfill-Tasks überlassen.
+    """
     # Maximale Token-Anzahl für die OpenAI-API-Aufrufe
     TOKEN_LIMIT = 2_400_000
 
@@ -107,23 +135,30 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
 
     # Erstellungsdatum parsen und sicherstellen, dass eine Zeitzone gesetzt ist
     try:
-        erstellungsdatum: datetime = make_aware(
-            datetime.strptime(news_entry["erstellungsdatum"], "%d.%m.%Y %H:%M:%S")
-        )
-    except (TypeError, ValueError):
+        raw_date = news_entry["erstellungsdatum"]
+        if isinstance(raw_date, datetime):
+            # MessagePack liefert einen UTC-Zeitstempel, für Quellennamen in lokale Zeit umrechnen
+            erstellungsdatum: datetime = (
+                localtime(raw_date) if raw_date.tzinfo is not None else make_aware(raw_date)
+            )
+        else:
+            erstellungsdatum = make_aware(
+                datetime.strptime(raw_date, "%d.%m.%Y %H:%M:%S")
+            )
+    except (KeyError, TypeError, ValueError):
         logger.error(
             f"Erstellungsdatum ungültig, Eintrag wird übersprungen | {truncated_title}"
         )
-        return
+        return STATUS_SKIPPED
 
-    # Quellen-Objekt erstellen
+    # Quellentyp prüfen
     source_type_raw = news_entry.get("quelle_typ")
     if not isinstance(source_type_raw, str):
         logger.warning(
             "Quelle ohne gültigen Typ, Eintrag wird übersprungen | %s",
             truncated_title,
         )
-        return
+        return STATUS_SKIPPED
 
     source_type = source_type_raw.strip()
     if not source_type:
@@ -131,8 +166,26 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
             "Quelle ohne gültigen Typ, Eintrag wird übersprungen | %s",
             truncated_title,
         )
-        return
+        return STATUS_SKIPPED
+
+    # Änderungserkennung: unveränderte Einträge kosten nur eine Abfrage über den Link
+    # innerhalb desselben Quellentyps
+    change = classify_entry(
+        news_entry.get("link") or "",
+        news_entry.get("titel") or "",
+        news_entry.get("text") or "",
+        erstellungsdatum,
+        source_type,
+    )
+    if change.status == STATUS_UNCHANGED:
+        logger.info(f"News-Objekt unverändert | {truncated_title}")
+        return STATUS_UNCHANGED
+    if change.status == STATUS_MODIFIED:
+        return _update_modified_news(
+            change, news_entry, openai_api_key, TOKEN_LIMIT, logger, defer_llm
+        )
 
+    # Quellen-Objekt erstellen
     source: Optional[Quelle] = None
 
     # Rundmail-Quellen speziell behandeln
@@ -143,7 +196,7 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
             logger.warning(
                 f"Rundmail ohne rundmail_id, Eintrag wird übersprungen | {truncated_title}"
             )
-            return
+            return STATUS_SKIPPED
         # Nachschauen, ob bereits ein Quelle-Objekt mit dieser ID existiert, falls nicht, dann erstellen
         source_name_raw = news_entry.get("quelle_name", "")
         source_name = (
@@ -199,7 +252,7 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
                 source_type,
                 truncated_title,
             )
-            return
+            return STATUS_SKIPPED
 
         # Quellenobjekt anhand des Namens holen
         source_name_raw = news_entry.get("quelle_name")
@@ -230,7 +283,7 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
                     source_type,
                     truncated_title,
                 )
-                return
+                return STATUS_SKIPPED
 
     # News-Objekt erstellen
     # Überprüfen, ob bereits ein News-Objekt mit diesem Titel und diesem Erstellungsdatum existiert
@@ -241,13 +294,67 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
             "link": news_entry["link"],
             "quelle": source,
             "quelle_typ": news_entry["quelle_typ"],
+            "content_hash": content_hash(news_entry["text"]),
         },
     )
 
     # Wenn das News-Objekt neu erstellt wurde, Text cleanen, Übersetzungen hinzufügen und Kategorisierung durchführen
     if not created:
         logger.info(f"News-Objekt existiert bereits | {truncated_title}")
-        return
+        return STATUS_UNCHANGED
+
+    _set_locations(news_item, news_entry["standorte"])
+
+    # Gleicher Text wie eine bereits verarbeitete News: deren Texte und Kategorien übernehmen
+    canonical = index_news(news_item, news_entry["text"])
+    if canonical is not None:
+        if reuse_processed_content(news_item, canonical):
+            if manual_categories or manual_audiences:
+                add_audiences_and_categories(news_item, manual_categories, manual_audiences)
+            logger.info(
+                f"Duplikat von News {canonical.pk}, Verarbeitung übernommen | {truncated_title}"
+            )
+            return STATUS_DUPLICATE
+        # Nur ähnlich: Verknüpfung bleibt für die Anzeige, der eigene Text wird verarbeitet
+        logger.info(f"Beinahe-Duplikat von News {canonical.pk} | {truncated_title}")
+
+    if defer_llm:
+        # Originaltext speichern, Cleanup, Übersetzungen und Kategorisierung übernehmen die Backfill-Tasks
+        _save_original_text(news_item, news_entry)
+        if manual_categories or manual_audiences:
+            add_audiences_and_categories(news_item, manual_categories, manual_audiences)
+        logger.info(f"News-Objekt angelegt, Verarbeitung zurückgestellt | {truncated_title}")
+        return STATUS_DEFERRED
+
+    _cleanup_and_translate(news_item, news_entry, openai_api_key, TOKEN_LIMIT, logger)
+    _categorize(news_item, news_entry, openai_api_key, TOKEN_LIMIT, logger)
+
+    logger.info(f"News-Objekt erfolgreich erstellt | {truncated_title}")
+    return STATUS_CREATED
+
+
+def _set_locations(news_item: News, locations: list[str]) -> None:
+    standorte = [Standort.objects.get_or_create(name=ort)[0] for ort in locations]
+    news_item.standorte.set(standorte)
+
+
+def _save_original_text(news_item: News, news_entry) -> None:
+    Text.objects.update_or_create(
+        news=news_item,
+        sprache=Sprache.objects.get(name="Deutsch"),
+        defaults={
+            "text": news_entry["text"],
+            "titel": news_entry["titel"],
+            "prompt_version": "",
+        },
+    )
+
+
+def _cleanup_and_translate(
+    news_item: News, news_entry, openai_api_key, token_limit, logger: logging.Logger
+) -> None:
+    """Text cleanen, deutsche und englische Fassung speichern und fehlende Übersetzungen ergänzen."""
+    truncated_title = news_entry["titel"][:80]
 
     # Text cleanen
     try:
@@ -255,40 +362,38 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
             news_entry["titel"],
             news_entry["text"],
             openai_api_key,
-            TOKEN_LIMIT,  # Token-Limit für die Verarbeitung neuer News (diese sollen schnell erscheinen)
+            token_limit,  # Token-Limit für die Verarbeitung neuer News (diese sollen schnell erscheinen)
         )
         parts = extract_parts(clean_response)
 
     # Wenn ein Fehler auftritt, loggen und weitermachen mit dem nächsten Eintrag
     except Exception as e:
         logger.error(f"Fehler beim Cleanup: {e} | {truncated_title}")
+        record_failure(news_item, ProcessingFailure.STAGE_CLEANUP, e, logger)
 
         # Fallback: Originaltext speichern
-        text_object = Text(
-            news=news_item,
-            text=news_entry["text"],
-            titel=news_entry["titel"],
-            sprache=Sprache.objects.get(name="Deutsch"),
-        )
-        text_object.save()
+        _save_original_text(news_item, news_entry)
 
     else:
         # Gecleante Texte speichern
-        text_object = Text(
+        Text.objects.update_or_create(
             news=news_item,
-            text=parts["cleaned_text_de"],
-            titel=parts["cleaned_title_de"],
             sprache=Sprache.objects.get(name="Deutsch"),
+            defaults={
+                "text": parts["cleaned_text_de"],
+                "titel": parts["cleaned_title_de"],
+                "prompt_version": prompt_version(ProcessingFailure.STAGE_CLEANUP),
+            },
         )
-        text_object.save()
-
-        text_object = Text(
+        Text.objects.update_or_create(
             news=news_item,
-            text=parts["cleaned_text_en"],
-            titel=parts["cleaned_title_en"],
             sprache=Sprache.objects.get(name="Englisch"),
+            defaults={
+                "text": parts["cleaned_text_en"],
+                "titel": parts["cleaned_title_en"],
+                "prompt_version": prompt_version(ProcessingFailure.STAGE_CLEANUP),
+            },
         )
-        text_object.save()
 
         # Flag is_cleaned_up auf True setzen
         news_item.is_cleaned_up = True
@@ -297,33 +402,101 @@ def process_news_entry(news_entry, openai_api_key, logger: logging.Logger):
 
         # Fehlende Übersetzungen hinzufügen
         add_missing_translations(
-            Sprache.objects.all(), news_item, openai_api_key, TOKEN_LIMIT
+            Sprache.objects.all(), news_item, openai_api_key, token_limit
         )
 
-    # Standorte hinzufügen
-    for ort in news_entry["standorte"]:
-        standort_obj, _ = Standort.objects.get_or_create(name=ort)
-        news_item.standorte.add(standort_obj)
 
-    # Inhaltskategorien und Zielgruppe(n) hinzufügen
+def _categorize(
+    news_item: News, news_entry, openai_api_key, token_limit, logger: logging.Logger
+) -> None:
+    """Inhaltskategorien und Zielgruppe(n) per OpenAI bestimmen und mit den manuellen zusammenführen."""
+    truncated_title = news_entry["titel"][:80]
+    manual_categories = news_entry.get("manual_inhaltskategorien", [])
+    manual_audiences = news_entry.get("manual_zielgruppen", [])
+
     categories, audiences = [], []
     try:
-        categories, audiences = get_categorization_from_openai(
+        categories, audiences, categorized_by = get_categorization(
             news_entry["titel"],
             news_entry["text"],
             openai_api_key,
-            TOKEN_LIMIT,  # Token-Limit für die Verarbeitung neuer News (diese sollen schnell erscheinen)
+            token_limit,  # Token-Limit für die Verarbeitung neuer News (diese sollen schnell erscheinen)
+            logger,
         )
+        if manual_categories or manual_audiences:
+            categorized_by = News.CATEGORIZED_BY_MANUAL
+        stamp_categorization(news_item, categorized_by)
         logger.info(f"Kategorisierung erfolgreich hinzugefügt | {truncated_title}")
     except Exception as e:
         logger.error(f"Fehler bei Kategorisierung: {e} | {truncated_title}")
+        record_failure(news_item, ProcessingFailure.STAGE_CATEGORIZATION, e, logger)
     finally:
         # Kombination aus automatisch ermittelten und von Trusted Accounts gegebenen Kategorien/Zielgruppen
         combined_categories = list(dict.fromkeys([*categories, *manual_categories]))
         combined_audiences = list(dict.fromkeys([*audiences, *manual_audiences]))
         add_audiences_and_categories(news_item, combined_categories, combined_audiences)
 
-    logger.info(f"News-Objekt erfolgreich erstellt | {truncated_title}")
+
+def _update_modified_news(
+    change: ChangeResult,
+    news_entry,
+    openai_api_key,
+    token_limit,
+    logger: logging.Logger,
+    defer_llm: bool,
+) -> str:
+    """Geänderten Eintrag aktualisieren und nur die betroffenen Verarbeitungsschritte wiederholen.
+
+    Titel oder Text geändert: Cleanup und Übersetzungen. Nur bei geändertem Text zusätzlich
+    die Kategorisierung.
+    """
+    news_item = change.news
+    truncated_title = news_entry["titel"][:80]
+    logger.info(
+        f"News-Objekt geändert (Titel: {change.title_changed}, Text: {change.text_changed}) | {truncated_title}"
+    )
+
+    news_item.titel = news_entry["titel"]
+    news_item.content_hash = content_hash(news_entry["text"])
+    news_item.is_cleaned_up = False
+    news_item.save(update_fields=["titel", "content_hash", "is_cleaned_up"])
+    _set_locations(news_item, news_entry["standorte"])
+    if change.text_changed:
+        index_news(news_item, news_entry["text"])
+
+    # Neuer Inhalt, bisherige Fehlversuche zählen nicht mehr
+    news_item.processing_failures.all().delete()
+
+    # Übersetzungen beruhen auf dem alten Text und werden neu erzeugt
+    news_item.texte.exclude(sprache__name="Deutsch").delete()
+    if change.text_changed:
+        news_item.inhaltskategorien.clear()
+        news_item.zielgruppen.clear()
+
+    if defer_llm:
+        _save_original_text(news_item, news_entry)
+        manual_categories = news_entry.get("manual_inhaltskategorien", [])
+        manual_audiences = news_entry.get("manual_zielgruppen", [])
+        if change.text_changed and (manual_categories or manual_audiences):
+            add_audiences_and_categories(news_item, manual_categories, manual_audiences)
+        return STATUS_MODIFIED
+
+    _cleanup_and_translate(news_item, news_entry, openai_api_key, token_limit, logger)
+    if change.text_changed:
+        _categorize(news_item, news_entry, openai_api_key, token_limit, logger)
+    return STATUS_MODIFIED
+
+
+def _check_api_key(request, logger: logging.Logger) -> Optional[JsonResponse]:
+    """Gibt eine Fehlerantwort zurück, wenn der API-Key fehlt oder falsch ist."""
+    api_key = os.getenv("API_KEY")
+    if not api_key:
+        logger.error("API_KEY ist nicht gesetzt.")
+        return JsonResponse({"error": "Server misconfigured"}, status=500)
+    api_key_request = request.headers.get("API-Key")
+    if api_key != api_key_request:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    return None
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -333,22 +506,18 @@ class ReceiveNews(View):
         logger.info("POST-Anfrage an /receive_news empfangen.")
 
         # API-Key überprüfen
-        api_key = os.getenv("API_KEY")
-        if not api_key:
-            logger.error("API_KEY ist nicht gesetzt.")
-            return JsonResponse({"error": "Server misconfigured"}, status=500)
-        api_key_request = request.headers.get("API-Key")
-        if api_key != api_key_request:
-            return JsonResponse({"error": "Unauthorized"}, status=401)
+        error_response = _check_api_key(request, logger)
+        if error_response is not None:
+            return error_response
 
         # Daten aus der Anfrage extrahieren
         try:
-            if request.headers.get("Content-Encoding") == "gzip":
-                decompressed_body = gzip.decompress(request.body)
-                data = json.loads(decompressed_body.decode("utf-8"))
-            else:
-                data = json.loads(request.body.decode("utf-8"))
-        except (OSError, json.JSONDecodeError) as exc:
+            data = decode_payload(
+                request.body,
+                request.headers.get("Content-Type", ""),
+                request.headers.get("Content-Encoding", ""),
+            )
+        except PayloadError as exc:
             logger.warning("Ungültige Anfrage, konnte Payload nicht parsen: %s", exc)
             return JsonResponse({"error": "Invalid payload"}, status=400)
 
@@ -362,13 +531,114 @@ class ReceiveNews(View):
             logger.error("OPENAI_API_KEY ist nicht gesetzt.")
             return JsonResponse({"error": "Server misconfigured"}, status=500)
 
-        # News parallel verarbeiten
+        # News parallel verarbeiten, Ergebnis je Eintrag in der Reihenfolge der Nutzlast.
+        # Fehler einzelner Einträge werden gemeldet statt den ganzen Batch abzulehnen,
+        # der Scraper sendet nur diese Einträge erneut.
+        results: list[dict] = [{"index": index} for index in range(len(data))]
         with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [
-                executor.submit(process_news_entry, entry, openai_api_key, logger)
-                for entry in data
-            ]
+            futures = {
+                executor.submit(process_news_entry, entry, openai_api_key, logger): result
+                for entry, result in zip(data, results)
+            }
             for future in as_completed(futures):
-                future.result()
+                result = futures[future]
+                try:
+                    result["status"] = future.result()
+                except Exception as exc:
+                    logger.exception(f"Fehler bei Eintrag {result['index']}")
+                    result["status"] = "error"
+                    result["error"] = str(exc)
+
+        summary = Counter(result["status"] for result in results)
+        return JsonResponse({"status": "success", "summary": summary, "results": results})
+
+
+def _iter_ndjson_lines(request, content_encoding: str) -> Iterator[bytes]:
+    """Zeilen des Request-Bodys lesen, ohne ihn vollständig in den Speicher zu laden."""
+    if content_encoding.strip().lower() == "gzip":
+        # GzipFile dekomprimiert blockweise direkt aus dem WSGI-Stream
+        yield from gzip.GzipFile(fileobj=request, mode="rb")
+    else:
+        yield from request
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ReceiveNewsStream(View):
+    """Nimmt News als (gzip-komprimiertes) NDJSON entgegen und verarbeitet sie zeilenweise.
+
+    Einträge werden schon während des Uploads verarbeitet, höchstens STREAM_MAX_IN_FLIGHT
+    gleichzeitig. Mit ?defer=1 werden nur die News-Objekte angelegt und die OpenAI-Verarbeitung
+    den Backfill-Tasks überlassen. Die Antwort enthält das Ergebnis jeder Zeile.
+    """
+
+    def post(self, request):
+        logger = get_logger(__name__)
+        logger.info("POST-Anfrage an /receive_news/stream empfangen.")
 
-        return JsonResponse({"status": "success"})
+        error_response = _check_api_key(request, logger)
+        if error_response is not None:
+            return error_response
+
+        openai_api_key = os.getenv("OPENAI_API_KEY", "")
+        if not openai_api_key:
+            logger.error("OPENAI_API_KEY ist nicht gesetzt.")
+            return JsonResponse({"error": "Server misconfigured"}, status=500)
+
+        defer_llm = request.GET.get("defer") in {"1", "true"}
+        results: list[dict] = []
+        in_flight: deque[tuple[dict, Future]] = deque()
+
+        def _collect(result: dict, future: Future) -> None:
+            try:
+                result["status"] = future.result()
+            except Exception as exc:
+                logger.exception(f"Fehler bei Zeile {result['line']}")
+                result["status"] = "error"
+                result["error"] = str(exc)
+
+        with ThreadPoolExecutor(max_workers=STREAM_WORKERS) as executor:
+            try:
+                for line_number, line in enumerate(
+                    _iter_ndjson_lines(request, request.headers.get("Content-Encoding", "")),
+                    start=1,
+                ):
+                    if not line.strip():
+                        continue
+
+                    result: dict = {"line": line_number}
+                    results.append(result)
+                    try:
+                        entry = json.loads(line)
+                    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                        result["status"] = "invalid"
+                        result["error"] = str(exc)
+                        continue
+                    if not isinstance(entry, dict):
+                        result["status"] = "invalid"
+                        result["error"] = "Zeile ist kein Objekt"
+                        continue
+
+                    # Gegendruck: erst weiterlesen, wenn der älteste Eintrag fertig ist
+                    if len(in_flight) >= STREAM_MAX_IN_FLIGHT:
+                        _collect(*in_flight.popleft())
+                    in_flight.append(
+                        (
+                            result,
+                            executor.submit(
+                                process_news_entry, entry, openai_api_key, logger, defer_llm
+                            ),
+                        )
+                    )
+            except (OSError, EOFError) as exc:
+                # Abgebrochener oder defekter gzip-Stream, bereits gelesene Zeilen werden fertig verarbeitet
+                logger.warning("Stream konnte nicht vollständig gelesen werden: %s", exc)
+                results.append({"line": None, "status": "invalid", "error": str(exc)})
+
+            while in_flight:
+                _collect(*in_flight.popleft())
+
+        summary = Counter(result["status"] for result in results)
+        logger.info(f"Stream verarbeitet: {dict(summary)}")
+        return JsonResponse(
+            {"status": "success", "summary": summary, "results": results}
+        )
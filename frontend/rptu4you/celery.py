@@ -32,4 +32,12 @@ app.conf.beat_schedule = {
         "task": "news.tasks.backfill_cleanup",
         "schedule": timedelta(minutes=5),
     },
+    "reprocess_stale_outputs": {
+        "task": "news.tasks.reprocess_stale_outputs",
+        "schedule": timedelta(minutes=15),
+    },
+    "resume_stale_reprocessing_jobs": {
+        "task": "news.tasks.resume_stale_reprocessing_jobs",
+        "schedule": timedelta(minutes=5),
+    },
 }
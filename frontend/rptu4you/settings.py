@@ -82,6 +82,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "modeltranslation",
     "news",
 ]
@@ -224,6 +225,23 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# Prioritäten (0 = höchste), etwa für Neuverarbeitungen aus dem Admin. Tasks ohne
+# Angabe laufen mit mittlerer Priorität, Worker holen nur eine Nachricht im Voraus.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Cache für gerenderte News-Fragmente, von Web-Prozessen und Workern gemeinsam genutzt
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        # DB 2 nutzt der Scraper zur Koordination
+        "LOCATION": "redis://redis:6379/3",
+    }
+}
 
 # Logging-Konfiguration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -25,7 +25,7 @@ from news.views.news import (
     news_partial,
     news_view,
 )
-from news.views.receive_news import ReceiveNews
+from news.views.receive_news import ReceiveNews, ReceiveNewsStream
 from news.views.system import (
     db_connection_status,
     health_check,
@@ -40,6 +40,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     # API
     path("api/news/", ReceiveNews.as_view(), name="receive_news"),
+    path("api/news/stream/", ReceiveNewsStream.as_view(), name="receive_news_stream"),
     # Kalender
     path("api/calendar-events/", calendar_events, name="calendar_events"),
     path(
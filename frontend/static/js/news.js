@@ -52,6 +52,10 @@ document.addEventListener("DOMContentLoaded", function () {
     var formData = new FormData(filterForm);
     var params = new URLSearchParams();
     for (var pair of formData.entries()) {
+      // Leeres Suchfeld nicht in die URL übernehmen
+      if (pair[1] === "") {
+        continue;
+      }
       params.append(pair[0], pair[1]);
     }
     return params.toString();
@@ -66,6 +70,10 @@ document.addEventListener("DOMContentLoaded", function () {
     checkboxes.forEach(function (cb) {
       cb.checked = false;
     });
+    var searchInput = filterForm.querySelector('input[name="q"]');
+    if (searchInput) {
+      searchInput.value = urlParams.get("q") || "";
+    }
 
     urlParams.forEach(function (value, key) {
       var selector = 'input[name="' + key + '"][value="' + value + '"]';
@@ -117,6 +125,14 @@ document.addEventListener("DOMContentLoaded", function () {
 
   console.log("news.js: NewsFeedCore.initNewsFeed abgeschlossen");
 
+  // Enter im Suchfeld wendet Suche und Filter ohne Seitenreload an
+  if (filterForm && filterApplyButton) {
+    filterForm.addEventListener("submit", function (event) {
+      event.preventDefault();
+      filterApplyButton.click();
+    });
+  }
+
   // Entfernt ein "Keine News gefunden"-Banner, wenn der "Mehr laden"-Button geklickt wird
   document.addEventListener("click", function (event) {
     var loadMoreBtn = event.target.closest ? event.target.closest("#load-more") : null;
@@ -180,8 +180,13 @@
         var separator = fetchUrl.indexOf("?") === -1 ? "?" : "&";
         button.disabled = true;
 
+        // Suchergebnisse werden per Cursor statt per Offset weitergeblättert
+        var pageParams = button.dataset.after
+          ? "after=" + encodeURIComponent(button.dataset.after)
+          : "offset=" + offset;
+
         // AJAX-Anfrage zum Nachladen weiterer News,alten Zustand sichern, neues HTML anhängen, Button reaktivieren
-        fetch(fetchUrl + separator + "offset=" + offset + "&limit=" + limit)
+        fetch(fetchUrl + separator + pageParams + "&limit=" + limit)
           .then(function (response) {
             return response.text();
           })
@@ -0,0 +1,283 @@
+"""Einmaliger Import des vollständigen Rundmail-Archivs.
+
+Der reguläre Scraper verarbeitet nur die neuesten 60 Archiv-Einträge. Dieses Skript
+crawlt das gesamte Archiv mit begrenzter Parallelität und Rate-Limit und sendet die
+Einträge gebündelt an den Streaming-Endpunkt. Die OpenAI-Verarbeitung wird dabei
+zurückgestellt und von den Backfill-Tasks im Frontend nachgeholt.
+
+Der Fortschritt wird nach jedem gesendeten Batch in einer Checkpoint-Datei gespeichert,
+ein abgebrochener Import setzt beim nächsten Aufruf dort fort. Archiv-Einträge, deren
+News das Frontend nicht gespeichert hat, bleiben offen und werden erneut gesendet.
+
+Aufruf im Scraper-Container: python backfill_rundmail.py [--concurrency 4] [--rate 2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import bs4
+import requests
+import scraper.util.frontend_interaction as frontend_interaction
+import scraper.util.metrics as metrics
+from scraper.rundmail import rundmail
+from scraper.util.html_parsing import RUNDMAIL_PAGINATION_STRAINER, make_soup
+from scraper.util.my_logging import get_logger
+
+logger = get_logger(__name__)
+
+ARCHIVE_URL = "https://rundmail.rptu.de/archive"
+SOURCE_TYPE = "Rundmail-Backfill"
+DEFAULT_CHECKPOINT_PATH = "/app/data/rundmail_backfill.json"
+REQUEST_TIMEOUT_SECONDS = 30
+PROGRESS_INTERVAL = 10
+
+
+class RateLimiter:
+    """Begrenzt die Anfragen aller Threads auf rate pro Sekunde."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now)
+            self._next = start + self.interval
+        time.sleep(max(0.0, start - now))
+
+
+class Checkpoint:
+    """Bereits importierte Archiv-Einträge, atomar als JSON gespeichert."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.done = set(json.load(file).get("done", []))
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"done": sorted(self.done), "updated_at": time.time()}, file)
+        # Ersetzen ist atomar, ein Abbruch hinterlässt nie einen halb geschriebenen Checkpoint
+        os.replace(temp_path, self.path)
+
+
+def _archive_link(archive_entry: bs4.element.Tag) -> str | None:
+    link = archive_entry.find(name="a")
+    if not isinstance(link, bs4.element.Tag):
+        return None
+    href = link.get("href")
+    return f"https://rundmail.rptu.de{href}" if isinstance(href, str) else None
+
+
+def _next_archive_page(html: str) -> str | None:
+    # Falls das Archiv paginiert ist, dem rel="next"-Link folgen
+    soup = make_soup(html, RUNDMAIL_PAGINATION_STRAINER)
+    next_link = soup.find(name="a", rel="next")
+    if not isinstance(next_link, bs4.element.Tag):
+        return None
+    href = next_link.get("href")
+    if not isinstance(href, str):
+        return None
+    return requests.compat.urljoin(ARCHIVE_URL, href)
+
+
+def collect_archive_entries(fetch) -> list[tuple[str, bs4.element.Tag]]:
+    """Alle Zeilen des Archivs (ggf. über mehrere Seiten) mit ihrem Link sammeln."""
+    entries: list[tuple[str, bs4.element.Tag]] = []
+    seen_links: set[str] = set()
+    url: str | None = ARCHIVE_URL
+    while url:
+        html = fetch(url)
+        for archive_entry in rundmail.parse_rundmail_archive(html):
+            link = _archive_link(archive_entry)
+            if link and link not in seen_links:
+                seen_links.add(link)
+                entries.append((link, archive_entry))
+        url = _next_archive_page(html)
+    return entries
+
+
+def handled_links(batch_links: list[tuple[str, int]], result: dict) -> list[str]:
+    """Links, deren News laut Antwort des Streaming-Endpunkts alle gespeichert wurden.
+
+    batch_links enthält je Archiv-Eintrag den Link und die Anzahl seiner News in
+    Reihenfolge des Batches, jede News ist eine Zeile (ab 1) im gesendeten NDJSON.
+    """
+    statuses = {
+        entry.get("line"): entry.get("status")
+        for entry in result.get("results", [])
+        if isinstance(entry, dict)
+    }
+    handled: list[str] = []
+    line = 1
+    for link, count in batch_links:
+        if all(
+            statuses.get(number) in frontend_interaction.HANDLED_STATUSES
+            for number in range(line, line + count)
+        ):
+            handled.append(link)
+        line += count
+    return handled
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s"
+
+
+def run_backfill(
+    checkpoint: Checkpoint,
+    concurrency: int,
+    rate: float,
+    batch_size: int,
+    defer_llm: bool,
+    limit: int | None,
+) -> bool:
+    """Archiv importieren, gibt False zurück, wenn der Import abgebrochen wurde."""
+    session = requests.Session()
+    limiter = RateLimiter(rate)
+
+    def fetch(url: str) -> str:
+        limiter.wait()
+        response = session.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return response.text
+
+    archive_entries = collect_archive_entries(fetch)
+    pending = [
+        (link, archive_entry)
+        for link, archive_entry in archive_entries
+        if link not in checkpoint.done
+    ]
+    if limit is not None:
+        pending = pending[:limit]
+    logger.info(
+        f"Archiv: {len(archive_entries)} Einträge, {len(archive_entries) - len(pending)} bereits importiert, "
+        f"{len(pending)} ausstehend"
+    )
+
+    batch: list[dict] = []
+    batch_links: list[tuple[str, int]] = []
+    totals: dict[str, int] = {}
+    failed = 0
+    start = time.monotonic()
+
+    def flush() -> bool:
+        if not batch_links:
+            return True
+        result = frontend_interaction.stream_data(batch, SOURCE_TYPE, defer_llm=defer_llm)
+        if result is None:
+            return False
+        for status, count in result.get("summary", {}).items():
+            totals[status] = totals.get(status, 0) + count
+        handled = handled_links(batch_links, result)
+        if len(handled) < len(batch_links):
+            # Nicht im Checkpoint vermerkt, wird beim nächsten Aufruf erneut gesendet
+            logger.warning(
+                f"{len(batch_links) - len(handled)} Archiv-Einträge nicht vollständig gespeichert"
+            )
+        checkpoint.done.update(handled)
+        checkpoint.save()
+        batch.clear()
+        batch_links.clear()
+        return True
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(rundmail.process_archive_entry, archive_entry, fetch): link
+            for link, archive_entry in pending
+        }
+        for processed, future in enumerate(as_completed(futures), start=1):
+            link = futures[future]
+            try:
+                entry = future.result()
+            except Exception as exc:
+                # Nicht im Checkpoint vermerkt, wird beim nächsten Aufruf erneut versucht
+                if isinstance(exc, metrics.PARSE_EXCEPTIONS):
+                    metrics.record_parse_error(SOURCE_TYPE)
+                logger.warning(f"{link} – Fehler beim Abrufen: {exc}")
+                failed += 1
+            else:
+                news = [entry] if isinstance(entry, dict) else entry
+                batch.extend(news)
+                batch_links.append((link, len(news)))
+
+            if len(batch) >= batch_size and not flush():
+                logger.error("Frontend nicht erreichbar, Import abgebrochen (Fortsetzung möglich)")
+                for remaining in futures:
+                    remaining.cancel()
+                return False
+
+            if processed % PROGRESS_INTERVAL == 0 or processed == len(pending):
+                elapsed = time.monotonic() - start
+                per_entry = elapsed / processed
+                eta = per_entry * (len(pending) - processed)
+                logger.info(
+                    f"Fortschritt: {processed}/{len(pending)} Archiv-Einträge "
+                    f"({processed / elapsed if elapsed else 0:.2f}/s), {failed} fehlgeschlagen, "
+                    f"ETA {_format_duration(eta)}"
+                )
+
+    if not flush():
+        logger.error("Frontend nicht erreichbar, Import abgebrochen (Fortsetzung möglich)")
+        return False
+
+    logger.info(
+        f"Import abgeschlossen in {_format_duration(time.monotonic() - start)}: {totals}, "
+        f"{failed} Archiv-Einträge fehlgeschlagen"
+    )
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=4, help="parallele Abrufe")
+    parser.add_argument(
+        "--rate", type=float, default=2.0, help="maximale Anfragen pro Sekunde an rundmail.rptu.de"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=200, help="News-Einträge pro Request an das Frontend"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=os.getenv("SCRAPER_BACKFILL_CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH),
+    )
+    parser.add_argument("--restart", action="store_true", help="Checkpoint verwerfen")
+    parser.add_argument(
+        "--no-defer",
+        action="store_true",
+        help="OpenAI-Verarbeitung sofort statt über die Backfill-Tasks durchführen",
+    )
+    parser.add_argument("--limit", type=int, help="höchstens so viele Archiv-Einträge")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    ok = run_backfill(
+        Checkpoint(args.checkpoint),
+        concurrency=max(1, args.concurrency),
+        rate=args.rate,
+        batch_size=max(1, args.batch_size),
+        defer_llm=not args.no_defer,
+        limit=args.limit,
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
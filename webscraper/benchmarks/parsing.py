@@ -0,0 +1,91 @@
+"""Vergleicht Parse-Zeit und Speicherbedarf der HTML-Backends über aufgezeichnete Seiten.
+
+Aufruf im Webscraper-Verzeichnis: python -m benchmarks.parsing [Fixture-Verzeichnis]
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import bs4
+from scraper.util.html_parsing import (
+    NEWSROOM_ARTICLE_STRAINER,
+    NEWSROOM_LIST_STRAINER,
+    RUNDMAIL_ARCHIVE_STRAINER,
+    RUNDMAIL_TEXT_STRAINER,
+    WIWI_ARTICLE_STRAINER,
+    WIWI_LIST_STRAINER,
+    make_soup,
+)
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Dateinamen-Präfix der Fixture -> Strainer, den der Scraper für diese Seite verwendet
+STRAINERS: dict[str, bs4.SoupStrainer | None] = {
+    "rundmail_archive": RUNDMAIL_ARCHIVE_STRAINER,
+    "rundmail_entry": RUNDMAIL_TEXT_STRAINER,
+    "rundmail_sammel": None,
+    "wiwi_list": WIWI_LIST_STRAINER,
+    "wiwi_article": WIWI_ARTICLE_STRAINER,
+    "newsroom_list": NEWSROOM_LIST_STRAINER,
+    "newsroom_article": NEWSROOM_ARTICLE_STRAINER,
+}
+
+PARSERS = ["html.parser", "lxml"]
+REPETITIONS = 5
+
+
+def _strainer_for(path: Path) -> bs4.SoupStrainer | None:
+    for prefix, strainer in STRAINERS.items():
+        if path.name.startswith(prefix):
+            return strainer
+    return None
+
+
+def _measure(html: str, parser: str, strainer) -> tuple[float, int]:
+    """Gibt die mittlere Parse-Zeit (ms) und den Spitzen-Speicher (KiB) zurück."""
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        make_soup(html, strainer, parser)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / REPETITIONS
+
+    tracemalloc.start()
+    make_soup(html, strainer, parser)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_ms, peak // 1024
+
+
+def main(fixture_dir: Path = FIXTURE_DIR) -> None:
+    pages = sorted(fixture_dir.rglob("*.html"))
+    if not pages:
+        print(f"Keine HTML-Fixtures in {fixture_dir} gefunden.")
+        return
+
+    totals: dict[str, list[float]] = {}
+    print(f"{'Seite':<40} {'Backend':<24} {'ms':>9} {'KiB':>9}")
+    for page in pages:
+        html = page.read_text(encoding="utf-8", errors="replace")
+        strainer = _strainer_for(page)
+        for parser in PARSERS:
+            variants = [("voll", None)]
+            if strainer is not None:
+                variants.append(("partiell", strainer))
+            for label, variant_strainer in variants:
+                elapsed_ms, peak_kib = _measure(html, parser, variant_strainer)
+                backend = f"{parser} ({label})"
+                totals.setdefault(backend, [0.0, 0.0])
+                totals[backend][0] += elapsed_ms
+                totals[backend][1] += peak_kib
+                print(f"{page.name[:40]:<40} {backend:<24} {elapsed_ms:>9.2f} {peak_kib:>9}")
+
+    print()
+    print(f"{'Summe':<40} {'Backend':<24} {'ms':>9} {'KiB':>9}")
+    for backend, (elapsed_ms, peak_kib) in totals.items():
+        print(f"{'':<40} {backend:<24} {elapsed_ms:>9.2f} {peak_kib:>9.0f}")
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else FIXTURE_DIR)
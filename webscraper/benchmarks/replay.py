@@ -0,0 +1,419 @@
+"""Aufzeichnung und Offline-Wiedergabe der Scraper für Benchmarks und Regressionstests.
+
+Aufruf im Webscraper-Verzeichnis:
+
+    python -m benchmarks.replay record [quelle ...]   # Live-Seiten/Mails aufzeichnen
+    python -m benchmarks.replay run [quelle ...]      # Gegen lokalen Replay-Server messen
+    python -m benchmarks.replay check [quelle ...]    # Wie run, Ergebnis mit expected.json vergleichen
+    python -m benchmarks.replay update [quelle ...]   # expected.json aus der Wiedergabe neu schreiben
+
+Quellen: rundmail, wiwi, newsroom, mail (Standard: alle).
+
+Die mitgelieferten Fixtures unter benchmarks/fixtures/<quelle> sind von Hand geschriebene,
+synthetische Seiten im Aufbau der echten Quellen, keine Live-Aufzeichnungen; "record" ersetzt
+sie durch echte Antworten. expected.json stammt aus "update", tests/test_replay.py prüft
+zusätzlich von Hand abgelesene Titel, Daten und Links.
+"""
+
+import argparse
+import email
+import json
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from email import policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterator
+from unittest import mock
+from urllib.parse import parse_qs, quote, urlparse
+
+import requests
+import scraper.fachbereiche.wiwi as wiwi
+import scraper.mail.mail_scraper as mail_scraper
+import scraper.newsroom.pressemitteilungen as pressemitteilungen
+import scraper.rundmail.rundmail as rundmail
+import scraper.util.frontend_interaction as frontend_interaction
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+
+SCRAPERS: dict[str, Callable[[], int]] = {
+    "rundmail": rundmail.main,
+    "wiwi": wiwi.main,
+    "newsroom": pressemitteilungen.main,
+    "mail": mail_scraper.main,
+}
+
+# Module, deren make_soup-Aufrufe für die Parse-Zeit gemessen werden
+PARSING_MODULES = [rundmail, wiwi, pressemitteilungen]
+
+_real_get = requests.get
+
+
+@dataclass
+class RunStats:
+    source: str
+    wall_time: float = 0.0
+    requests: int = 0
+    bytes: int = 0
+    parse_time: float = 0.0
+    items: list[dict] = field(default_factory=list)
+    missing_urls: list[str] = field(default_factory=list)
+
+
+class FixtureStore:
+    """Aufgezeichnete Antworten einer Quelle: index.json plus eine Datei pro Antwort."""
+
+    def __init__(self, source: str, root: Path = FIXTURE_DIR):
+        self.directory = root / source
+        self.source = source
+        self.index_path = self.directory / "index.json"
+        self.index: dict[str, dict] = {}
+        if self.index_path.exists():
+            self.index = json.loads(self.index_path.read_text(encoding="utf-8"))
+
+    def _file_prefix(self, url: str, body: bytes) -> str:
+        # Präfixe passend zu den Strainern in benchmarks/parsing.py
+        if self.source == "rundmail":
+            if url.rstrip("/").endswith("/archive"):
+                return "rundmail_archive"
+            if b"messages-overview" in body:
+                return "rundmail_sammel"
+            return "rundmail_entry"
+        if self.source == "wiwi":
+            return "wiwi_list" if "aktuelles-und-mitteilungen" in url else "wiwi_article"
+        if self.source == "newsroom":
+            return "newsroom_list" if url.endswith("#selenium") else "newsroom_article"
+        return self.source
+
+    def save(self, url: str, body: bytes, status: int, content_type: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file_name = f"{self._file_prefix(url, body)}_{len(self.index):04d}.html"
+        (self.directory / file_name).write_bytes(body)
+        self.index[url] = {
+            "file": file_name,
+            "status": status,
+            "content_type": content_type,
+        }
+        self.index_path.write_text(
+            json.dumps(self.index, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    def load(self, url: str) -> tuple[bytes, int, str] | None:
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        body = (self.directory / entry["file"]).read_bytes()
+        return body, entry["status"], entry["content_type"]
+
+    # IMAP-Nachrichten
+
+    def save_messages(self, messages: list) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for number, message in enumerate(messages):
+            (self.directory / f"mail_{number:04d}.eml").write_bytes(message.as_bytes())
+
+    def load_messages(self) -> list:
+        return [
+            email.message_from_bytes(path.read_bytes(), policy=policy.default)
+            for path in sorted(self.directory.glob("mail_*.eml"))
+        ]
+
+    @property
+    def expected_path(self) -> Path:
+        return self.directory / "expected.json"
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    store: FixtureStore
+
+    def do_GET(self):
+        url = parse_qs(urlparse(self.path).query).get("url", [""])[0]
+        recorded = self.store.load(url)
+        if recorded is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body, status, content_type = recorded
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def replay_server(store: FixtureStore) -> Iterator[str]:
+    handler = type("Handler", (_ReplayHandler,), {"store": store})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _ReplayDriver:
+    """Ersatz für den Firefox-Driver, liefert die aufgezeichnete, aufgeklappte News-Liste."""
+
+    def __init__(self, store: FixtureStore, stats: RunStats):
+        self.store = store
+        self.stats = stats
+        self.page_source = ""
+
+    def get(self, url: str) -> None:
+        recorded = self.store.load(f"{url}#selenium")
+        if recorded is None:
+            self.stats.missing_urls.append(url)
+            return
+        self.stats.requests += 1
+        self.stats.bytes += len(recorded[0])
+        self.page_source = recorded[0].decode("utf-8", errors="replace")
+
+    def quit(self) -> None:
+        pass
+
+
+def _timed(function: Callable, stats: RunStats) -> Callable:
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.parse_time += time.perf_counter() - start
+
+    return wrapper
+
+
+def _capture_send_data(stats: RunStats) -> Callable:
+    def send_data(data, source_type: str, deduplicate: bool = True):
+        items = data if isinstance(data, list) else [data]
+        # Datumswerte wie beim Versand serialisieren, damit der Vergleich stabil ist
+        stats.items.extend(
+            json.loads(
+                json.dumps(items, default=frontend_interaction.datetime_serializer)
+            )
+        )
+
+    return send_data
+
+
+def _patch_common(stack: ExitStack, stats: RunStats) -> None:
+    stack.enter_context(
+        mock.patch.object(
+            frontend_interaction, "send_data", _capture_send_data(stats)
+        )
+    )
+    for module in PARSING_MODULES:
+        stack.enter_context(
+            mock.patch.object(module, "make_soup", _timed(module.make_soup, stats))
+        )
+    stack.enter_context(
+        mock.patch.object(
+            mail_scraper, "parse_message", _timed(mail_scraper.parse_message, stats)
+        )
+    )
+
+
+def record(source: str) -> RunStats:
+    """Scraper live ausführen und alle Antworten aufzeichnen. Es wird nichts an Django gesendet."""
+    store = FixtureStore(source)
+    stats = RunStats(source)
+
+    def recording_get(url, *args, **kwargs):
+        response = _real_get(url, *args, **kwargs)
+        stats.requests += 1
+        stats.bytes += len(response.content)
+        store.save(
+            url,
+            response.content,
+            response.status_code,
+            response.headers.get("Content-Type", "text/html; charset=utf-8"),
+        )
+        return response
+
+    real_setup_driver = pressemitteilungen.setup_driver
+
+    def recording_setup_driver():
+        driver = real_setup_driver()
+        real_quit = driver.quit
+        real_driver_get = driver.get
+        state = {"url": ""}
+
+        def driver_get(url):
+            state["url"] = url
+            real_driver_get(url)
+
+        def quit_and_save():
+            # Quelltext nach dem Aufklappen aller News speichern
+            store.save(
+                f"{state['url']}#selenium",
+                driver.page_source.encode("utf-8"),
+                200,
+                "text/html; charset=utf-8",
+            )
+            real_quit()
+
+        driver.get = driver_get
+        driver.quit = quit_and_save
+        return driver
+
+    real_fetch_all_messages = mail_scraper.fetch_all_messages
+
+    def recording_fetch_all_messages(mailbox):
+        messages = real_fetch_all_messages(mailbox)
+        store.save_messages(messages)
+        stats.requests += len(messages)
+        stats.bytes += sum(len(message.as_bytes()) for message in messages)
+        return messages
+
+    with ExitStack() as stack:
+        _patch_common(stack, stats)
+        stack.enter_context(mock.patch.object(requests, "get", recording_get))
+        stack.enter_context(
+            mock.patch.object(
+                pressemitteilungen, "setup_driver", recording_setup_driver
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(
+                mail_scraper, "fetch_all_messages", recording_fetch_all_messages
+            )
+        )
+        start = time.perf_counter()
+        SCRAPERS[source]()
+        stats.wall_time = time.perf_counter() - start
+
+    return stats
+
+
+def replay(source: str) -> RunStats:
+    """Scraper gegen den lokalen Replay-Server ausführen."""
+    store = FixtureStore(source)
+    stats = RunStats(source)
+
+    with ExitStack() as stack:
+        base_url = stack.enter_context(replay_server(store))
+
+        def replay_get(url, *args, **kwargs):
+            response = _real_get(f"{base_url}?url={quote(url, safe='')}", timeout=30)
+            if response.status_code == 404 and url not in store.index:
+                stats.missing_urls.append(url)
+            stats.requests += 1
+            stats.bytes += len(response.content)
+            return response
+
+        class _ReplayMailbox:
+            def close(self):
+                pass
+
+            def logout(self):
+                pass
+
+        def replay_fetch_all_messages(mailbox):
+            messages = store.load_messages()
+            stats.requests += len(messages)
+            stats.bytes += sum(len(message.as_bytes()) for message in messages)
+            return messages
+
+        _patch_common(stack, stats)
+        stack.enter_context(mock.patch.object(requests, "get", replay_get))
+        stack.enter_context(
+            mock.patch.object(
+                pressemitteilungen,
+                "setup_driver",
+                lambda: _ReplayDriver(store, stats),
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(pressemitteilungen, "unfold_news", lambda driver: None)
+        )
+        stack.enter_context(
+            mock.patch.object(mail_scraper, "connect_mailbox", _ReplayMailbox)
+        )
+        stack.enter_context(
+            mock.patch.object(
+                mail_scraper, "fetch_all_messages", replay_fetch_all_messages
+            )
+        )
+        start = time.perf_counter()
+        SCRAPERS[source]()
+        stats.wall_time = time.perf_counter() - start
+
+    return stats
+
+
+def print_report(results: list[RunStats]) -> None:
+    print(
+        f"{'Quelle':<10} {'Wall (s)':>9} {'Requests':>9} {'KiB':>9} {'Parse (s)':>10} {'Einträge':>9}"
+    )
+    for stats in results:
+        print(
+            f"{stats.source:<10} {stats.wall_time:>9.2f} {stats.requests:>9} "
+            f"{stats.bytes / 1024:>9.0f} {stats.parse_time:>10.2f} {len(stats.items):>9}"
+        )
+        if stats.missing_urls:
+            print(f"  {len(stats.missing_urls)} URLs ohne Aufzeichnung")
+
+
+def check(stats: RunStats) -> bool:
+    """Vergleicht die Einträge der Wiedergabe mit der gespeicherten Erwartung."""
+    expected_path = FixtureStore(stats.source).expected_path
+    if not expected_path.exists():
+        print(f"{stats.source}: keine expected.json vorhanden")
+        return False
+    expected = json.loads(expected_path.read_text(encoding="utf-8"))
+    if expected == stats.items:
+        print(f"{stats.source}: OK ({len(stats.items)} Einträge)")
+        return True
+
+    print(
+        f"{stats.source}: ABWEICHUNG ({len(expected)} erwartet, {len(stats.items)} erhalten)"
+    )
+    for index, (old, new) in enumerate(zip(expected, stats.items)):
+        if old != new:
+            print(f"  Erster Unterschied bei Eintrag {index}: {old.get('titel')!r}")
+            break
+    return False
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["record", "run", "check", "update"])
+    parser.add_argument("sources", nargs="*", help=", ".join(SCRAPERS))
+    args = parser.parse_args(argv)
+
+    sources = args.sources or list(SCRAPERS)
+    unknown = [source for source in sources if source not in SCRAPERS]
+    if unknown:
+        parser.error(f"Unbekannte Quelle(n): {', '.join(unknown)}")
+    results: list[RunStats] = []
+    ok = True
+
+    for source in sources:
+        stats = record(source) if args.mode == "record" else replay(source)
+        results.append(stats)
+
+        if args.mode in {"record", "update"}:
+            expected_path = FixtureStore(source).expected_path
+            expected_path.parent.mkdir(parents=True, exist_ok=True)
+            expected_path.write_text(
+                json.dumps(stats.items, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+        elif args.mode == "check":
+            ok = check(stats) and ok
+
+    print_report(results)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Vergleicht die indexbasierte Sammel-Rundmail-Verarbeitung mit der früheren Suche pro Eintrag.
+
+Für jede aufgezeichnete Sammel-Rundmail (benchmarks/fixtures/rundmail_sammel*.html) wird
+geprüft, dass beide Varianten dieselben Einträge liefern. Zusätzlich wird die Laufzeit für
+synthetische Sammel-Rundmails wachsender Größe gemessen.
+
+Aufruf im Webscraper-Verzeichnis: python -m benchmarks.sammel_rundmail
+Der Vergleich läuft auch als Test (tests/test_sammel_rundmail.py).
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import bs4
+from scraper.rundmail import rundmail
+from scraper.util.html_parsing import make_soup
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+SIZES = [25, 100, 400, 1600]
+LINK = "https://rundmail.rptu.de/archive/12345"
+DATE = datetime(2025, 1, 1, tzinfo=ZoneInfo("Europe/Berlin"))
+
+
+def _lookup_per_item(soup: bs4.BeautifulSoup) -> list[str]:
+    """Frühere Variante: find() über das ganze Dokument für jeden Eintrag."""
+    texts: list[str] = []
+    overview = soup.find(name="div", class_="messages-overview")
+    if not isinstance(overview, bs4.element.Tag):
+        return texts
+    for category in overview.find_all(name="h5", class_="mt-4"):
+        entries = category.find_next_sibling(name="ul")
+        if not isinstance(entries, bs4.element.Tag):
+            continue
+        for entry in entries.find_all(name="li"):
+            a_element = entry.find(name="a")
+            if not isinstance(a_element, bs4.element.Tag):
+                continue
+            href = a_element.get("href")
+            if not isinstance(href, str):
+                continue
+            heading = soup.find(name="h2", id=href.replace("#", ""))
+            if not isinstance(heading, bs4.element.Tag):
+                continue
+            body = heading.find_next_sibling(name="div")
+            if not isinstance(body, bs4.element.Tag):
+                continue
+            text = body.find(name="p", class_="whitespaces")
+            if isinstance(text, bs4.element.Tag):
+                texts.append(text.decode_contents())
+    return texts
+
+
+def _lookup_indexed(soup: bs4.BeautifulSoup) -> list[str]:
+    entries = rundmail.process_sammel_rundmail(soup, LINK, DATE)
+    return [entry["text"] for entry in entries]
+
+
+def build_synthetic_page(item_count: int) -> str:
+    overview_items = "".join(
+        f'<li><a href="#msg-{i}">[Studierende] Meldung {i} #KL</a></li>'
+        for i in range(item_count)
+    )
+    sections = "".join(
+        f'<h2 id="msg-{i}">Meldung {i}</h2>'
+        f'<div><p class="whitespaces">Text {i}<br>mit <a href="https://rptu.de/{i}">Link</a></p></div>'
+        for i in range(item_count)
+    )
+    return (
+        "<html><body>"
+        f'<div class="messages-overview"><h5 class="mt-4">Allgemein</h5><ul>{overview_items}</ul></div>'
+        f"<div class=\"messages\">{sections}</div>"
+        "</body></html>"
+    )
+
+
+def _time(function, soup: bs4.BeautifulSoup) -> float:
+    start = time.perf_counter()
+    function(soup)
+    return (time.perf_counter() - start) * 1000
+
+
+def check_fixtures(fixture_dir: Path = FIXTURE_DIR) -> bool:
+    pages = sorted(fixture_dir.rglob("rundmail_sammel*.html"))
+    if not pages:
+        print(f"Keine Sammel-Rundmails in {fixture_dir} gefunden")
+        return False
+
+    ok = True
+    for page in pages:
+        soup = make_soup(page.read_text(encoding="utf-8", errors="replace"))
+        expected = _lookup_per_item(soup)
+        actual = _lookup_indexed(soup)
+        status = "OK" if expected == actual else "ABWEICHUNG"
+        ok = ok and expected == actual
+        print(f"{page.name}: {len(actual)} Einträge, {status}")
+    return ok
+
+
+def main() -> int:
+    ok = check_fixtures()
+
+    print(f"{'Einträge':>9} {'pro Eintrag (ms)':>18} {'Index (ms)':>12}")
+    for size in SIZES:
+        soup = make_soup(build_synthetic_page(size))
+        if _lookup_per_item(soup) != _lookup_indexed(soup):
+            print(f"Abweichung bei {size} Einträgen")
+            ok = False
+        print(
+            f"{size:>9} {_time(_lookup_per_item, soup):>18.1f} {_time(_lookup_indexed, soup):>12.1f}"
+        )
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Vergleicht die Übertragungsformate zwischen Scraper und Frontend.
+
+Als Nutzlast dienen die Einträge einer Sammel-Rundmail: aufgezeichnete Seiten aus
+benchmarks/fixtures/rundmail_sammel*.html, sonst eine synthetische Seite mit
+realistischer Textlänge. Gemessen werden Serialisierung samt Kompression, Dekodierung
+wie im Frontend (inkl. Datums-Parsing) und die Größe pro Batch.
+
+Aufruf im Webscraper-Verzeichnis: python -m benchmarks.wire_format
+"""
+
+import gzip
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from benchmarks.sammel_rundmail import build_synthetic_page
+from scraper.rundmail import rundmail
+from scraper.util import frontend_interaction
+from scraper.util.html_parsing import make_soup
+from scraper.util.wire_format import WIRE_FORMATS, encode
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+LINK = "https://rundmail.rptu.de/archive/12345"
+DATE = datetime(2025, 1, 1, 9, 30, tzinfo=ZoneInfo("Europe/Berlin"))
+SYNTHETIC_ITEMS = 60
+REPEATS = 50
+PARAGRAPH = (
+    "Liebe Studierende, liebe Beschäftigte, im Rahmen der Veranstaltungsreihe laden wir "
+    'herzlich ein. Weitere Informationen und die Anmeldung finden Sie unter <a href="'
+    'https://rptu.de/veranstaltungen">rptu.de/veranstaltungen</a>.<br>'
+)
+
+
+def load_entries() -> list[dict]:
+    pages = sorted(FIXTURE_DIR.rglob("rundmail_sammel*.html"))
+    if pages:
+        html = pages[0].read_text(encoding="utf-8", errors="replace")
+        print(f"Nutzlast aus {pages[0].name}")
+    else:
+        html = build_synthetic_page(SYNTHETIC_ITEMS).replace("<br>", PARAGRAPH * 4)
+        print(f"Synthetische Nutzlast mit {SYNTHETIC_ITEMS} Einträgen")
+    return rundmail.process_sammel_rundmail(make_soup(html), LINK, DATE)
+
+
+def _decode_json(payload: bytes) -> list[dict]:
+    entries = json.loads(gzip.decompress(payload).decode("utf-8"))
+    for entry in entries:
+        entry["erstellungsdatum"] = datetime.strptime(
+            entry["erstellungsdatum"], "%d.%m.%Y %H:%M:%S"
+        )
+    return entries
+
+
+def _decode_msgpack(payload: bytes) -> list[dict]:
+    import msgpack
+    import zstandard
+
+    return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(payload), timestamp=3)
+
+
+DECODERS = {"json": _decode_json, "msgpack": _decode_msgpack}
+
+
+def _time_ms(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        function(*args)
+    return (time.perf_counter() - start) * 1000 / REPEATS
+
+
+def main() -> int:
+    entries = load_entries()
+    batches = list(
+        frontend_interaction._chunk_payload(entries, frontend_interaction.BATCH_SIZE)
+    )
+    raw_bytes = sum(len(json.dumps(batch, default=str).encode()) for batch in batches)
+    print(f"{len(entries)} Einträge in {len(batches)} Batches, {raw_bytes / 1024:.1f} KiB unkomprimiert")
+
+    ok = True
+    print(f"{'Format':<9} {'KiB':>8} {'Kodieren (ms)':>14} {'Dekodieren (ms)':>16}")
+    for wire_format in WIRE_FORMATS:
+        try:
+            payloads = [encode(batch, wire_format) for batch in batches]
+        except ImportError as exc:
+            print(f"{wire_format:<9} nicht verfügbar ({exc})")
+            continue
+
+        decoded = [entry for payload in payloads for entry in DECODERS[wire_format](payload)]
+        # Gleicher Zeitpunkt, unabhängig davon, ob mit oder ohne Zeitzone übertragen
+        for original, received in zip(entries, decoded):
+            if received["erstellungsdatum"].tzinfo is None:
+                received["erstellungsdatum"] = received["erstellungsdatum"].replace(
+                    tzinfo=ZoneInfo("Europe/Berlin")
+                )
+            if original != received:
+                print(f"{wire_format}: Abweichung bei '{original['titel']}'")
+                ok = False
+                break
+
+        size = sum(len(payload) for payload in payloads)
+        encode_ms = sum(_time_ms(encode, batch, wire_format) for batch in batches)
+        decode_ms = sum(_time_ms(DECODERS[wire_format], payload) for payload in payloads)
+        print(f"{wire_format:<9} {size / 1024:>8.1f} {encode_ms:>14.2f} {decode_ms:>16.2f}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
+import atexit
 import os
+import random
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Callable
 
 import requests
 import scraper.fachbereiche.wiwi as wiwi
@@ -9,6 +12,14 @@ import scraper.newsroom.pressemitteilungen as pressemitteilungen
 import scraper.rundmail.rundmail as rundmail
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from scraper.util.adaptive_schedule import (
+    JITTER_SECONDS,
+    AdaptiveScheduleState,
+    adaptive_mode_enabled,
+)
+from scraper.util import metrics
+from scraper.util.coordination import Coordinator, coordination_mode
+from scraper.util.frontend_interaction import get_outbox
 from scraper.util.my_logging import get_logger
 
 logger = get_logger(__name__)
@@ -34,6 +45,118 @@ def wait_for_django():
     raise RuntimeError("Django konnte nicht gestartet werden.")
 
 
+JOBS = [
+    ("rundmail_job", "Rundmail-Scraper", rundmail.main),
+    ("newsroom_job_1", "Newsroom-Scraper (Pressmitteilungen)", pressemitteilungen.main),
+    ("fachbereiche_job_wiwi", "Fachbereiche-Scraper (Wiwi)", wiwi.main),
+    ("mail_job", "Mail-Scraper", mail_scraper.main),
+]
+
+FIXED_INTERVAL_MINUTES = 20
+
+
+def execute_job(
+    coordinator: Coordinator | None,
+    job_id: str,
+    func: Callable[[], int | None],
+    interval_minutes: float,
+) -> tuple[bool, int | None]:
+    """Job ausführen, bei mehreren Replikaten nur auf dem zuständigen und höchstens einmal pro Intervall."""
+    if coordinator is None:
+        return True, metrics.run_job(job_id, func)
+    # Halbes Intervall als Mindestabstand toleriert Jitter und leicht versetzte Uhren
+    executed, result = coordinator.run_exclusive(
+        job_id, lambda: metrics.run_job(job_id, func), interval_minutes * 60 / 2
+    )
+    if not executed:
+        metrics.JOB_RUNS.labels(job_id, "skipped").inc()
+    return executed, result
+
+
+def run_fixed_job(
+    coordinator: Coordinator | None, job_id: str, func: Callable[[], int | None]
+) -> None:
+    execute_job(coordinator, job_id, func, FIXED_INTERVAL_MINUTES)
+
+
+def run_adaptive_job(
+    scheduler: BlockingScheduler,
+    state: AdaptiveScheduleState,
+    coordinator: Coordinator | None,
+    job_id: str,
+    func: Callable[[], int | None],
+) -> None:
+    """Scraper ausführen und den nächsten Lauf anhand der Ausbeute neu planen."""
+    try:
+        executed, result = execute_job(
+            coordinator, job_id, func, state.get(job_id).interval_minutes
+        )
+    except Exception:
+        # Intervall bleibt unverändert, der Fehler wird nur geloggt
+        logger.exception(f"{job_id} – Scraper fehlgeschlagen")
+        return
+
+    # Lauf wurde von einem anderen Replikat übernommen
+    if not executed:
+        return
+
+    new_items = result or 0
+
+    # Der Versatz steckt bereits in delay, der Trigger selbst bekommt keinen Jitter
+    delay = state.record_run(job_id, new_items)
+    interval = state.get(job_id).interval_minutes
+    scheduler.reschedule_job(
+        job_id,
+        trigger=IntervalTrigger(
+            minutes=interval,
+            start_date=datetime.now() + timedelta(seconds=delay),
+        ),
+    )
+
+
+def add_fixed_jobs(
+    scheduler: BlockingScheduler, coordinator: Coordinator | None
+) -> None:
+    for job_id, name, func in JOBS:
+        scheduler.add_job(
+            func=run_fixed_job,
+            args=(coordinator, job_id, func),
+            trigger=IntervalTrigger(minutes=FIXED_INTERVAL_MINUTES),
+            id=job_id,
+            name=name,
+            replace_existing=True,
+            next_run_time=datetime.now(),
+        )
+
+
+def add_adaptive_jobs(
+    scheduler: BlockingScheduler, coordinator: Coordinator | None
+) -> AdaptiveScheduleState:
+    state = AdaptiveScheduleState()
+
+    for index, (job_id, name, func) in enumerate(JOBS):
+        interval = state.get(job_id).interval_minutes
+        # Erste Läufe gestaffelt starten, damit nicht alle Scraper gleichzeitig an Django senden
+        first_run = datetime.now() + timedelta(
+            seconds=index * JITTER_SECONDS + random.uniform(0, JITTER_SECONDS)
+        )
+        scheduler.add_job(
+            func=run_adaptive_job,
+            args=(scheduler, state, coordinator, job_id, func),
+            trigger=IntervalTrigger(minutes=interval),
+            id=job_id,
+            name=name,
+            replace_existing=True,
+            next_run_time=first_run,
+        )
+        state.get(job_id).next_run_at = first_run.timestamp()
+        logger.info(
+            f"{name} – adaptives Intervall {interval:.1f} min, erster Lauf um {first_run:%H:%M:%S}"
+        )
+
+    return state
+
+
 def main():
     if scrapers_disabled():
         logger.info("Scraper sind deaktiviert. Beende Scheduler.")
@@ -43,41 +166,22 @@ def main():
 
     wait_for_django()  # Warte auf Django, bevor der Scheduler startet
 
-    scheduler.add_job(
-        func=rundmail.main,
-        trigger=IntervalTrigger(minutes=20),
-        id="rundmail_job",
-        name="Rundmail-Scraper",
-        replace_existing=True,
-        next_run_time=datetime.now(),
-    )
-
-    scheduler.add_job(
-        func=pressemitteilungen.main,
-        trigger=IntervalTrigger(minutes=20),
-        id="newsroom_job_1",
-        name="Newsroom-Scraper (Pressmitteilungen)",
-        replace_existing=True,
-        next_run_time=datetime.now(),
-    )
-
-    scheduler.add_job(
-        func=wiwi.main,
-        trigger=IntervalTrigger(minutes=20),
-        id="fachbereiche_job_wiwi",
-        name="Fachbereiche-Scraper (Wiwi)",
-        replace_existing=True,
-        next_run_time=datetime.now(),
-    )
-
-    scheduler.add_job(
-        func=mail_scraper.main,
-        trigger=IntervalTrigger(minutes=20),
-        id="mail_job",
-        name="Mail-Scraper",
-        replace_existing=True,
-        next_run_time=datetime.now(),
-    )
+    # Bei mehreren Replikaten über Redis koordinieren
+    coordinator: Coordinator | None = None
+    mode = coordination_mode()
+    if mode != "none":
+        coordinator = Coordinator(mode)
+        coordinator.start()
+        atexit.register(coordinator.stop)
+
+    collector = metrics.start_metrics_server(get_outbox().stats)
+
+    if adaptive_mode_enabled():
+        state = add_adaptive_jobs(scheduler, coordinator)
+        if collector is not None:
+            collector.schedule_snapshot = state.snapshot
+    else:
+        add_fixed_jobs(scheduler, coordinator)
 
     logger.info("Scheduler läuft...")
     scheduler.start()
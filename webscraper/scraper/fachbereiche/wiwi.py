@@ -3,18 +3,23 @@ from typing import cast
 from zoneinfo import ZoneInfo
 
 import bs4
-import requests
 import scraper.util.frontend_interaction as frontend_interaction
+import scraper.util.metrics as metrics
 from scraper.util.create_news_entry import create_news_entry
+from scraper.util.html_parsing import (
+    WIWI_ARTICLE_STRAINER,
+    WIWI_LIST_STRAINER,
+    make_soup,
+)
 from scraper.util.save_as_json import save_as_json
 
 
 def fetch_news_page() -> bs4.BeautifulSoup:
     # News-Seite des Fachbereichs aufrufen
-    html_code = requests.get(
+    html_code = metrics.fetch(
         "https://wiwi.rptu.de/aktuelles/aktuelles-und-mitteilungen"
     ).text
-    return bs4.BeautifulSoup(html_code, "html.parser")
+    return make_soup(html_code, WIWI_LIST_STRAINER)
 
 
 def get_aktuelles_articles(soup: bs4.BeautifulSoup) -> bs4.ResultSet[bs4.element.Tag]:
@@ -58,11 +63,11 @@ def get_next_page_aktuelles(soup: bs4.BeautifulSoup) -> bs4.BeautifulSoup:
                 if isinstance(link, bs4.element.Tag):
                     href = link.get("href")
                     complete_link = f"https://wiwi.rptu.de{href}"
-                    html_code = requests.get(complete_link).text
-                    return bs4.BeautifulSoup(html_code, "html.parser")
+                    html_code = metrics.fetch(complete_link).text
+                    return make_soup(html_code, WIWI_LIST_STRAINER)
 
     # Falls kein valides Objekt gefunden wurde (nur für Type-Hints)
-    return bs4.BeautifulSoup("", "html.parser")
+    return make_soup("")
 
 
 def get_next_page_science(soup: bs4.BeautifulSoup) -> bs4.BeautifulSoup:
@@ -82,11 +87,11 @@ def get_next_page_science(soup: bs4.BeautifulSoup) -> bs4.BeautifulSoup:
                 if isinstance(link, bs4.element.Tag):
                     href = link.get("href")
                     complete_link = f"https://wiwi.rptu.de{href}"
-                    html_code = requests.get(complete_link).text
-                    return bs4.BeautifulSoup(html_code, "html.parser")
+                    html_code = metrics.fetch(complete_link).text
+                    return make_soup(html_code, WIWI_LIST_STRAINER)
 
     # Falls kein valides Objekt gefunden wurde (nur für Type-Hints)
-    return bs4.BeautifulSoup("", "html.parser")
+    return make_soup("")
 
 
 def process_entry(entry: bs4.element.Tag, science: bool) -> dict:
@@ -121,9 +126,9 @@ def process_entry(entry: bs4.element.Tag, science: bool) -> dict:
     date: datetime = date_object.replace(tzinfo=ZoneInfo("Europe/Berlin"))
 
     # Eintrag aufrufen und in BeautifulSoup-Objekt umwandeln
-    news_entry_html: str = requests.get(complete_link).text
-    news_entry_soup: bs4.BeautifulSoup = bs4.BeautifulSoup(
-        news_entry_html, "html.parser"
+    news_entry_html: str = metrics.fetch(complete_link).text
+    news_entry_soup: bs4.BeautifulSoup = make_soup(
+        news_entry_html, WIWI_ARTICLE_STRAINER
     )
 
     # Text scrapen
@@ -165,8 +170,9 @@ def main():
         else:
             soup = new_page
 
-    for article in aktuelles_articles:
-        news.append(process_entry(article, False))
+    news.extend(
+        metrics.parse_each(aktuelles_articles, lambda article: process_entry(article, False))
+    )
 
     # News-Seite vom Fachbereich aufrufen
     soup: bs4.BeautifulSoup = fetch_news_page()
@@ -182,10 +188,11 @@ def main():
         else:
             soup = new_page
 
-    for article in science_articles:
-        news.append(process_entry(article, True))
+    news.extend(
+        metrics.parse_each(science_articles, lambda article: process_entry(article, True))
+    )
 
     # Einträge in JSON-Datei speichern (zum Testen)
     # save_as_json(news, "wiwi_news")
 
-    frontend_interaction.send_data(news, "Wiwi-Scraper")
+    return frontend_interaction.send_data(news, "Wiwi-Scraper")
@@ -2,6 +2,7 @@ import email
 import imaplib
 import os
 import re
+import time
 from datetime import datetime
 from email import policy
 from email.message import EmailMessage
@@ -9,6 +10,7 @@ from email.utils import mktime_tz, parseaddr, parsedate_tz
 from zoneinfo import ZoneInfo
 
 import scraper.util.frontend_interaction as frontend_interaction
+import scraper.util.metrics as metrics
 from scraper.util.create_news_entry import create_news_entry
 from scraper.util.save_as_json import save_as_json
 
@@ -50,11 +52,14 @@ def fetch_all_messages(mailbox: imaplib.IMAP4_SSL) -> list[EmailMessage]:
     msg_nums = data[0].split()
 
     for num in msg_nums:
+        fetch_start = time.perf_counter()
         status, msg_data = mailbox.fetch(num, "(RFC822)")
         if status != "OK" or not msg_data or not isinstance(msg_data[0], tuple):
+            metrics.record_fetch(time.perf_counter() - fetch_start, 0, error=True)
             continue
 
         raw_email = msg_data[0][1]
+        metrics.record_fetch(time.perf_counter() - fetch_start, len(raw_email))
         msg = email.message_from_bytes(raw_email, policy=policy.default)
         messages.append(msg)
 
@@ -117,11 +122,11 @@ def parse_message(msg: EmailMessage) -> dict:
     )
 
 
-def main() -> None:
+def main() -> int:
     mailbox = connect_mailbox()
     messages = fetch_all_messages(mailbox)
 
-    news = [parse_message(m) for m in messages]
+    news = list(metrics.parse_each(messages, parse_message))
 
     mailbox.close()
     mailbox.logout()
@@ -130,7 +135,7 @@ def main() -> None:
     # save_as_json(news, "mail_scraper")
 
     # Einträge an Frontend senden
-    frontend_interaction.send_data(news, "Mail-Scraper")
+    return frontend_interaction.send_data(news, "Mail-Scraper")
 
 
 if __name__ == "__main__":
@@ -5,9 +5,14 @@ from pickletools import read_unicodestring1
 from zoneinfo import ZoneInfo
 
 import bs4
-import requests
 import scraper.util.frontend_interaction as frontend_interaction
+import scraper.util.metrics as metrics
 from scraper.util.create_news_entry import create_news_entry
+from scraper.util.html_parsing import (
+    NEWSROOM_ARTICLE_STRAINER,
+    NEWSROOM_LIST_STRAINER,
+    make_soup,
+)
 from scraper.util.save_as_json import save_as_json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -62,7 +67,7 @@ def unfold_news(driver: webdriver.Firefox) -> None:
 
 def process_article(relative_link: str) -> dict:
     link = "https://rptu.de" + relative_link
-    page = bs4.BeautifulSoup(requests.get(link).text, "html.parser")
+    page = make_soup(metrics.fetch(link).text, NEWSROOM_ARTICLE_STRAINER)
 
     # Titel extrahieren
     title_element = page.find("h1")
@@ -109,10 +114,15 @@ def process_article(relative_link: str) -> dict:
 
 def main():
     driver = setup_driver()
+    fetch_start = time.perf_counter()
     driver.get("https://rptu.de/newsroom/pressemitteilungen")
     unfold_news(driver)
+    page_source: str = driver.page_source
+    metrics.record_fetch(
+        time.perf_counter() - fetch_start, len(page_source.encode("utf-8"))
+    )
 
-    soup: bs4.BeautifulSoup = bs4.BeautifulSoup(driver.page_source, "html.parser")
+    soup: bs4.BeautifulSoup = make_soup(page_source, NEWSROOM_LIST_STRAINER)
     articles: bs4.ResultSet = soup.find_all(
         "div",
         class_="news-item",
@@ -120,17 +130,19 @@ def main():
 
     driver.quit()
 
-    news = []
+    links: list[str] = []
 
     for article in articles:
         a_element: bs4.Tag = article.find("a")
         if isinstance(a_element, bs4.Tag):
             link = a_element.get("href")
             if isinstance(link, str):
-                news.append(process_article(link))
+                links.append(link)
+
+    news = list(metrics.parse_each(links, process_article))
 
     # Einträge in JSON-Datei speichern (zum Testen)
     # save_as_json(news, "pressemitteilungen")
 
     # Einträge an Frontend senden
-    frontend_interaction.send_data(news, "Newsroom-Scraper")
+    return frontend_interaction.send_data(news, "Newsroom-Scraper")
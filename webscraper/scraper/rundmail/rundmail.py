@@ -1,21 +1,30 @@
 from datetime import datetime
-from typing import cast
+from typing import Callable, cast
 from zoneinfo import ZoneInfo
 
 import bs4
-import requests
 import scraper.util.frontend_interaction as frontend_interaction
+import scraper.util.metrics as metrics
+from scraper.util.html_parsing import (
+    RUNDMAIL_ARCHIVE_STRAINER,
+    RUNDMAIL_TEXT_STRAINER,
+    make_soup,
+)
 from scraper.util.save_as_json import save_as_json
 
 
 def fetch_rundmail_archive() -> str:
     # Archiv-Seite der Rundmail aufrufen
-    return requests.get("https://rundmail.rptu.de/archive").text
+    return metrics.fetch("https://rundmail.rptu.de/archive").text
+
+
+def fetch_archive_entry(link: str) -> str:
+    return metrics.fetch(link).text
 
 
 def parse_rundmail_archive(html: str) -> bs4.ResultSet[bs4.element.Tag]:
-    # Archiv-Seite in BeautifulSoup-Objekt umwandeln
-    soup: bs4.BeautifulSoup = bs4.BeautifulSoup(html, "html.parser")
+    # Archiv-Seite in BeautifulSoup-Objekt umwandeln (nur Tabellenzeilen)
+    soup: bs4.BeautifulSoup = make_soup(html, RUNDMAIL_ARCHIVE_STRAINER)
     # Alle Einträge im Archiv extrahieren
     return cast(bs4.ResultSet[bs4.element.Tag], soup.find_all(name="tr")[1:])
 
@@ -76,7 +85,10 @@ def create_news_entry(
     }
 
 
-def process_archive_entry(archive_entry: bs4.element.Tag) -> dict | list[dict]:
+def process_archive_entry(
+    archive_entry: bs4.element.Tag,
+    fetch: Callable[[str], str] = fetch_archive_entry,
+) -> dict | list[dict]:
     # Link zu Archiv-Eintrag extrahieren
     link = archive_entry.find(name="a")
     if not isinstance(link, bs4.element.Tag):
@@ -85,15 +97,6 @@ def process_archive_entry(archive_entry: bs4.element.Tag) -> dict | list[dict]:
     href = link.get("href")
     complete_link: str = f"https://rundmail.rptu.de{href}"
 
-    # Archiv-Eintrag aufrufen und in BeautifulSoup-Objekt umwandeln
-    archive_entry_html: str = requests.get(complete_link).text
-    archive_entry_soup: bs4.BeautifulSoup = bs4.BeautifulSoup(
-        archive_entry_html, "html.parser"
-    )
-
-    if not isinstance(archive_entry_soup, bs4.element.Tag):
-        return []
-
     # Datum extrahieren
     date_element = archive_entry.find(name="td", class_="created_at")
     if not isinstance(date_element, bs4.element.Tag):
@@ -109,6 +112,20 @@ def process_archive_entry(archive_entry: bs4.element.Tag) -> dict | list[dict]:
         return []
 
     subject_clean: str = subject.text.strip()
+    is_sammel_rundmail = subject_clean.startswith(
+        ("Sammel-Rundmail", "Stellenangebote Sammel-Rundmail")
+    )
+
+    # Archiv-Eintrag aufrufen und in BeautifulSoup-Objekt umwandeln
+    # Einzel-Rundmails benötigen nur den Text-Absatz, Sammel-Rundmails die ganze Seite
+    archive_entry_html: str = fetch(complete_link)
+    archive_entry_soup: bs4.BeautifulSoup = make_soup(
+        archive_entry_html,
+        None if is_sammel_rundmail else RUNDMAIL_TEXT_STRAINER,
+    )
+
+    if not isinstance(archive_entry_soup, bs4.element.Tag):
+        return []
 
     # Archiv-Eintrag verarbeiten
     if subject_clean.startswith("Sammel-Rundmail"):
@@ -133,6 +150,33 @@ def process_archive_entry(archive_entry: bs4.element.Tag) -> dict | list[dict]:
         )
 
 
+def index_sammel_rundmail_sections(
+    archive_entry_soup: bs4.BeautifulSoup,
+) -> dict[str, bs4.element.Tag | None]:
+    """Ordnet jeder Abschnitts-ID (h2) den Text-Absatz des zugehörigen Abschnitts zu."""
+    sections: dict[str, bs4.element.Tag | None] = {}
+
+    for heading in archive_entry_soup.find_all(name="h2", id=True):
+        if not isinstance(heading, bs4.element.Tag):
+            continue
+
+        heading_id = heading.get("id")
+        # Wie bei find() zählt bei doppelten IDs nur die erste Überschrift
+        if not isinstance(heading_id, str) or heading_id in sections:
+            continue
+
+        news_text = None
+        body = heading.find_next_sibling(name="div")
+        if isinstance(body, bs4.element.Tag):
+            text_element = body.find(name="p", class_="whitespaces")
+            if isinstance(text_element, bs4.element.Tag):
+                news_text = text_element
+
+        sections[heading_id] = news_text
+
+    return sections
+
+
 def process_sammel_rundmail(
     archive_entry_soup: bs4.BeautifulSoup,
     link: str,
@@ -156,6 +200,9 @@ def process_sammel_rundmail(
         messages_overview.find_all(name="h5", class_="mt-4"),
     )
 
+    # Alle Abschnitte einmalig indexieren, statt pro Eintrag das Dokument zu durchsuchen
+    sections = index_sammel_rundmail_sections(archive_entry_soup)
+
     # Einträge in allen Kategorien verarbeiten
     for category in categories_in_archive_entry:
         # Kategorienamen und Einträge extrahieren
@@ -182,20 +229,9 @@ def process_sammel_rundmail(
 
             news_entry_id_clean: str = news_entry_id.replace("#", "")
 
-            # Eintrag aufrufen und daraus Text extrahieren
-            news_entry_heading = archive_entry_soup.find(
-                name="h2", id=news_entry_id_clean
-            )
-            if not isinstance(news_entry_heading, bs4.element.Tag):
-                continue
-
-            news_entry_body = news_entry_heading.find_next_sibling(name="div")
-
-            if not isinstance(news_entry_body, bs4.element.Tag):
-                continue
-
-            news_text = news_entry_body.find(name="p", class_="whitespaces")
-            if not isinstance(news_text, bs4.element.Tag):
+            # Text des Eintrags über den Index nachschlagen
+            news_text = sections.get(news_entry_id_clean)
+            if news_text is None:
                 continue
 
             news_text_without_tag: str = news_text.decode_contents()
@@ -228,15 +264,15 @@ def process_sammel_rundmail(
 
 def process_rundmail(
     archive_entry_soup: bs4.BeautifulSoup, link: str, date: datetime, subject: str
-) -> dict:
+) -> dict | list[dict]:
     # p-Element mit Text finden
     text_element = archive_entry_soup.find(name="p", class_="whitespaces")
 
-    # Text aus p-Element extrahieren
+    # Text aus p-Element extrahieren, Einträge ohne Text überspringen
     if isinstance(text_element, bs4.element.Tag):
         text = text_element.decode_contents()
     else:
-        exit()
+        return []
 
     # Standorte aus Subject extrahieren
     locations: list[str] = extract_locations(subject)
@@ -262,9 +298,7 @@ def main():
     news: list[dict] = []
 
     # Einträge im Archiv verarbeiten
-    for archive_entry in archive_entries[:60]:
-        entry: dict | list[dict] = process_archive_entry(archive_entry)
-
+    for entry in metrics.parse_each(archive_entries[:60], process_archive_entry):
         if isinstance(entry, dict):
             news.append(entry)
         else:
@@ -274,4 +308,4 @@ def main():
     # save_as_json(news, "rundmail")
 
     # Einträge an Frontend senden
-    frontend_interaction.send_data(news, "Rundmail-Scraper")
+    return frontend_interaction.send_data(news, "Rundmail-Scraper")
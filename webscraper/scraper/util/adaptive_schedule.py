@@ -0,0 +1,154 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from .my_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_STATE_PATH = "/app/data/schedule.json"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+MIN_INTERVAL_MINUTES = _env_float("SCRAPER_MIN_INTERVAL_MINUTES", 5)
+MAX_INTERVAL_MINUTES = _env_float("SCRAPER_MAX_INTERVAL_MINUTES", 120)
+DEFAULT_INTERVAL_MINUTES = _env_float("SCRAPER_INTERVAL_MINUTES", 20)
+JITTER_SECONDS = _env_float("SCRAPER_JITTER_SECONDS", 90)
+# Faktor, um den das Intervall bei Läufen ohne neue Einträge wächst
+BACKOFF_FACTOR = 1.5
+# Anzahl der Läufe, aus denen die Veröffentlichungsrate geschätzt wird
+HISTORY_SIZE = 12
+
+
+def adaptive_mode_enabled() -> bool:
+    return os.getenv("SCRAPER_SCHEDULE_MODE", "fixed").strip().lower() == "adaptive"
+
+
+def clamp_interval(minutes: float) -> float:
+    return min(MAX_INTERVAL_MINUTES, max(MIN_INTERVAL_MINUTES, minutes))
+
+
+def jittered_delay(minutes: float) -> float:
+    """Intervall in Sekunden mit zufälligem Versatz, damit die Jobs Django nicht gleichzeitig treffen."""
+    return max(0.0, minutes * 60 + random.uniform(-JITTER_SECONDS, JITTER_SECONDS))
+
+
+@dataclass
+class SourceSchedule:
+    job_id: str
+    interval_minutes: float = DEFAULT_INTERVAL_MINUTES
+    next_run_at: float | None = None
+    last_yield: int | None = None
+    runs: int = 0
+    # (Zeitpunkt, Anzahl neuer Einträge) der letzten Läufe
+    history: deque = field(default_factory=lambda: deque(maxlen=HISTORY_SIZE))
+
+    def record_run(self, new_items: int, finished_at: float) -> float:
+        """Lauf erfassen und neues Intervall (Minuten) bestimmen."""
+        self.runs += 1
+        self.last_yield = new_items
+
+        # Der allererste Lauf liefert den gesamten Bestand und sagt nichts über die Rate aus
+        if self.runs == 1 and not self.history:
+            return self.interval_minutes
+
+        self.history.append((finished_at, new_items))
+
+        total_items = sum(items for _, items in self.history)
+        if total_items == 0:
+            # Ruhige Quelle: Intervall schrittweise vergrößern
+            self.interval_minutes = clamp_interval(
+                self.interval_minutes * BACKOFF_FACTOR
+            )
+            return self.interval_minutes
+
+        if len(self.history) >= 2:
+            span_minutes = (finished_at - self.history[0][0]) / 60
+            if span_minutes > 0:
+                # Ziel: im Mittel etwa ein neuer Eintrag pro Lauf
+                items_per_minute = total_items / span_minutes
+                self.interval_minutes = clamp_interval(1 / items_per_minute)
+                return self.interval_minutes
+
+        # Zu wenig Historie: bei neuen Einträgen vorsichtig häufiger abfragen
+        self.interval_minutes = clamp_interval(self.interval_minutes / 2)
+        return self.interval_minutes
+
+    def as_dict(self) -> dict:
+        return {
+            "interval_minutes": round(self.interval_minutes, 2),
+            "next_run_at": self.next_run_at,
+            "last_yield": self.last_yield,
+            "runs": self.runs,
+            "history": list(self.history),
+        }
+
+
+class AdaptiveScheduleState:
+    """Gelernte Intervalle pro Quelle, persistiert als JSON (auch als Metrik-Quelle)."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("SCRAPER_SCHEDULE_STATE_PATH", DEFAULT_STATE_PATH)
+        self._lock = threading.Lock()
+        self.sources: dict[str, SourceSchedule] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                raw = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        for job_id, values in raw.items():
+            schedule = SourceSchedule(
+                job_id,
+                interval_minutes=clamp_interval(
+                    values.get("interval_minutes", DEFAULT_INTERVAL_MINUTES)
+                ),
+                last_yield=values.get("last_yield"),
+                runs=values.get("runs", 0),
+            )
+            schedule.history.extend(tuple(entry) for entry in values.get("history", []))
+            self.sources[job_id] = schedule
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {job_id: source.as_dict() for job_id, source in self.sources.items()}
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+    def get(self, job_id: str) -> SourceSchedule:
+        with self._lock:
+            return self.sources.setdefault(job_id, SourceSchedule(job_id))
+
+    def record_run(self, job_id: str, new_items: int) -> float:
+        """Gibt die Verzögerung bis zum nächsten Lauf in Sekunden zurück."""
+        with self._lock:
+            schedule = self.sources.setdefault(job_id, SourceSchedule(job_id))
+            interval = schedule.record_run(new_items, time.time())
+            delay = jittered_delay(interval)
+            schedule.next_run_at = time.time() + delay
+            self._save()
+
+        logger.info(
+            f"{job_id} – {new_items} neue Einträge, nächstes Intervall {interval:.1f} min "
+            f"(nächster Lauf in {delay / 60:.1f} min)"
+        )
+        return delay
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {job_id: source.as_dict() for job_id, source in self.sources.items()}
@@ -0,0 +1,169 @@
+import hashlib
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable
+
+from .my_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_REDIS_URL = "redis://redis:6379/2"
+KEY_PREFIX = "rptu4you:scraper"
+# Nach dieser Zeit ohne Heartbeat gilt ein Replikat als ausgefallen
+HEARTBEAT_TTL_SECONDS = 60
+# Obergrenze für die Laufzeit eines Jobs, danach verfällt dessen Lock
+JOB_LOCK_TTL_SECONDS = 3 * 60 * 60
+
+# Verlängert bzw. löscht einen Schlüssel nur, wenn er noch diesem Replikat gehört
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def coordination_mode() -> str:
+    """none (Standard), leader (Hot-Standby) oder shard (Quellen auf Replikate verteilen)."""
+    mode = os.getenv("SCRAPER_COORDINATION", "none").strip().lower()
+    return mode if mode in {"none", "leader", "shard"} else "none"
+
+
+def _replica_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Coordinator:
+    """Koordiniert mehrere Scraper-Replikate über Redis.
+
+    Jeder Job wird auf allen Replikaten geplant; beim Auslösen entscheidet der Coordinator,
+    ob dieses Replikat zuständig ist (Leader bzw. Shard-Besitzer) und sichert über ein
+    Job-Lock samt Zeitstempel ab, dass pro Intervall genau ein Lauf stattfindet.
+    """
+
+    def __init__(self, mode: str, redis_url: str | None = None):
+        import redis
+
+        self.mode = mode
+        self.replica_id = _replica_id()
+        self.redis = redis.Redis.from_url(
+            redis_url or os.getenv("SCRAPER_REDIS_URL", DEFAULT_REDIS_URL),
+            decode_responses=True,
+        )
+        self._renew = self.redis.register_script(_RENEW_SCRIPT)
+        self._release = self.redis.register_script(_RELEASE_SCRIPT)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _key(self, *parts: str) -> str:
+        return ":".join([KEY_PREFIX, *parts])
+
+    # Heartbeat und Leader-Wahl
+
+    def start(self) -> None:
+        self._heartbeat()
+        self._thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"Koordination aktiv (Modus {self.mode}, Replikat {self.replica_id})")
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            self.redis.zrem(self._key("replicas"), self.replica_id)
+            self._release(keys=[self._key("leader")], args=[self.replica_id])
+        except Exception:
+            logger.exception("Abmelden bei Redis fehlgeschlagen")
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(HEARTBEAT_TTL_SECONDS / 3):
+            try:
+                self._heartbeat()
+            except Exception:
+                logger.exception("Heartbeat an Redis fehlgeschlagen")
+
+    def _heartbeat(self) -> None:
+        now = time.time()
+        replicas_key = self._key("replicas")
+        pipeline = self.redis.pipeline()
+        pipeline.zadd(replicas_key, {self.replica_id: now})
+        # Ausgefallene Replikate entfernen, damit ihre Quellen übernommen werden
+        pipeline.zremrangebyscore(replicas_key, 0, now - HEARTBEAT_TTL_SECONDS)
+        pipeline.execute()
+
+        if self.mode == "leader":
+            leader_key = self._key("leader")
+            ttl_ms = HEARTBEAT_TTL_SECONDS * 1000
+            if not self._renew(keys=[leader_key], args=[self.replica_id, ttl_ms]):
+                if self.redis.set(leader_key, self.replica_id, nx=True, px=ttl_ms):
+                    logger.info(f"Replikat {self.replica_id} ist jetzt Leader")
+
+    def live_replicas(self) -> list[str]:
+        cutoff = time.time() - HEARTBEAT_TTL_SECONDS
+        return sorted(self.redis.zrangebyscore(self._key("replicas"), cutoff, "+inf"))
+
+    def is_leader(self) -> bool:
+        return self.redis.get(self._key("leader")) == self.replica_id
+
+    def owner_of(self, job_id: str) -> str | None:
+        """Rendezvous-Hashing: jede Quelle gehört dem Replikat mit dem höchsten Gewicht."""
+        replicas = self.live_replicas()
+        if not replicas:
+            return None
+        return max(
+            replicas,
+            key=lambda replica: hashlib.sha256(f"{job_id}|{replica}".encode()).digest(),
+        )
+
+    def is_responsible(self, job_id: str) -> bool:
+        if self.mode == "leader":
+            return self.is_leader()
+        return self.owner_of(job_id) == self.replica_id
+
+    # Job-Ausführung
+
+    def run_exclusive(
+        self, job_id: str, func: Callable[[], Any], min_gap_seconds: float
+    ) -> tuple[bool, Any]:
+        """Führt func aus, wenn dieses Replikat zuständig ist und im aktuellen Intervall noch niemand lief.
+
+        Gibt (ausgeführt, Ergebnis) zurück.
+        """
+        try:
+            if not self.is_responsible(job_id):
+                return False, None
+
+            lock_key = self._key("lock", job_id)
+            if not self.redis.set(
+                lock_key, self.replica_id, nx=True, ex=JOB_LOCK_TTL_SECONDS
+            ):
+                logger.info(f"{job_id} – läuft bereits auf einem anderen Replikat")
+                return False, None
+
+            last_run_key = self._key("last_run", job_id)
+            last_run = self.redis.get(last_run_key)
+            if last_run is not None and time.time() - float(last_run) < min_gap_seconds:
+                self._release(keys=[lock_key], args=[self.replica_id])
+                logger.info(f"{job_id} – in diesem Intervall bereits ausgeführt")
+                return False, None
+
+            self.redis.set(last_run_key, time.time())
+        except Exception:
+            # Ohne Redis lieber auslassen als doppelt scrapen (und doppelt OpenAI bezahlen)
+            logger.exception(f"{job_id} – Koordination nicht möglich, Lauf wird ausgelassen")
+            return False, None
+
+        try:
+            return True, func()
+        finally:
+            try:
+                self._release(keys=[lock_key], args=[self.replica_id])
+            except Exception:
+                logger.exception(f"{job_id} – Lock konnte nicht freigegeben werden")
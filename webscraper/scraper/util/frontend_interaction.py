@@ -1,22 +1,116 @@
-import gzip
 import json
 import os
-from datetime import datetime
-from math import ceil
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Iterable, Sequence
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from . import metrics
 from .my_logging import get_logger
+from .outbox import Outbox
+from .seen_store import SeenStore
+from .wire_format import datetime_serializer, encode, get_wire_format, headers_for
 
 logger = get_logger(__name__)
 
+API_URL = "http://django:8000/api/news/"
+STREAM_API_URL = "http://django:8000/api/news/stream/"
+BATCH_SIZE = 25
 
-def datetime_serializer(obj) -> str:
-    """Datums-Objekte in ein serialisierbares Format umwandeln."""
-    if isinstance(obj, datetime):
-        return obj.strftime("%d.%m.%Y %H:%M:%S")
-    raise TypeError("Type not serializable")
+# Status je Eintrag aus der Antwort von Django (news/views/receive_news.py), bei denen
+# der Eintrag gespeichert ist. Übersprungene oder fehlerhafte Einträge werden erneut gesendet.
+HANDLED_STATUSES = {"created", "unchanged", "modified", "duplicate", "deferred"}
+
+# Ergebnis eines gesendeten Batches
+DELIVERED = "delivered"
+REJECTED = "rejected"
+RETRY = "retry"
+
+
+@dataclass
+class PostResult:
+    outcome: str
+    # Status je Eintrag in Reihenfolge des Batches, falls Django ihn mitliefert
+    statuses: list[str | None] | None = None
+
+    def handled(self, index: int) -> bool:
+        """Ob der Eintrag an Position index als gespeichert gelten kann."""
+        if self.outcome != DELIVERED:
+            return False
+        if self.statuses is None:
+            # Ältere Frontends antworten ohne Ergebnis je Eintrag
+            return True
+        return index < len(self.statuses) and self.statuses[index] in HANDLED_STATUSES
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+# Anzahl paralleler Uploads, Wiederholungen und Basis-Wartezeit für Backoff
+SEND_WORKERS = max(1, _env_int("SCRAPER_SEND_WORKERS", 2))
+SEND_RETRIES = max(0, _env_int("SCRAPER_SEND_RETRIES", 3))
+SEND_BACKOFF_SECONDS = _env_float("SCRAPER_SEND_BACKOFF_SECONDS", 2.0)
+# Django verarbeitet einen Batch synchron inkl. OpenAI-Aufrufen, daher großzügiges Timeout
+SEND_TIMEOUT_SECONDS = _env_float("SCRAPER_SEND_TIMEOUT_SECONDS", 900.0)
+
+_session: requests.Session | None = None
+_outbox: Outbox | None = None
+_seen_store: SeenStore | None = None
+_init_lock = threading.Lock()
+
+# Unterdrückte (unveränderte) Einträge pro Quelle seit Start des Containers
+_suppressed_totals: dict[str, int] = {}
+
+
+def get_session() -> requests.Session:
+    """Gibt eine geteilte Session mit Connection-Pool (Keep-Alive) zurück."""
+    global _session
+    with _init_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SEND_WORKERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def get_outbox() -> Outbox:
+    global _outbox
+    with _init_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+    return _outbox
+
+
+def get_seen_store() -> SeenStore:
+    global _seen_store
+    with _init_lock:
+        if _seen_store is None:
+            _seen_store = SeenStore()
+    return _seen_store
+
+
+def seen_store_enabled() -> bool:
+    value = os.getenv("SCRAPER_SEEN_STORE", "1").strip().lower()
+    return value not in {"0", "false", "no", "off"}
 
 
 def _chunk_payload(payload: Sequence, batch_size: int) -> Iterable[Sequence]:
@@ -25,38 +119,303 @@ def _chunk_payload(payload: Sequence, batch_size: int) -> Iterable[Sequence]:
         yield payload[start : start + batch_size]
 
 
-def _post_chunk(chunk, api_key: str, source_type: str) -> int:
-    """Ein Daten-Chunk an das Frontend senden."""
-    json_data = json.dumps(chunk, default=datetime_serializer)
-    compressed_data = gzip.compress(json_data.encode("utf-8"))
-    response = requests.post(
-        "http://django:8000/api/news/",
-        data=compressed_data,
-        headers={
-            "Content-Encoding": "gzip",
-            "Content-Type": "application/json; charset=utf-8",
-            "API-Key": api_key,
-        },
+def _encode_chunk(chunk, wire_format: str) -> bytes:
+    return encode(chunk, wire_format)
+
+
+def _is_retryable(status_code: int | None) -> bool:
+    # Verbindungsfehler, Serverfehler und Rate-Limits lohnen einen weiteren Versuch
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+def _entry_statuses(response: requests.Response) -> list[str | None] | None:
+    try:
+        results = response.json().get("results")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(results, list):
+        return None
+    statuses: list[str | None] = [None] * len(results)
+    for result in results:
+        index = result.get("index") if isinstance(result, dict) else None
+        if isinstance(index, int) and 0 <= index < len(statuses):
+            statuses[index] = result.get("status")
+    return statuses
+
+
+def _post_payload(
+    payload: bytes,
+    api_key: str,
+    source_type: str,
+    wire_format: str = "json",
+    retries: int = SEND_RETRIES,
+) -> PostResult:
+    """Einen komprimierten Batch mit Retries senden.
+
+    Ergebnis RETRY, wenn der Batch später erneut gesendet werden sollte.
+    """
+    session = get_session()
+
+    for attempt in range(retries + 1):
+        status_code: int | None = None
+        try:
+            response = session.post(
+                API_URL,
+                data=payload,
+                headers={**headers_for(wire_format), "API-Key": api_key},
+                timeout=SEND_TIMEOUT_SECONDS,
+            )
+            status_code = response.status_code
+        except requests.RequestException as exc:
+            logger.warning(f"{source_type} – Verbindungsfehler: {exc}")
+
+        logger.info(f"{source_type} – Status Code: {status_code}")
+
+        if status_code is not None and 200 <= status_code < 300:
+            return PostResult(DELIVERED, _entry_statuses(response))
+
+        if not _is_retryable(status_code):
+            # Client-Fehler werden sich durch erneutes Senden nicht beheben
+            logger.error(f"{source_type} – Batch abgelehnt, wird verworfen")
+            return PostResult(REJECTED)
+
+        if attempt < retries:
+            delay = SEND_BACKOFF_SECONDS * (2**attempt)
+            logger.info(
+                f"{source_type} – Neuer Versuch in {delay:.0f}s ({attempt + 1}/{retries})"
+            )
+            time.sleep(delay)
+
+    return PostResult(RETRY)
+
+
+def flush_outbox(api_key: str) -> None:
+    """Zwischengespeicherte Batches erneut senden.
+
+    Jeder Batch wird pro Lauf einmal ohne Backoff versucht, ein dauerhaft abgelehnter
+    Batch blockiert die folgenden nicht und landet nach SCRAPER_OUTBOX_MAX_ATTEMPTS
+    Versuchen in der Dead-Letter-Tabelle.
+    """
+    outbox = get_outbox()
+    entries = outbox.claim()
+    if not entries:
+        return
+
+    logger.info(f"Outbox – Sende {len(entries)} zwischengespeicherte Batches")
+    remaining = [entry.id for entry in entries]
+    try:
+        for entry in entries:
+            result = _post_payload(
+                entry.payload, api_key, entry.source_type, entry.wire_format, retries=0
+            )
+            remaining.remove(entry.id)
+            if result.outcome != RETRY:
+                outbox.remove(entry.id)
+                # Erst jetzt gelten die von Django gespeicherten Einträge als gesehen
+                handled = [
+                    value for position, value in enumerate(entry.hashes) if result.handled(position)
+                ]
+                if handled:
+                    get_seen_store().mark_seen(handled, entry.source_type)
+            elif outbox.mark_failed(entry.id):
+                metrics.SEND_BATCHES.labels(entry.source_type, "dead_lettered").inc()
+                logger.error(
+                    f"Outbox – Batch {entry.id} ({entry.source_type}, {entry.item_count} Einträge) "
+                    f"nach {entry.attempts + 1} Versuchen in die Dead-Letter-Tabelle verschoben"
+                )
+    finally:
+        # Bei einem Abbruch nicht versuchte Batches sofort wieder freigeben
+        if remaining:
+            outbox.release(remaining)
+
+    _log_outbox_stats()
+
+
+def _log_outbox_stats() -> None:
+    outbox = get_outbox()
+    batches, items, lag = outbox.stats()
+    if batches:
+        logger.warning(
+            f"Outbox – {batches} Batches ({items} Einträge) ausstehend, ältester seit {lag:.0f}s"
+        )
+    dead_letters = outbox.dead_letter_count()
+    if dead_letters:
+        logger.warning(f"Outbox – {dead_letters} Batches in der Dead-Letter-Tabelle")
+
+
+def send_data(data, source_type: str, deduplicate: bool = True) -> int:
+    """Daten an das Frontend senden, ggf. in Batches aufgeteilt.
+
+    Bereits gesendete, unveränderte Einträge werden über den SeenStore herausgefiltert.
+    Gibt die Anzahl der neuen bzw. geänderten Einträge zurück.
+    """
+    api_key = os.getenv("API_KEY", "")
+
+    # Zuerst liegengebliebene Batches aus früheren Läufen nachliefern
+    flush_outbox(api_key)
+
+    is_sequence = isinstance(data, Sequence) and not isinstance(
+        data, (str, bytes, bytearray)
+    )
+
+    # Ohne Scheduler-Job (z. B. manueller Lauf) wird nach source_type zugeordnet
+    metric_source = metrics.current_source()
+    if metric_source == metrics.UNKNOWN_SOURCE:
+        metric_source = source_type
+    metrics.ITEMS_SCRAPED.labels(metric_source).inc(len(data) if is_sequence else 1)
+
+    new_hashes: list[str] = []
+    known_hashes: list[str] = []
+    if is_sequence and deduplicate and seen_store_enabled():
+        total_scraped = len(data)
+        data, new_hashes, known_hashes = get_seen_store().filter_new(data)
+        # Einträge, die noch in der Outbox auf Zustellung warten, nicht erneut einreihen
+        pending = get_outbox().pending_hashes()
+        if pending:
+            waiting = [(entry, value) for entry, value in zip(data, new_hashes) if value not in pending]
+            data = [entry for entry, _ in waiting]
+            new_hashes = [value for _, value in waiting]
+        suppressed = total_scraped - len(data)
+        metrics.ITEMS_SUPPRESSED.labels(metric_source).inc(suppressed)
+        _suppressed_totals[source_type] = (
+            _suppressed_totals.get(source_type, 0) + suppressed
+        )
+        logger.info(
+            f"{source_type} – {len(data)} neue/geänderte Einträge, {suppressed} unverändert unterdrückt "
+            f"(insgesamt {_suppressed_totals[source_type]} seit Start)"
+        )
+
+    if is_sequence:
+        chunks = list(_chunk_payload(data, BATCH_SIZE))
+        item_counts = [len(chunk) for chunk in chunks]
+    else:
+        chunks = [data]
+        item_counts = [1]
+
+    if not chunks:
+        if known_hashes:
+            get_seen_store().mark_seen(known_hashes, source_type)
+        return 0
+
+    total_items = sum(item_counts)
+    total_batches = len(chunks)
+    wire_format = get_wire_format()
+    payloads = [_encode_chunk(chunk, wire_format) for chunk in chunks]
+    start = time.monotonic()
+
+    def _send(index: int) -> PostResult:
+        if total_batches > 1:
+            logger.info(f"{source_type} – Sende Batch {index + 1}/{total_batches}")
+        return _post_payload(payloads[index], api_key, source_type, wire_format)
+
+    with ThreadPoolExecutor(max_workers=min(SEND_WORKERS, len(payloads))) as executor:
+        results = list(executor.map(_send, range(len(payloads))))
+
+    # Nicht zustellbare Batches samt Hashes in der Outbox ablegen. Als gesehen gelten nur
+    # Einträge, die Django laut Antwort gespeichert hat, gespoolte erst nach flush_outbox.
+    outbox = get_outbox()
+    spooled = 0
+    spooled_items = 0
+    handled_hashes = list(known_hashes)
+    for index, result in enumerate(results):
+        batch_hashes = new_hashes[index * BATCH_SIZE : (index + 1) * BATCH_SIZE]
+        if result.outcome == RETRY:
+            outbox.put(
+                source_type, payloads[index], item_counts[index], wire_format, batch_hashes
+            )
+            spooled += 1
+            spooled_items += len(batch_hashes)
+        else:
+            handled_hashes.extend(
+                value for position, value in enumerate(batch_hashes) if result.handled(position)
+            )
+
+    elapsed = time.monotonic() - start
+    sent_bytes = sum(len(payload) for payload in payloads)
+    metrics.ITEMS_SENT.labels(metric_source).inc(total_items)
+    metrics.SEND_BATCHES.labels(metric_source, "delivered").inc(total_batches - spooled)
+    metrics.SEND_BATCHES.labels(metric_source, "spooled").inc(spooled)
+    metrics.SEND_BYTES.labels(metric_source).inc(sent_bytes)
+    metrics.SEND_DURATION.labels(metric_source).observe(elapsed)
+
+    if handled_hashes:
+        get_seen_store().mark_seen(handled_hashes, source_type)
+    unhandled = len(new_hashes) - (len(handled_hashes) - len(known_hashes)) - spooled_items
+    if unhandled:
+        logger.warning(
+            f"{source_type} – {unhandled} Einträge abgelehnt oder fehlgeschlagen, "
+            f"werden beim nächsten Lauf erneut gesendet"
+        )
+
+    logger.info(
+        f"{source_type} – Fertig: {total_items} Einträge in {total_batches} Batches "
+        f"({sent_bytes / 1024:.1f} KiB {wire_format}) in {elapsed:.1f}s, "
+        f"{total_items / elapsed if elapsed else 0:.1f} Einträge/s, {spooled} Batches in der Outbox"
     )
-    logger.info(f"{source_type} – Status Code: {response.status_code}")
-    return response.status_code
+    if spooled:
+        _log_outbox_stats()
 
+    return total_items
 
-def send_data(data, source_type: str):
-    """Daten an das Frontend senden, ggf. in Batches aufgeteilt."""
+
+def _write_gzip_ndjson(entries: Iterable[dict], file) -> int:
+    """Einträge zeilenweise als gzip-komprimiertes NDJSON in file schreiben."""
+    compressor = zlib.compressobj(wbits=31)  # gzip-Header
+    count = 0
+    for entry in entries:
+        line = json.dumps(entry, default=datetime_serializer) + "\n"
+        file.write(compressor.compress(line.encode("utf-8")))
+        count += 1
+    file.write(compressor.flush())
+    return count
+
+
+def stream_data(
+    entries: Iterable[dict], source_type: str, defer_llm: bool = False
+) -> dict | None:
+    """Einträge in einem Request an den Streaming-Endpunkt senden.
+
+    Die Nutzlast wird in einer temporären Datei aufgebaut, damit auch große Backfills
+    ohne Batches und mit konstantem Speicherbedarf übertragen werden. Gibt die
+    Antwort des Frontends (Zusammenfassung und Ergebnis pro Zeile) zurück, bei
+    Fehlern None.
+    """
     api_key = os.getenv("API_KEY", "")
-    batch_size = 25
-
-    if isinstance(data, Sequence) and not isinstance(data, (str, bytes, bytearray)):
-        total_items = len(data)
-        if total_items > batch_size:
-            total_batches = ceil(total_items / batch_size)
-            for index, chunk in enumerate(_chunk_payload(data, batch_size), start=1):
-                logger.info(f"{source_type} – Sende Batch {index}/{total_batches}")
-                _post_chunk(chunk, api_key, source_type)
-            logger.info(
-                f"{source_type} – Fertig: {total_items} Einträge in {total_batches} Batches gesendet"
+
+    with tempfile.TemporaryFile() as file:
+        count = _write_gzip_ndjson(entries, file)
+        if not count:
+            return {"status": "success", "summary": {}, "results": []}
+        size = file.tell()
+        file.seek(0)
+
+        start = time.monotonic()
+        try:
+            # Django liest den Body nur bis Content-Length, daher kein Chunked-Upload
+            response = get_session().post(
+                STREAM_API_URL,
+                params={"defer": "1"} if defer_llm else None,
+                data=file,
+                headers={
+                    "Content-Type": "application/x-ndjson",
+                    "Content-Encoding": "gzip",
+                    "Content-Length": str(size),
+                    "API-Key": api_key,
+                },
+                timeout=SEND_TIMEOUT_SECONDS,
             )
-            return
+        except requests.RequestException as exc:
+            logger.error(f"{source_type} – Streaming fehlgeschlagen: {exc}")
+            return None
 
-    _post_chunk(data, api_key, source_type)
+    elapsed = time.monotonic() - start
+    if response.status_code != 200:
+        logger.error(f"{source_type} – Streaming abgelehnt, Status Code: {response.status_code}")
+        return None
+
+    result = response.json()
+    logger.info(
+        f"{source_type} – {count} Einträge ({size / 1024:.1f} KiB) in {elapsed:.1f}s gestreamt: "
+        f"{result.get('summary')}"
+    )
+    return result
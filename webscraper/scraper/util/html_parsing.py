@@ -0,0 +1,79 @@
+import os
+import time
+
+import bs4
+
+from . import metrics
+from .my_logging import get_logger
+
+logger = get_logger(__name__)
+
+# lxml ist deutlich schneller als der eingebaute html.parser
+DEFAULT_PARSER = "lxml"
+FALLBACK_PARSER = "html.parser"
+
+
+def get_parser() -> str:
+    """Gibt das konfigurierte Parser-Backend zurück (SCRAPER_HTML_PARSER)."""
+    return os.getenv("SCRAPER_HTML_PARSER", DEFAULT_PARSER).strip() or DEFAULT_PARSER
+
+
+class AnyOfStrainer(bs4.SoupStrainer):
+    """SoupStrainer, der Tags zulässt, auf die mindestens einer der übergebenen Strainer passt."""
+
+    def __init__(self, *strainers: bs4.SoupStrainer):
+        super().__init__()
+        self.strainers = strainers
+
+    @property
+    def includes_everything(self) -> bool:
+        return False
+
+    @property
+    def excludes_everything(self) -> bool:
+        return False
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return any(
+            strainer.allow_tag_creation(nsprefix, name, attrs)
+            for strainer in self.strainers
+        )
+
+    def allow_string_creation(self, string: str) -> bool:
+        # Texte außerhalb der gesuchten Container werden nicht benötigt
+        return False
+
+
+def make_soup(
+    html: str, parse_only: bs4.SoupStrainer | None = None, parser: str | None = None
+) -> bs4.BeautifulSoup:
+    """HTML mit dem konfigurierten Backend parsen, optional nur die von parse_only erfassten Container."""
+    features = parser or get_parser()
+    start = time.perf_counter()
+    try:
+        soup = bs4.BeautifulSoup(html, features, parse_only=parse_only)
+    except bs4.FeatureNotFound:
+        logger.warning(
+            f"Parser '{features}' nicht verfügbar, verwende '{FALLBACK_PARSER}'"
+        )
+        features = FALLBACK_PARSER
+        soup = bs4.BeautifulSoup(html, FALLBACK_PARSER, parse_only=parse_only)
+    metrics.observe_parse(features, time.perf_counter() - start)
+    return soup
+
+
+# Strainer für die einzelnen Seitentypen
+
+RUNDMAIL_ARCHIVE_STRAINER = bs4.SoupStrainer("tr")
+RUNDMAIL_TEXT_STRAINER = bs4.SoupStrainer("p", class_="whitespaces")
+RUNDMAIL_PAGINATION_STRAINER = bs4.SoupStrainer("a", rel="next")
+WIWI_LIST_STRAINER = AnyOfStrainer(
+    bs4.SoupStrainer("div", id=["c16235", "c26813"]),
+    bs4.SoupStrainer("ul", class_="f3-widget-paginator"),
+)
+WIWI_ARTICLE_STRAINER = bs4.SoupStrainer("div", class_="news-content")
+NEWSROOM_LIST_STRAINER = bs4.SoupStrainer("div", class_="news-item")
+NEWSROOM_ARTICLE_STRAINER = AnyOfStrainer(
+    bs4.SoupStrainer(["h1", "time"]),
+    bs4.SoupStrainer("div", class_="news-content"),
+)
@@ -0,0 +1,246 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, TypeVar
+
+import requests
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector
+
+from .my_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_METRICS_PORT = 9100
+UNKNOWN_SOURCE = "unknown"
+
+# Fehler beim Auswerten einer bereits abgerufenen Seite (fehlende Elemente, unerwartete Formate)
+PARSE_EXCEPTIONS = (AttributeError, IndexError, KeyError, TypeError, ValueError)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Quelle des aktuell laufenden Jobs, damit Abrufe und Parsing ohne zusätzliche Parameter zugeordnet werden
+_current_source: ContextVar[str] = ContextVar("scraper_source", default=UNKNOWN_SOURCE)
+
+FETCH_DURATION = Histogram(
+    "scraper_fetch_duration_seconds",
+    "Dauer der Abrufe pro Quelle",
+    ["source"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+FETCH_BYTES = Counter(
+    "scraper_fetch_bytes_total", "Heruntergeladene Bytes pro Quelle", ["source"]
+)
+FETCH_ERRORS = Counter(
+    "scraper_fetch_errors_total", "Fehlgeschlagene Abrufe pro Quelle", ["source"]
+)
+PARSE_DURATION = Histogram(
+    "scraper_parse_duration_seconds",
+    "Dauer des HTML-Parsings pro Quelle",
+    ["source", "parser"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+PARSE_ERRORS = Counter(
+    "scraper_parse_errors_total",
+    "Übersprungene Einträge mit fehlgeschlagenem Parsing pro Quelle",
+    ["source"],
+)
+ITEMS_SCRAPED = Counter(
+    "scraper_items_scraped_total", "Gefundene Einträge pro Quelle", ["source"]
+)
+ITEMS_SUPPRESSED = Counter(
+    "scraper_items_suppressed_total",
+    "Unveränderte, nicht erneut gesendete Einträge pro Quelle",
+    ["source"],
+)
+ITEMS_SENT = Counter(
+    "scraper_items_sent_total", "An das Frontend gesendete Einträge pro Quelle", ["source"]
+)
+SEND_BATCHES = Counter(
+    "scraper_send_batches_total",
+    "Gesendete Batches pro Quelle und Ergebnis (delivered, spooled, dead_lettered)",
+    ["source", "result"],
+)
+SEND_BYTES = Counter(
+    "scraper_send_bytes_total", "An das Frontend gesendete Bytes pro Quelle", ["source"]
+)
+SEND_DURATION = Histogram(
+    "scraper_send_duration_seconds",
+    "Dauer von send_data pro Quelle",
+    ["source"],
+    buckets=(0.5, 1, 5, 15, 30, 60, 120, 300, 900),
+)
+JOB_RUNS = Counter(
+    "scraper_job_runs_total",
+    "Job-Läufe pro Job und Ergebnis (success, error, skipped)",
+    ["job", "result"],
+)
+JOB_DURATION = Histogram(
+    "scraper_job_duration_seconds",
+    "Laufzeit der Scraper-Jobs",
+    ["job"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800),
+)
+JOB_LAST_SUCCESS = Gauge(
+    "scraper_job_last_success_timestamp_seconds",
+    "Zeitpunkt des letzten erfolgreichen Laufs",
+    ["job"],
+)
+
+
+def current_source() -> str:
+    return _current_source.get()
+
+
+@contextmanager
+def source_context(source: str) -> Iterator[None]:
+    """Ordnet alle Messungen innerhalb des Blocks der angegebenen Quelle zu."""
+    token = _current_source.set(source)
+    try:
+        yield
+    finally:
+        _current_source.reset(token)
+
+
+def record_fetch(seconds: float, size: int, error: bool = False) -> None:
+    source = current_source()
+    FETCH_DURATION.labels(source).observe(seconds)
+    FETCH_BYTES.labels(source).inc(size)
+    if error:
+        FETCH_ERRORS.labels(source).inc()
+
+
+def fetch(url: str, **kwargs) -> requests.Response:
+    """requests.get mit Messung von Dauer, Größe und Fehlern für die aktuelle Quelle."""
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, **kwargs)
+    except requests.RequestException:
+        record_fetch(time.perf_counter() - start, 0, error=True)
+        raise
+    record_fetch(
+        time.perf_counter() - start,
+        len(response.content),
+        error=response.status_code >= 400,
+    )
+    return response
+
+
+def observe_parse(parser: str, seconds: float) -> None:
+    PARSE_DURATION.labels(current_source(), parser).observe(seconds)
+
+
+def record_parse_error(source: str | None = None) -> None:
+    PARSE_ERRORS.labels(source or current_source()).inc()
+
+
+def parse_each(items: Iterable[T], parse: Callable[[T], R]) -> Iterator[R]:
+    """Wendet parse auf jedes Element an und überspringt Elemente, deren Parsing fehlschlägt.
+
+    Ein kaputter Eintrag bricht so nicht den ganzen Lauf ab, sondern wird geloggt und gezählt.
+    Abruffehler (requests.RequestException) werden weitergereicht.
+    """
+    for item in items:
+        try:
+            result = parse(item)
+        except PARSE_EXCEPTIONS:
+            record_parse_error()
+            logger.exception(f"{current_source()} – Eintrag konnte nicht geparst werden")
+            continue
+        yield result
+
+
+def run_job(job_id: str, func: Callable[[], int | None]) -> int | None:
+    """Job im Kontext seiner Quelle ausführen und Laufzeit sowie Ergebnis erfassen."""
+    start = time.perf_counter()
+    with source_context(job_id):
+        try:
+            result = func()
+        except BaseException:
+            JOB_RUNS.labels(job_id, "error").inc()
+            raise
+        finally:
+            JOB_DURATION.labels(job_id).observe(time.perf_counter() - start)
+    JOB_RUNS.labels(job_id, "success").inc()
+    JOB_LAST_SUCCESS.labels(job_id).set_to_current_time()
+    return result
+
+
+class StateCollector(Collector):
+    """Liest Outbox und adaptiven Zeitplan erst beim Abruf der Metriken."""
+
+    def __init__(self, outbox_stats: Callable[[], tuple[int, int, float | None]]):
+        self.outbox_stats = outbox_stats
+        self.schedule_snapshot: Callable[[], dict[str, dict]] | None = None
+
+    def collect(self):
+        batches, items, lag = self.outbox_stats()
+        yield GaugeMetricFamily(
+            "scraper_outbox_batches", "Batches in der Outbox", value=batches
+        )
+        yield GaugeMetricFamily(
+            "scraper_outbox_items", "Einträge in der Outbox", value=items
+        )
+        yield GaugeMetricFamily(
+            "scraper_outbox_lag_seconds",
+            "Alter des ältesten Batches in der Outbox",
+            value=lag or 0,
+        )
+
+        if self.schedule_snapshot is not None:
+            interval = GaugeMetricFamily(
+                "scraper_schedule_interval_minutes",
+                "Aktuelles adaptives Intervall pro Job",
+                labels=["job"],
+            )
+            next_run = GaugeMetricFamily(
+                "scraper_schedule_next_run_timestamp_seconds",
+                "Geplanter Zeitpunkt des nächsten Laufs pro Job",
+                labels=["job"],
+            )
+            last_yield = GaugeMetricFamily(
+                "scraper_schedule_last_yield",
+                "Neue Einträge im letzten Lauf pro Job",
+                labels=["job"],
+            )
+            for job_id, source in self.schedule_snapshot().items():
+                interval.add_metric([job_id], source["interval_minutes"])
+                # Vor dem ersten Lauf bzw. der ersten Planung noch unbekannt
+                if source["next_run_at"] is not None:
+                    next_run.add_metric([job_id], source["next_run_at"])
+                if source["last_yield"] is not None:
+                    last_yield.add_metric([job_id], source["last_yield"])
+            yield interval
+            yield next_run
+            yield last_yield
+
+
+_state_collector: StateCollector | None = None
+
+
+def metrics_port() -> int:
+    """Port des Metrik-Endpunkts (SCRAPER_METRICS_PORT), 0 deaktiviert ihn."""
+    try:
+        return int(os.getenv("SCRAPER_METRICS_PORT", str(DEFAULT_METRICS_PORT)))
+    except ValueError:
+        return DEFAULT_METRICS_PORT
+
+
+def start_metrics_server(
+    outbox_stats: Callable[[], tuple[int, int, float | None]],
+) -> StateCollector | None:
+    """Startet den HTTP-Endpunkt /metrics und registriert die Zustands-Metriken."""
+    global _state_collector
+    port = metrics_port()
+    if port <= 0:
+        return None
+
+    if _state_collector is None:
+        _state_collector = StateCollector(outbox_stats)
+        REGISTRY.register(_state_collector)
+    start_http_server(port)
+    logger.info(f"Metriken unter http://0.0.0.0:{port}/metrics")
+    return _state_collector
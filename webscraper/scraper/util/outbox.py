@@ -0,0 +1,196 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from .my_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_OUTBOX_PATH = "/app/data/outbox.sqlite3"
+# Nach so vielen Fehlversuchen wandert ein Batch in die Dead-Letter-Tabelle
+DEFAULT_MAX_ATTEMPTS = 10
+# Beanspruchte Batches eines abgebrochenen Laufs werden danach wieder freigegeben
+CLAIM_TIMEOUT_SECONDS = 3600
+
+
+def _max_attempts() -> int:
+    try:
+        return max(1, int(os.getenv("SCRAPER_OUTBOX_MAX_ATTEMPTS", "")))
+    except ValueError:
+        return DEFAULT_MAX_ATTEMPTS
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    source_type: str
+    payload: bytes
+    item_count: int
+    created_at: float
+    attempts: int
+    wire_format: str
+    # SeenStore-Hashes der Einträge in Reihenfolge des Batches, erst nach Zustellung als gesehen markiert
+    hashes: list[str] = field(default_factory=list)
+
+
+class Outbox:
+    """Persistenter Zwischenspeicher für Batches, die nicht gesendet werden konnten."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("SCRAPER_OUTBOX_PATH", DEFAULT_OUTBOX_PATH)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source_type TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    item_count INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    wire_format TEXT NOT NULL DEFAULT 'json',
+                    claimed_at REAL,
+                    hashes TEXT NOT NULL DEFAULT '[]'
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox_dead_letter (
+                    id INTEGER PRIMARY KEY,
+                    source_type TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    item_count INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    wire_format TEXT NOT NULL,
+                    failed_at REAL NOT NULL,
+                    hashes TEXT NOT NULL DEFAULT '[]'
+                )
+                """
+            )
+            # Outboxen aus älteren Versionen enthalten nur JSON-Batches, keine Beanspruchung
+            # und keine Hashes (solche Einträge werden nach der Zustellung erneut gesendet)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(outbox)")}
+            if "wire_format" not in columns:
+                connection.execute(
+                    "ALTER TABLE outbox ADD COLUMN wire_format TEXT NOT NULL DEFAULT 'json'"
+                )
+            if "claimed_at" not in columns:
+                connection.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+            for table in ("outbox", "outbox_dead_letter"):
+                columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                if "hashes" not in columns:
+                    connection.execute(
+                        f"ALTER TABLE {table} ADD COLUMN hashes TEXT NOT NULL DEFAULT '[]'"
+                    )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Eigene Verbindung pro Aufruf, da die Sender in mehreren Threads laufen
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def put(
+        self,
+        source_type: str,
+        payload: bytes,
+        item_count: int,
+        wire_format: str = "json",
+        hashes: list[str] | None = None,
+    ) -> None:
+        """Speichert einen bereits komprimierten Batch samt Übertragungsformat in der Outbox."""
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT INTO outbox (source_type, payload, item_count, created_at, wire_format, hashes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source_type, payload, item_count, time.time(), wire_format, json.dumps(hashes or [])),
+            )
+
+    def pending_hashes(self) -> set[str]:
+        """Hashes aller noch nicht zugestellten Einträge, damit sie nicht erneut eingereiht werden."""
+        with self._lock, self._connect() as connection:
+            rows = connection.execute("SELECT hashes FROM outbox").fetchall()
+        return {value for (hashes,) in rows for value in json.loads(hashes)}
+
+    def claim(self) -> list[OutboxEntry]:
+        """Beansprucht alle freien Batches in Einfügereihenfolge für den aktuellen Lauf.
+
+        Überlappende Läufe (auch aus anderen Prozessen) erhalten disjunkte Batches.
+        Nach einem Abbruch werden beanspruchte Batches nach CLAIM_TIMEOUT_SECONDS wieder frei.
+        """
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            # Schreibsperre sofort holen, damit Auswahl und Markierung atomar sind
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                "SELECT id, source_type, payload, item_count, created_at, attempts, wire_format, hashes "
+                "FROM outbox WHERE claimed_at IS NULL OR claimed_at < ? ORDER BY id",
+                (now - CLAIM_TIMEOUT_SECONDS,),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE outbox SET claimed_at = ? WHERE id = ?", [(now, row[0]) for row in rows]
+            )
+        return [OutboxEntry(*row[:-1], hashes=json.loads(row[-1])) for row in rows]
+
+    def release(self, entry_ids: list[int]) -> None:
+        """Gibt beanspruchte, nicht versuchte Batches für den nächsten Lauf frei."""
+        with self._lock, self._connect() as connection:
+            connection.executemany(
+                "UPDATE outbox SET claimed_at = NULL WHERE id = ?", [(i,) for i in entry_ids]
+            )
+
+    def remove(self, entry_id: int) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def mark_failed(self, entry_id: int) -> bool:
+        """Fehlversuch zählen und Batch freigeben.
+
+        Gibt True zurück, wenn der Batch die maximale Anzahl Versuche erreicht hat und in
+        die Dead-Letter-Tabelle verschoben wurde.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "UPDATE outbox SET attempts = attempts + 1, claimed_at = NULL WHERE id = ?",
+                (entry_id,),
+            )
+            # Die Einträge gelten weiter als ungesehen und werden beim nächsten Scrapen neu gesendet
+            moved = connection.execute(
+                "INSERT INTO outbox_dead_letter (id, source_type, payload, item_count, created_at, "
+                "attempts, wire_format, failed_at, hashes) "
+                "SELECT id, source_type, payload, item_count, created_at, attempts, wire_format, ?, hashes "
+                "FROM outbox WHERE id = ? AND attempts >= ?",
+                (time.time(), entry_id, _max_attempts()),
+            ).rowcount
+            if moved:
+                connection.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+        return bool(moved)
+
+    def dead_letter_count(self) -> int:
+        with self._lock, self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM outbox_dead_letter").fetchone()[0]
+
+    def stats(self) -> tuple[int, int, float | None]:
+        """Gibt Anzahl Batches, Anzahl Einträge und Alter des ältesten Batches (Sekunden) zurück."""
+        with self._lock, self._connect() as connection:
+            batches, items, oldest = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(item_count), 0), MIN(created_at) FROM outbox"
+            ).fetchone()
+        lag = time.time() - oldest if oldest is not None else None
+        return batches, items, lag
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from .my_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SEEN_STORE_PATH = "/app/data/seen.sqlite3"
+# Einträge, die so lange nicht mehr gescrapt wurden, werden aus dem Speicher entfernt
+DEFAULT_SEEN_TTL_DAYS = 30
+# Abstand zwischen zwei Bereinigungen
+PRUNE_INTERVAL_SECONDS = 24 * 60 * 60
+
+
+def _ttl_seconds() -> float:
+    try:
+        days = float(os.getenv("SCRAPER_SEEN_TTL_DAYS", ""))
+    except ValueError:
+        days = DEFAULT_SEEN_TTL_DAYS
+    return days * 24 * 60 * 60
+
+
+def content_hash(entry: dict) -> str:
+    """Hash über die inhaltlich relevanten Felder eines News-Eintrags."""
+    date = entry.get("erstellungsdatum")
+    key = [
+        entry.get("link"),
+        entry.get("titel"),
+        date.isoformat() if hasattr(date, "isoformat") else date,
+        entry.get("text"),
+    ]
+    serialized = json.dumps(key, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class BloomFilter:
+    """Einfacher Bloom-Filter als schneller Vorfilter vor der SQLite-Abfrage."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        # Double Hashing: k Positionen aus zwei 64-Bit-Hashes ableiten
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class SeenStore:
+    """Lokaler Speicher bereits gesendeter Einträge, damit unveränderte Einträge nicht erneut gesendet werden."""
+
+    def __init__(self, path: str | None = None, capacity: int = 200_000):
+        self.path = path or os.getenv("SCRAPER_SEEN_STORE_PATH", DEFAULT_SEEN_STORE_PATH)
+        self._lock = threading.Lock()
+        self._last_pruned = 0.0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS seen (
+                    hash TEXT PRIMARY KEY,
+                    source_type TEXT NOT NULL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS seen_last_seen ON seen (last_seen)")
+
+        self.prune()
+        with self._connect() as connection:
+            hashes = [row[0] for row in connection.execute("SELECT hash FROM seen")]
+
+        # Bloom-Filter mit allen bekannten Hashes füllen
+        self._bloom = BloomFilter(max(capacity, len(hashes) * 2))
+        for value in hashes:
+            self._bloom.add(value)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def filter_new(
+        self, entries: Iterable[dict]
+    ) -> tuple[list[dict], list[str], list[str]]:
+        """Gibt neue oder geänderte Einträge, deren Hashes und die Hashes der bekannten Einträge zurück."""
+        entries = list(entries)
+        hashes = [content_hash(entry) for entry in entries]
+
+        # Nur Kandidaten, die laut Bloom-Filter bekannt sein könnten, in SQLite prüfen
+        candidates = [value for value in hashes if value in self._bloom]
+        known: set[str] = set()
+        if candidates:
+            with self._lock, self._connect() as connection:
+                for start in range(0, len(candidates), 500):
+                    batch = candidates[start : start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    known.update(
+                        row[0]
+                        for row in connection.execute(
+                            f"SELECT hash FROM seen WHERE hash IN ({placeholders})",
+                            batch,
+                        )
+                    )
+
+        new = [(entry, value) for entry, value in zip(entries, hashes) if value not in known]
+        return (
+            [entry for entry, _ in new],
+            [value for _, value in new],
+            [value for value in hashes if value in known],
+        )
+
+    def prune(self) -> int:
+        """Entfernt Einträge, die länger als SCRAPER_SEEN_TTL_DAYS nicht gescrapt wurden.
+
+        Der Bloom-Filter behält die Hashes bis zum nächsten Start, das kostet nur eine
+        zusätzliche SQLite-Abfrage für diese Einträge.
+        """
+        self._last_pruned = time.time()
+        with self._lock, self._connect() as connection:
+            removed = connection.execute(
+                "DELETE FROM seen WHERE last_seen < ?", (self._last_pruned - _ttl_seconds(),)
+            ).rowcount
+        if removed:
+            logger.info(f"SeenStore – {removed} veraltete Einträge entfernt")
+        return removed
+
+    def mark_seen(self, hashes: Iterable[str], source_type: str) -> None:
+        now = time.time()
+        if now - self._last_pruned > PRUNE_INTERVAL_SECONDS:
+            self.prune()
+        rows = [(value, source_type, now, now) for value in hashes]
+        with self._lock, self._connect() as connection:
+            connection.executemany(
+                """
+                INSERT INTO seen (hash, source_type, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                ON CONFLICT(hash) DO UPDATE SET last_seen = excluded.last_seen
+                """,
+                rows,
+            )
+        for value, *_ in rows:
+            self._bloom.add(value)
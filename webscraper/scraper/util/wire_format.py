@@ -0,0 +1,53 @@
+import gzip
+import json
+import os
+from datetime import datetime
+
+from .my_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_WIRE_FORMAT = "json"
+# Content-Type und Content-Encoding je Format, das Frontend wählt den Decoder anhand der Header
+WIRE_FORMATS = {
+    "json": ("application/json; charset=utf-8", "gzip"),
+    "msgpack": ("application/msgpack", "zstd"),
+}
+ZSTD_LEVEL = 3
+
+
+def datetime_serializer(obj) -> str:
+    """Datums-Objekte in ein serialisierbares Format umwandeln."""
+    if isinstance(obj, datetime):
+        return obj.strftime("%d.%m.%Y %H:%M:%S")
+    raise TypeError("Type not serializable")
+
+
+def get_wire_format() -> str:
+    """Gibt das konfigurierte Übertragungsformat zurück (SCRAPER_WIRE_FORMAT)."""
+    wire_format = os.getenv("SCRAPER_WIRE_FORMAT", DEFAULT_WIRE_FORMAT).strip().lower()
+    if wire_format not in WIRE_FORMATS:
+        logger.warning(
+            f"Unbekanntes Übertragungsformat '{wire_format}', verwende '{DEFAULT_WIRE_FORMAT}'"
+        )
+        return DEFAULT_WIRE_FORMAT
+    return wire_format
+
+
+def headers_for(wire_format: str) -> dict[str, str]:
+    content_type, content_encoding = WIRE_FORMATS[wire_format]
+    return {"Content-Type": content_type, "Content-Encoding": content_encoding}
+
+
+def encode(data, wire_format: str = DEFAULT_WIRE_FORMAT) -> bytes:
+    """Nutzlast im angegebenen Format serialisieren und komprimieren."""
+    if wire_format == "msgpack":
+        import msgpack
+        import zstandard
+
+        # Zeitzonenbehaftete Datumswerte werden als MessagePack-Timestamp übertragen
+        packed = msgpack.packb(data, datetime=True)
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(packed)
+
+    json_data = json.dumps(data, default=datetime_serializer)
+    return gzip.compress(json_data.encode("utf-8"))
@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from backfill_rundmail import _next_archive_page, handled_links
+
+
+class HandledLinksTests(TestCase):
+    def test_only_links_with_all_entries_stored_are_checkpointed(self):
+        batch_links = [("a", 1), ("sammel", 3), ("b", 1), ("leer", 0), ("c", 1)]
+        result = {
+            "results": [
+                {"line": 1, "status": "created"},
+                {"line": 2, "status": "unchanged"},
+                {"line": 3, "status": "error", "error": "timeout"},
+                {"line": 4, "status": "deferred"},
+                {"line": 5, "status": "duplicate"},
+                {"line": 6, "status": "invalid"},
+            ]
+        }
+
+        self.assertEqual(handled_links(batch_links, result), ["a", "b", "leer"])
+
+    def test_missing_results_checkpoint_nothing(self):
+        self.assertEqual(handled_links([("a", 1)], {"summary": {"created": 1}}), [])
+
+
+class NextArchivePageTests(TestCase):
+    def test_follows_rel_next_link(self):
+        html = (
+            '<a href="/archive/9001">Eintrag</a>'
+            '<a rel="prev" href="?page=1">Zurück</a><a rel="next" href="?page=3">Weiter</a>'
+        )
+        self.assertEqual(_next_archive_page(html), "https://rundmail.rptu.de/archive?page=3")
+
+    def test_last_page_has_no_next_link(self):
+        self.assertIsNone(_next_archive_page('<a href="/archive/9001">Eintrag</a>'))
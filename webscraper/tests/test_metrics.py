@@ -0,0 +1,69 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from prometheus_client import REGISTRY
+
+from scraper.util import metrics
+from scraper.util.adaptive_schedule import AdaptiveScheduleState
+from scraper.util.metrics import StateCollector
+
+
+class StateCollectorTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "schedule.json")
+
+    def collect(self, state):
+        collector = StateCollector(lambda: (0, 0, None))
+        collector.schedule_snapshot = state.snapshot
+        return {
+            family.name: {sample.labels["job"]: sample.value for sample in family.samples}
+            for family in collector.collect()
+            if family.name.startswith("scraper_schedule")
+        }
+
+    def test_unplanned_job_exports_only_interval(self):
+        state = AdaptiveScheduleState(self.path)
+        state.get("rundmail")
+
+        metrics = self.collect(state)
+
+        self.assertIn("rundmail", metrics["scraper_schedule_interval_minutes"])
+        self.assertEqual(metrics["scraper_schedule_next_run_timestamp_seconds"], {})
+        self.assertEqual(metrics["scraper_schedule_last_yield"], {})
+
+    def test_run_exports_next_run_and_last_yield(self):
+        state = AdaptiveScheduleState(self.path)
+        state.get("rundmail")
+        state.record_run("rundmail", 3)
+
+        metrics = self.collect(state)
+
+        self.assertEqual(metrics["scraper_schedule_last_yield"], {"rundmail": 3})
+        self.assertEqual(
+            metrics["scraper_schedule_next_run_timestamp_seconds"]["rundmail"],
+            state.get("rundmail").next_run_at,
+        )
+
+
+class ParseEachTests(TestCase):
+    def parse_errors(self, source: str) -> float:
+        return REGISTRY.get_sample_value("scraper_parse_errors_total", {"source": source}) or 0
+
+    def test_broken_entries_are_skipped_and_counted(self):
+        before = self.parse_errors("test-parse")
+
+        with metrics.source_context("test-parse"), self.assertLogs(metrics.logger, "ERROR"):
+            parsed = list(metrics.parse_each(["1", "kaputt", "3"], int))
+
+        self.assertEqual(parsed, [1, 3])
+        self.assertEqual(self.parse_errors("test-parse") - before, 1)
+
+    def test_fetch_errors_are_not_swallowed(self):
+        def fetch(_):
+            raise metrics.requests.ConnectionError
+
+        with self.assertRaises(metrics.requests.ConnectionError):
+            list(metrics.parse_each(["https://example.org"], fetch))
@@ -0,0 +1,74 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from scraper.util import frontend_interaction
+from scraper.util.outbox import Outbox
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.outbox = Outbox(os.path.join(directory.name, "outbox.sqlite3"))
+
+    def test_claimed_batches_are_not_claimed_again(self):
+        self.outbox.put("rundmail", b"a", 1)
+        self.outbox.put("rundmail", b"b", 1)
+
+        first = self.outbox.claim()
+        self.assertEqual([entry.payload for entry in first], [b"a", b"b"])
+        self.assertEqual(self.outbox.claim(), [])
+
+        self.outbox.release([first[1].id])
+        self.assertEqual([entry.payload for entry in self.outbox.claim()], [b"b"])
+
+    def test_failed_batch_moves_to_dead_letter_after_max_attempts(self):
+        self.outbox.put("rundmail", b"a", 1)
+        with mock.patch.dict(os.environ, {"SCRAPER_OUTBOX_MAX_ATTEMPTS": "2"}):
+            (entry,) = self.outbox.claim()
+            self.assertFalse(self.outbox.mark_failed(entry.id))
+            (entry,) = self.outbox.claim()
+            self.assertEqual(entry.attempts, 1)
+            self.assertTrue(self.outbox.mark_failed(entry.id))
+
+        self.assertEqual(self.outbox.claim(), [])
+        self.assertEqual(self.outbox.stats()[0], 0)
+        self.assertEqual(self.outbox.dead_letter_count(), 1)
+
+
+class FlushOutboxTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.outbox = Outbox(os.path.join(directory.name, "outbox.sqlite3"))
+        patcher = mock.patch.object(frontend_interaction, "get_outbox", return_value=self.outbox)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_batch_does_not_block_later_batches(self):
+        self.outbox.put("rundmail", b"kaputt", 1)
+        self.outbox.put("rundmail", b"ok", 1)
+        sent = []
+
+        def post(payload, *args, **kwargs):
+            sent.append((payload, kwargs.get("retries")))
+            return frontend_interaction.PostResult(
+                frontend_interaction.DELIVERED if payload == b"ok" else frontend_interaction.RETRY
+            )
+
+        with mock.patch.object(frontend_interaction, "_post_payload", side_effect=post):
+            frontend_interaction.flush_outbox("key")
+
+        self.assertEqual(sent, [(b"kaputt", 0), (b"ok", 0)])
+        (remaining,) = self.outbox.claim()
+        self.assertEqual((remaining.payload, remaining.attempts), (b"kaputt", 1))
+
+    def test_unsent_batches_are_released_on_error(self):
+        self.outbox.put("rundmail", b"a", 1)
+        with mock.patch.object(
+            frontend_interaction, "_post_payload", side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            frontend_interaction.flush_outbox("key")
+
+        self.assertEqual(len(self.outbox.claim()), 1)
@@ -0,0 +1,103 @@
+import json
+from unittest import TestCase
+
+from benchmarks import replay
+
+
+class ReplayRegressionTests(TestCase):
+    def test_scrapers_reproduce_recorded_items(self):
+        for source in replay.SCRAPERS:
+            with self.subTest(source=source):
+                store = replay.FixtureStore(source)
+                self.assertTrue(store.expected_path.exists(), f"keine Aufzeichnung für {source}")
+
+                stats = replay.replay(source)
+
+                self.assertEqual(stats.missing_urls, [])
+                self.assertEqual(
+                    stats.items, json.loads(store.expected_path.read_text(encoding="utf-8"))
+                )
+
+    def test_scrapers_extract_hand_checked_fields(self):
+        # Von Hand aus den synthetischen Fixture-Seiten abgelesen, unabhängig von expected.json
+        expected = {
+            "mail": [
+                ("", "Spieleabend am Freitag", "10.10.2025 18:30:00"),
+                # 07:05 UTC im Date-Header entspricht 09:05 Sommerzeit
+                ("", "Ohne Präfix", "13.10.2025 09:05:00"),
+            ],
+            "newsroom": [
+                (
+                    "https://rptu.de/newsroom/pressemitteilungen/detail/forschungsbau",
+                    "Forschungsbau eingeweiht",
+                    "08.10.2025 00:00:00",
+                ),
+                (
+                    "https://rptu.de/newsroom/pressemitteilungen/detail/preis",
+                    "Lehrpreis verliehen",
+                    "30.09.2025 00:00:00",
+                ),
+            ],
+            "rundmail": [
+                (
+                    "https://rundmail.rptu.de/archive/9003##message-5101",
+                    "Studentische Hilfskraft in der Bibliothek",
+                    "14.10.2025 09:15:02",
+                ),
+                (
+                    "https://rundmail.rptu.de/archive/9003##message-5102",
+                    "Tutor*in für Mathematik für Ingenieure",
+                    "14.10.2025 09:15:02",
+                ),
+                (
+                    "https://rundmail.rptu.de/archive/9002",
+                    "Wartung des E-Mail-Servers am Samstag",
+                    "13.10.2025 16:40:11",
+                ),
+                (
+                    "https://rundmail.rptu.de/archive/9001##message-4801",
+                    "Semesterauftakt im Audimax",
+                    "13.10.2025 08:00:00",
+                ),
+                (
+                    "https://rundmail.rptu.de/archive/9001##message-4802",
+                    "Ringvorlesung „Nachhaltigkeit“",
+                    "13.10.2025 08:00:00",
+                ),
+                (
+                    "https://rundmail.rptu.de/archive/9001##message-4803",
+                    "Neue Reisekostenrichtlinie",
+                    "13.10.2025 08:00:00",
+                ),
+            ],
+            "wiwi": [
+                (
+                    "https://wiwi.rptu.de/aktuelles/news/haushaltsworkshop",
+                    "Haushaltsworkshop für Erstsemester",
+                    "10.10.2025 00:00:00",
+                ),
+                (
+                    "https://wiwi.rptu.de/aktuelles/news/neue-professur",
+                    "Neue Professur für Finanzwirtschaft",
+                    "01.10.2025 00:00:00",
+                ),
+                (
+                    "https://wiwi.rptu.de/aktuelles/news/sprechstunden",
+                    "Sprechstunden in der vorlesungsfreien Zeit",
+                    "15.08.2025 00:00:00",
+                ),
+                (
+                    "https://wiwi.rptu.de/aktuelles/news/studie-lieferketten",
+                    "Studie zu resilienten Lieferketten",
+                    "20.09.2025 00:00:00",
+                ),
+            ],
+        }
+        self.assertEqual(set(expected), set(replay.SCRAPERS))
+        for source, fields in expected.items():
+            with self.subTest(source=source):
+                items = replay.replay(source).items
+                self.assertEqual(
+                    [(item["link"], item["titel"], item["erstellungsdatum"]) for item in items],
+                    fields,
+                )
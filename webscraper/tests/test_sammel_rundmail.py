@@ -0,0 +1,45 @@
+import os
+from unittest import TestCase, mock
+
+from benchmarks import sammel_rundmail
+from scraper.rundmail import rundmail
+from scraper.util.html_parsing import make_soup
+
+
+class SammelRundmailTests(TestCase):
+    def _fixture_soups(self):
+        pages = sorted(sammel_rundmail.FIXTURE_DIR.rglob("rundmail_sammel*.html"))
+        self.assertTrue(pages, "keine aufgezeichneten Sammel-Rundmails gefunden")
+        for page in pages:
+            yield page.name, make_soup(page.read_text(encoding="utf-8"))
+
+    def test_indexed_lookup_matches_per_item_search(self):
+        for parser in ("lxml", "html.parser"):
+            with mock.patch.dict(os.environ, {"SCRAPER_HTML_PARSER": parser}):
+                for name, soup in self._fixture_soups():
+                    with self.subTest(page=name, parser=parser):
+                        expected = sammel_rundmail._lookup_per_item(soup)
+                        self.assertTrue(expected)
+                        self.assertEqual(sammel_rundmail._lookup_indexed(soup), expected)
+
+    def test_synthetic_pages_match(self):
+        for size in (1, 25, 100):
+            soup = make_soup(sammel_rundmail.build_synthetic_page(size))
+            self.assertEqual(
+                sammel_rundmail._lookup_indexed(soup), sammel_rundmail._lookup_per_item(soup)
+            )
+
+    def test_first_section_wins_for_duplicate_ids(self):
+        soup = make_soup(
+            (sammel_rundmail.FIXTURE_DIR / "rundmail_sammel_gekuerzt.html").read_text(
+                encoding="utf-8"
+            )
+        )
+        entries = rundmail.process_sammel_rundmail(
+            soup, sammel_rundmail.LINK, sammel_rundmail.DATE
+        )
+
+        repeated = [entry for entry in entries if entry["link"].endswith("#message-4711")]
+        self.assertEqual(len(repeated), 2)
+        self.assertTrue(all("Semester mit einer Begrüßung" in entry["text"] for entry in repeated))
+        self.assertEqual(repeated[0]["standorte"], ["Kaiserslautern"])
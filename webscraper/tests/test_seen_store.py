@@ -0,0 +1,114 @@
+import os
+import tempfile
+import time
+from unittest import TestCase, mock
+
+from scraper.util import frontend_interaction
+from scraper.util.frontend_interaction import DELIVERED, REJECTED, RETRY, PostResult
+from scraper.util.outbox import Outbox
+from scraper.util.seen_store import BloomFilter, SeenStore, content_hash
+
+
+def _entry(number: int) -> dict:
+    return {"link": f"https://example.org/{number}", "titel": f"Titel {number}", "text": "Text"}
+
+
+class BloomFilterTests(TestCase):
+    def test_added_values_are_contained(self):
+        bloom = BloomFilter(1000)
+        values = [f"wert-{i}" for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+
+    def test_false_positive_rate_stays_near_configured_rate(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"wert-{i}")
+        false_positives = sum(f"anderer-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+class SeenStoreTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "seen.sqlite3")
+        self.store = SeenStore(self.path, capacity=100)
+
+    def test_filter_new_separates_known_entries(self):
+        self.store.mark_seen([content_hash(_entry(1))], "rundmail")
+
+        new, new_hashes, known_hashes = self.store.filter_new([_entry(1), _entry(2)])
+
+        self.assertEqual(new, [_entry(2)])
+        self.assertEqual(new_hashes, [content_hash(_entry(2))])
+        self.assertEqual(known_hashes, [content_hash(_entry(1))])
+
+    def test_prune_removes_entries_not_seen_within_ttl(self):
+        self.store.mark_seen([content_hash(_entry(1))], "rundmail")
+        with mock.patch.dict(os.environ, {"SCRAPER_SEEN_TTL_DAYS": "1"}), mock.patch(
+            "scraper.util.seen_store.time.time", return_value=time.time() + 2 * 24 * 60 * 60
+        ):
+            self.assertEqual(self.store.prune(), 1)
+
+        new, _, _ = SeenStore(self.path, capacity=100).filter_new([_entry(1)])
+        self.assertEqual(new, [_entry(1)])
+
+
+class SendDataTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = SeenStore(os.path.join(directory.name, "seen.sqlite3"), capacity=100)
+        self.outbox = Outbox(os.path.join(directory.name, "outbox.sqlite3"))
+        for name, value in (("get_seen_store", self.store), ("get_outbox", self.outbox)):
+            patcher = mock.patch.object(frontend_interaction, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _send(self, entries: list[dict], *results: PostResult) -> None:
+        with mock.patch.object(
+            frontend_interaction, "_post_payload", side_effect=list(results)
+        ), mock.patch.object(frontend_interaction, "BATCH_SIZE", 2):
+            frontend_interaction.send_data(entries, "Rundmail-Scraper")
+
+    def _unseen(self, entries: list[dict]) -> list[dict]:
+        return self.store.filter_new(entries)[0]
+
+    def test_only_entries_handled_by_django_are_marked(self):
+        entries = [_entry(1), _entry(2)]
+        self._send(entries, PostResult(DELIVERED, ["created", "error"]))
+        self.assertEqual(self._unseen(entries), [_entry(2)])
+
+    def test_rejected_batches_are_not_marked(self):
+        entries = [_entry(1), _entry(2), _entry(3)]
+        self._send(entries, PostResult(REJECTED), PostResult(DELIVERED, ["skipped"]))
+        self.assertEqual(self._unseen(entries), entries)
+
+    def _flush(self, *results: PostResult) -> None:
+        with mock.patch.object(frontend_interaction, "_post_payload", side_effect=list(results)):
+            frontend_interaction.flush_outbox("key")
+
+    def test_spooled_batches_are_marked_after_delivery(self):
+        entries = [_entry(1), _entry(2)]
+        self._send(entries, PostResult(RETRY))
+        self.assertEqual(self._unseen(entries), entries)
+        self.assertEqual(self.outbox.stats()[0], 1)
+
+        # Solange der Batch wartet, wird er nicht erneut eingereiht
+        self._send(entries, PostResult(RETRY))
+        self.assertEqual(self.outbox.stats()[0], 1)
+
+        self._flush(PostResult(DELIVERED, ["created", "error"]))
+        self.assertEqual(self._unseen(entries), [_entry(2)])
+        self.assertEqual(self.outbox.stats()[0], 0)
+
+    def test_rejected_or_dead_lettered_spooled_batches_stay_unseen(self):
+        entries = [_entry(1), _entry(2), _entry(3)]
+        self._send(entries, PostResult(RETRY), PostResult(RETRY))
+        with mock.patch.dict(os.environ, {"SCRAPER_OUTBOX_MAX_ATTEMPTS": "1"}):
+            self._flush(PostResult(REJECTED), PostResult(RETRY))
+
+        self.assertEqual(self.outbox.dead_letter_count(), 1)
+        self.assertEqual(self._unseen(entries), entries)
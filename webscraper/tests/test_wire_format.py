@@ -0,0 +1,39 @@
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from unittest import TestCase, mock
+
+import msgpack
+import zstandard
+
+from scraper.util import wire_format
+
+
+class EncodeTests(TestCase):
+    DATE = datetime(2026, 10, 19, 12, 0, 30, tzinfo=timezone.utc)
+
+    def test_json_is_gzipped_with_german_dates(self):
+        body = wire_format.encode([{"erstellungsdatum": self.DATE}], "json")
+
+        self.assertEqual(
+            json.loads(gzip.decompress(body)), [{"erstellungsdatum": "19.10.2026 12:00:30"}]
+        )
+
+    def test_msgpack_keeps_timezone_aware_dates(self):
+        body = wire_format.encode([{"erstellungsdatum": self.DATE}], "msgpack")
+
+        (entry,) = msgpack.unpackb(
+            zstandard.ZstdDecompressor().decompress(body), timestamp=3
+        )
+        self.assertEqual(entry["erstellungsdatum"], self.DATE)
+
+    def test_headers_match_format(self):
+        self.assertEqual(
+            wire_format.headers_for("msgpack"),
+            {"Content-Type": "application/msgpack", "Content-Encoding": "zstd"},
+        )
+
+    def test_unknown_format_falls_back_to_json(self):
+        with mock.patch.dict(os.environ, {"SCRAPER_WIRE_FORMAT": "xml"}):
+            self.assertEqual(wire_format.get_wire_format(), "json")